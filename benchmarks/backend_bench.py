@@ -0,0 +1,59 @@
+# Compare the Selenium and native CDP driver backends on the endpoints' own form path
+# (form_api.fill_form): per-form latency one at a time, then N forms in flight at once on N form
+# worker threads. Selenium runs one browser per pool session; CDP runs N pages of one browser,
+# whose DevTools traffic all shares one event loop.
+# Run from the repository root: python -m benchmarks.backend_bench --runs 5 --forms 8
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import form_api
+from browser_pool import BrowserPool
+from cdp_backend import CdpPool
+from schema_cache import SchemaCache
+from benchmarks.fixture_server import generated_path, serve
+from benchmarks.suite import MemorySampler, percentile
+
+
+def run(name: str, pool, url: str, runs: int, forms: int):
+    form_api.browser_pool = pool
+    form_api.schema_cache = SchemaCache(path=None)  # Each backend starts with a discovery
+    with MemorySampler() as memory:
+        pool.start()
+        try:
+            latencies = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                form_api.fill_form(url, fill_mode="bulk")
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=forms) as executor:
+                futures = [executor.submit(form_api.fill_form, url, fill_mode="bulk") for _ in range(forms)]
+            wall = time.perf_counter() - started
+        finally:
+            pool.close()
+    failures = sum(future.exception() is not None for future in futures)
+    print(f"{name:>8}: one form p50 {percentile(latencies, 50):.3f}s p95 {percentile(latencies, 95):.3f}s  "
+          f"{forms} at once {wall:.3f}s ({(forms - failures) / wall:.2f} forms/s, {failures} failed)  "
+          f"peak RSS {memory.peak / 2 ** 20:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--forms", type=int, default=8, help="forms in flight at once")
+    parser.add_argument("--fields", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    url = base_url + generated_path(fields=args.fields, dynamic=1, slow=1)
+    try:
+        run("selenium", BrowserPool(size=args.forms), url, args.runs, args.forms)
+        run("cdp", CdpPool(size=args.forms, max_pages=args.forms), url, args.runs, args.forms)
+    finally:
+        server.shutdown()
+        form_api.result_store.close()
+
+
+if __name__ == "__main__":
+    main()
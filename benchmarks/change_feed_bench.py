@@ -0,0 +1,60 @@
+# Compare full rescans with the MutationObserver change feed in script.py's fill loop on the App.js fixture.
+# Run from the repository root: python -m benchmarks.change_feed_bench --runs 5
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+from browser_pool import create_headless_driver
+from driver_stats import RoundTripCounter
+from script import FormAgent, run_fill_loop
+from benchmarks.fixture_server import serve
+
+
+def run(name: str, driver, url: str, runs: int, change_feed: bool):
+    durations, trips, discovery_bytes, fields = [], [], [], []
+    for _ in range(runs):
+        agent = FormAgent(url, driver=driver, change_feed=change_feed)
+        counter = RoundTripCounter(driver)
+        received = []
+        execute_script = driver.execute_script
+
+        # Size of what discovery sends back each iteration
+        def measured(script, *args):
+            result = execute_script(script, *args)
+            if script.lstrip().startswith("function text"):
+                received.append(len(json.dumps(result)))
+            return result
+
+        driver.execute_script = measured
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = run_fill_loop(agent)
+        durations.append(time.perf_counter() - started)
+        del driver.execute_script
+        counter.detach()
+        trips.append(counter.count)
+        discovery_bytes.append(sum(received))
+        fields.append(len(state.fields))
+    print(f"{name:>11}: {statistics.mean(fields):.0f} fields, {statistics.mean(trips):.0f} round trips, "
+          f"{statistics.mean(discovery_bytes) / 1024:.1f}KB discovery payload, mean {statistics.mean(durations) * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server, url = serve()
+    driver = create_headless_driver()
+    try:
+        run("rescan", driver, url, args.runs, change_feed=False)
+        run("change feed", driver, url, args.runs, change_feed=True)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
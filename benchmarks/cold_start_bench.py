@@ -0,0 +1,53 @@
+# Per-request chromedriver overhead before and after resolving it once: driver resolution
+# (ChromeDriverManager().install() on every request vs. a cached path) and session start
+# (a chromedriver process per session vs. one shared chromedriver).
+# Run from the repository root: python -m benchmarks.cold_start_bench --sessions 4
+import argparse
+import statistics
+import time
+from selenium.webdriver.chrome.service import Service
+from browser_profile import create_driver
+from chromedriver import check_chromedriver, chromedriver_service, resolve_chromedriver
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def report(name: str, durations):
+    print(f"{name:>32}: first {durations[0] * 1000:8.1f}ms  mean of rest "
+          f"{statistics.mean(durations[1:] or durations) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--skip-webdriver-manager", action="store_true", help="offline: don't time ChromeDriverManager")
+    args = parser.parse_args()
+
+    if not args.skip_webdriver_manager:
+        from webdriver_manager.chrome import ChromeDriverManager
+        report("ChromeDriverManager().install()", [timed(lambda: ChromeDriverManager().install())[0] for _ in range(args.sessions)])
+    report("resolve_chromedriver()", [timed(resolve_chromedriver)[0] for _ in range(args.sessions)])
+    startup, info = timed(check_chromedriver)
+    print(f"{'startup health check':>32}: {startup * 1000:8.1f}ms ({info['source']})")
+
+    # Sessions stay open together, as in the browser pool
+    for name, service_for in [
+        ("session, own chromedriver", lambda: Service(executable_path=resolve_chromedriver())),
+        ("session, shared chromedriver", chromedriver_service),
+    ]:
+        drivers, durations = [], []
+        for _ in range(args.sessions):
+            duration, driver = timed(lambda: create_driver(service=service_for()))
+            durations.append(duration)
+            drivers.append(driver)
+        for driver in drivers:
+            driver.quit()
+        report(name, durations)
+
+
+if __name__ == "__main__":
+    main()
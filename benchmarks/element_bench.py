@@ -0,0 +1,78 @@
+# Element lookups for one fill pass and submit: a find_element per field, document-wide radio
+# XPaths and the find-and-fall-back submit lookup, against handles cached at discovery, radios
+# resolved within their group and the single-script submit lookup. Nothing is clicked or typed,
+# so only the lookups are measured.
+# Run from the repository root: python -m benchmarks.element_bench --sizes 20 200 --runs 5
+import argparse
+import statistics
+import time
+from selenium.webdriver.common.by import By
+from browser_pool import create_headless_driver
+from dom_extract import extract_fields, extract_fields_and_elements
+from driver_stats import RoundTripCounter
+from element_cache import SUBMIT_CANDIDATES_SCRIPT, ElementCache
+from form_api import Field, generate_inputs
+from benchmarks.fixture_server import generated_path, serve
+
+
+def legacy(driver):
+    fields = [Field(**item) for item in extract_fields(driver, "#myForm")]
+    generate_inputs(fields, seed=0)
+    for field in fields:
+        driver.find_element(By.ID, field.id)
+        if field.type == "radio":
+            driver.find_element(By.XPATH, f"//input[@type='radio' and @value='{field.value}']")
+    form = driver.find_element(By.ID, "myForm")
+    form.find_element(By.XPATH, ".//button[@type='submit']")
+    return len(fields)
+
+
+def cached(driver):
+    payload, elements = extract_fields_and_elements(driver, "#myForm")
+    fields = [Field(**item) for item in payload]
+    generate_inputs(fields, seed=0)
+    cache = ElementCache(driver)
+    cache.remember(payload, {item["id"]: element for item, element in zip(payload, elements)})
+    for field in fields:
+        if field.type == "radio":
+            cache.act_radio(field.name, str(field.value), lambda element: element)
+        else:
+            cache.act(field.id, lambda element: element)
+    driver.execute_script(SUBMIT_CANDIDATES_SCRIPT, "#myForm")
+    return len(fields)
+
+
+def measure(name: str, lookup, driver, url: str, runs: int, size: int):
+    counter = RoundTripCounter(driver)
+    walls, trips = [], []
+    for _ in range(runs):
+        driver.get(url)
+        counter.reset()
+        started = time.perf_counter()
+        lookup(driver)
+        walls.append(time.perf_counter() - started)
+        trips.append(counter.count)
+    counter.detach()
+    print(f"{size:>5} fields {name:>7}: {statistics.median(trips):.0f} round trips  median {statistics.median(walls) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    driver = create_headless_driver()
+    try:
+        for size in args.sizes:
+            url = base_url + generated_path(fields=size)
+            measure("legacy", legacy, driver, url, args.runs, size)
+            measure("cached", cached, driver, url, args.runs, size)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
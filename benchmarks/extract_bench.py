@@ -0,0 +1,66 @@
+# Compare per-element field discovery with the single-script extractor on the App.js form fixture.
+# Run from the repository root: python -m benchmarks.extract_bench --runs 20
+import argparse
+import statistics
+import time
+from selenium.webdriver.common.by import By
+from browser_pool import create_headless_driver
+from dom_extract import extract_fields
+from driver_stats import RoundTripCounter
+from benchmarks.fixture_server import serve
+
+
+# The discovery loop get_form_fields used before the extractor: several commands per element
+def legacy_extract(driver) -> list:
+    form = driver.find_element(By.TAG_NAME, "form")
+    fields = []
+    for element in form.find_elements(By.XPATH, ".//input | .//select | .//textarea"):
+        field_id = element.get_attribute("id")
+        if not field_id:
+            continue
+        field_type = element.get_attribute("type") or element.tag_name
+        try:
+            label = driver.find_element(By.XPATH, f"//label[@for='{field_id}']").text.strip()
+        except Exception:
+            label = ""
+        label = label or element.get_attribute("name") or "Unknown"
+        options = []
+        if element.tag_name.lower() == "select":
+            options = [option.text for option in element.find_elements(By.TAG_NAME, "option")]
+        fields.append({"id": field_id, "type": field_type, "label": label, "options": options})
+    return fields
+
+
+def measure(name: str, extract, driver, counter: RoundTripCounter, runs: int):
+    durations, trips = [], []
+    for _ in range(runs):
+        counter.reset()
+        started = time.perf_counter()
+        fields = extract(driver)
+        durations.append(time.perf_counter() - started)
+        trips.append(counter.count)
+    print(f"{name:>10}: {len(fields)} fields, {statistics.mean(trips):.0f} round trips, "
+          f"mean {statistics.mean(durations) * 1000:.1f}ms  p95 {sorted(durations)[int(0.95 * (runs - 1))] * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = serve()
+    driver = create_headless_driver()
+    try:
+        driver.get(url)
+        # Implicit waits would make the failed label lookups even slower; measure the best case
+        driver.implicitly_wait(0)
+        counter = RoundTripCounter(driver)
+        measure("legacy", legacy_extract, driver, counter, args.runs)
+        measure("extractor", extract_fields, driver, counter, args.runs)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Compare per-field send_keys filling with the bulk scripted fill on the App.js form fixture.
+# Run from the repository root: python -m benchmarks.fill_bench --runs 5
+import argparse
+import statistics
+import time
+from browser_pool import create_headless_driver
+from driver_stats import RoundTripCounter
+from form_api import FormAgent, FormState, fill_field, fill_fields_bulk, generate_inputs, get_form_fields
+from benchmarks.fixture_server import serve
+
+
+def per_field(fields, agent):
+    for field in fields:
+        fill_field(field, agent)
+
+
+def run(name: str, fill, driver, url: str, runs: int):
+    counter = RoundTripCounter(driver)
+    durations, trips, filled = [], [], []
+    for run_index in range(runs):
+        agent = FormAgent(url, driver=driver)
+        state = get_form_fields(FormState(url=url), agent)
+        # Same values for both modes so only the fill path differs
+        generate_inputs(state.fields, seed=run_index)
+        counter.reset()
+        started = time.perf_counter()
+        fill(state.fields, agent)
+        durations.append(time.perf_counter() - started)
+        trips.append(counter.count)
+        filled.append(sum(field.filled for field in state.fields))
+    counter.detach()
+    print(f"{name:>9}: {statistics.mean(filled):.0f} fields filled, {statistics.mean(trips):.0f} round trips, "
+          f"mean {statistics.mean(durations) * 1000:.1f}ms  max {max(durations) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server, url = serve()
+    driver = create_headless_driver()
+    try:
+        run("per_field", per_field, driver, url, args.runs)
+        run("bulk", fill_fields_bulk, driver, url, args.runs)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
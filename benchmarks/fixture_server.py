@@ -0,0 +1,265 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+# Static replica of the App.js form (same ids, labels and behaviour, no JS toolchain needed)
+APP_FORM_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Complete Form Demo</title></head>
+<body>
+<h2>Complete Form Demo</h2>
+<form id="myForm">
+  <div><label for="text">Text:</label><input type="text" id="text" name="text"></div>
+  <div><label for="email">Email:</label><input type="email" id="email" name="email"></div>
+  <div><label for="password">Password:</label><input type="password" id="password" name="password"></div>
+  <div><label for="number">Number:</label><input type="number" id="number" name="number"></div>
+  <div><label for="tel">Telephone:</label><input type="tel" id="tel" name="tel"></div>
+  <div><label for="url">URL:</label><input type="url" id="url" name="url"></div>
+  <div><label for="date">Date:</label><input type="date" id="date" name="date"></div>
+  <div><label for="time">Time:</label><input type="time" id="time" name="time"></div>
+  <div><label for="datetime">DateTime:</label><input type="datetime-local" id="datetime" name="datetime"></div>
+  <div><label for="month">Month:</label><input type="month" id="month" name="month"></div>
+  <div><label for="week">Week:</label><input type="week" id="week" name="week"></div>
+  <div><label for="color">Color:</label><input type="color" id="color" name="color" value="#000000"></div>
+  <div><label for="range">Range (50):</label><input type="range" id="range" name="range" min="0" max="100" value="50"></div>
+  <div><label for="file">File:</label><input type="file" id="file" name="file"></div>
+  <div><label for="search">Search:</label><input type="search" id="search" name="search"></div>
+  <div>
+    <label><input type="checkbox" id="checkbox" name="checkbox">
+    <span>I agree to terms (triggers extra field)</span></label>
+  </div>
+  <div id="extraInfoGroup"></div>
+  <div>
+    <label>Radio Options:</label>
+    <label><input type="radio" name="radio" value="option1" checked><span>option1</span></label>
+    <label><input type="radio" name="radio" value="option2"><span>option2</span></label>
+    <label><input type="radio" name="radio" value="option3"><span>option3</span></label>
+  </div>
+  <div>
+    <label for="select">Payment Method:</label>
+    <select id="select" name="select">
+      <option value="">Select payment method</option>
+      <option value="Credit Card">Credit Card</option>
+      <option value="PayPal">PayPal</option>
+      <option value="Bank Transfer">Bank Transfer</option>
+    </select>
+  </div>
+  <div>
+    <label for="multiselect">Features (Multi-Select):</label>
+    <select id="multiselect" name="multiselect" multiple size="4">
+      <option value="Feature 1">Feature 1</option>
+      <option value="Feature 2">Feature 2</option>
+      <option value="Feature 3">Feature 3</option>
+      <option value="Feature 4">Feature 4</option>
+    </select>
+  </div>
+  <div><label for="textarea">Comments:</label><textarea id="textarea" name="textarea" rows="4"></textarea></div>
+  <button type="submit">Submit</button>
+</form>
+<script>
+  // Mirror App.js: the checkbox conditionally renders the extraInfo field
+  document.getElementById('checkbox').addEventListener('change', function (e) {
+    var group = document.getElementById('extraInfoGroup');
+    if (e.target.checked) {
+      group.innerHTML = '<label for="extraInfo">Extra Information (if agreed):</label>' +
+        '<input type="text" id="extraInfo" name="extraInfo">';
+    } else {
+      group.innerHTML = '';
+    }
+  });
+  document.getElementById('range').addEventListener('input', function (e) {
+    document.querySelector('label[for="range"]').textContent = 'Range (' + e.target.value + '):';
+  });
+  document.getElementById('myForm').addEventListener('submit', function (e) {
+    e.preventDefault();
+    alert('Form submitted successfully!');
+  });
+</script>
+</body>
+</html>
+"""
+
+
+# /heavy adds what a real page drags along: images, a web font, a video and a third-party
+# script (served from "localhost" while the page is on 127.0.0.1). Assets are slow and large.
+HEAVY_ASSETS_HTML = """
+<style>@font-face { font-family: Brand; src: url(/assets/brand.woff2); } body { font-family: Brand, sans-serif; }</style>
+{images}
+<video src="/assets/intro.mp4" autoplay muted></video>
+<script src="http://localhost:{port}/assets/tracker.js"></script>
+"""
+ASSET_TYPES = {".png": "image/png", ".woff2": "font/woff2", ".mp4": "video/mp4", ".js": "application/javascript"}
+ASSET_SIZE = 256 * 1024
+ASSET_DELAY = 0.1
+HEAVY_IMAGES = 8
+
+
+# Generated forms: /generated?fields=20&dynamic=2&slow=2&slow_delay=300&seed=0
+# - fields: static controls, cycling through every type fill_field handles
+# - dynamic: checkboxes that each reveal one more text field when checked
+# - slow: text fields rendered slow_delay ms after load (spread over the delay)
+GENERATED_TYPES = [
+    "text", "email", "password", "number", "tel", "url", "date", "time", "datetime-local", "month",
+    "week", "color", "range", "file", "search", "checkbox", "radio", "select", "multiselect", "textarea",
+]
+GENERATED_OPTIONS = ["Option A", "Option B", "Option C", "Option D"]
+GENERATED_PARAMETERS = ("fields", "dynamic", "slow", "slow_delay", "seed")
+
+GENERATED_SCRIPT = """
+<script>
+  document.querySelectorAll('[data-reveals]').forEach(function (box) {
+    box.addEventListener('change', function (e) {
+      var group = document.getElementById(e.target.getAttribute('data-reveals'));
+      var id = group.id + 'Field';
+      group.innerHTML = e.target.checked
+        ? '<label for="' + id + '">' + group.getAttribute('data-label') + ':</label><input type="text" id="' + id + '">'
+        : '';
+    });
+  });
+  document.querySelectorAll('[data-slow]').forEach(function (group) {
+    setTimeout(function () {
+      var id = group.id + 'Field';
+      group.innerHTML = '<label for="' + id + '">' + group.getAttribute('data-label') + ':</label><input type="text" id="' + id + '">';
+    }, Number(group.getAttribute('data-slow')));
+  });
+  document.getElementById('myForm').addEventListener('submit', function (e) {
+    e.preventDefault();
+    alert('Form submitted successfully!');
+  });
+</script>
+"""
+
+
+def generated_control(index: int, field_type: str, rng: random.Random) -> str:
+    field_id = f"f{index}_{field_type.replace('-', '_')}"
+    label = f"Field {index} ({field_type})"
+    if field_type in ("select", "multiselect"):
+        options = rng.sample(GENERATED_OPTIONS, 3)
+        if field_type == "select":
+            options.insert(0, "Select an option")
+        multiple = " multiple" if field_type == "multiselect" else ""
+        choices = "".join(f'<option value="{o}">{o}</option>' for o in options)
+        return f'<div><label for="{field_id}">{label}:</label><select id="{field_id}"{multiple}>{choices}</select></div>'
+    if field_type == "textarea":
+        return f'<div><label for="{field_id}">{label}:</label><textarea id="{field_id}" rows="3"></textarea></div>'
+    if field_type == "checkbox":
+        return f'<div><label><input type="checkbox" id="{field_id}"><span>{label}</span></label></div>'
+    if field_type == "radio":
+        # Same values as App.js, which the rule-based generator picks from
+        return "<div><label>" + label + ":</label>" + "".join(
+            f'<label><input type="radio" id="{field_id}_{value}" name="{field_id}" value="{value}"><span>{value}</span></label>'
+            for value in ("option1", "option2", "option3")
+        ) + "</div>"
+    extra = ' min="0" max="100" value="50"' if field_type == "range" else ""
+    return f'<div><label for="{field_id}">{label}:</label><input type="{field_type}" id="{field_id}"{extra}></div>'
+
+
+def generate_form_html(fields: int = 20, dynamic: int = 2, slow: int = 2, slow_delay: int = 300, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [generated_control(i, GENERATED_TYPES[i % len(GENERATED_TYPES)], rng) for i in range(fields)]
+    for i in range(dynamic):
+        parts.append(
+            f'<div><label><input type="checkbox" id="reveal{i}" data-reveals="revealed{i}">'
+            f'<span>Show extra field {i}</span></label></div>'
+            f'<div id="revealed{i}" data-label="Extra field {i}"></div>'
+        )
+    for i in range(slow):
+        delay = slow_delay * (i + 1) // slow
+        parts.append(f'<div id="slow{i}" data-slow="{delay}" data-label="Slow field {i}"></div>')
+    return (
+        '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>Generated Form</title></head>\n<body>\n'
+        f'<h2>Generated Form ({fields} fields)</h2>\n<form id="myForm">\n'
+        + "\n".join(parts)
+        + '\n<button type="submit">Submit</button>\n</form>\n'
+        + GENERATED_SCRIPT
+        + "</body>\n</html>\n"
+    )
+
+
+# Consent wall in front of the App.js form: /gated shows an accept button (after GATE_DELAY),
+# which sets a cookie and moves on to /gated/form; /gated/form without the cookie sends you back
+GATE_DELAY = 0.5
+GATE_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Consent</title></head>
+<body>
+<h2>Before you continue</h2>
+<button id="accept" type="button">Accept all</button>
+<script>
+document.getElementById('accept').addEventListener('click', function () {
+  document.cookie = 'consent=1; path=/';
+  localStorage.setItem('consent', JSON.stringify({analytics: false, at: Date.now()}));
+  location.href = '/gated/form';
+});
+</script>
+</body>
+</html>
+"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/assets/"):
+            return self.send_asset()
+        html = APP_FORM_HTML
+        if self.path.startswith("/gated"):
+            if not self.path.startswith("/gated/form"):
+                time.sleep(GATE_DELAY)
+                html = GATE_HTML
+            elif "consent=1" not in (self.headers.get("Cookie") or ""):
+                self.send_response(302)
+                self.send_header("Location", "/gated")
+                self.end_headers()
+                return
+        if self.path.startswith("/generated"):
+            query = {k: int(v[0]) for k, v in parse_qs(urlsplit(self.path).query).items()}
+            html = generate_form_html(**{k: v for k, v in query.items() if k in GENERATED_PARAMETERS})
+        if self.path.startswith("/heavy"):
+            images = "".join(f'<img src="/assets/photo-{i}.png" width="64" height="64">' for i in range(HEAVY_IMAGES))
+            assets = HEAVY_ASSETS_HTML.replace("{images}", images).replace("{port}", str(self.server.server_address[1]))
+            html = html.replace("<h2>", assets + "<h2>", 1)
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_asset(self):
+        time.sleep(ASSET_DELAY)
+        extension = self.path[self.path.rfind("."):]
+        body = b"/* tracker */" if extension == ".js" else bytes(ASSET_SIZE)
+        self.send_response(200)
+        self.send_header("Content-Type", ASSET_TYPES.get(extension, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+# Start the fixture server on a background thread; port 0 picks a free port
+def serve(host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+# Path of a generated form on the fixture server
+def generated_path(**parameters) -> str:
+    return "generated?" + urlencode({k: v for k, v in parameters.items() if k in GENERATED_PARAMETERS})
+
+
+if __name__ == "__main__":
+    server, url = serve(port=3000)
+    print(f"Serving form fixture at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,81 @@
+# Compare value generation with the previous per-call lambda table against the shared
+# ValueGenerator batch on synthetic schemas with select options and constraints.
+# Run from the repository root: python -m benchmarks.generate_bench --fields 20 1000 --runs 50
+import argparse
+import random
+import string
+import time
+from value_generator import ValueGenerator
+from benchmarks.fixture_server import GENERATED_TYPES
+
+
+def schema(count: int) -> list:
+    fields = []
+    for index in range(count):
+        field_type = GENERATED_TYPES[index % len(GENERATED_TYPES)]
+        field = {"id": f"field_{index}", "label": f"Field {index}", "type": field_type, "name": f"field_{index}"}
+        if field_type in ("select", "multiselect", "radio"):
+            field["options"] = ["Select...", "Alpha", "Beta", "Gamma"] if field_type != "radio" else ["Alpha"]
+        if field_type == "text" and index % 3 == 0:
+            field["pattern"] = r"[A-Z]{2}\d{4}"
+        if field_type == "number":
+            field.update(min="10", max="20")
+        if field_type == "textarea":
+            field["maxlength"] = 12
+        fields.append(field)
+    return fields
+
+
+# The generator every call used to build: a fresh table of lambdas per field
+def legacy_generate(field: dict):
+    value_generators = {
+        "text": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
+        "email": lambda: f"{''.join(random.choices(string.ascii_lowercase, k=5))}@example.com",
+        "password": lambda: ''.join(random.choices(string.ascii_letters + string.digits, k=10)),
+        "number": lambda: str(random.randint(1, 100)),
+        "tel": lambda: f"{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
+        "url": lambda: f"https://{''.join(random.choices(string.ascii_lowercase, k=5))}.com",
+        "date": lambda: "2023-10-15",
+        "time": lambda: "12:34",
+        "datetime-local": lambda: "2023-10-15T12:34",
+        "month": lambda: "2023-10",
+        "week": lambda: "2023-W42",
+        "color": lambda: "#{:06x}".format(random.randint(0, 0xFFFFFF)),
+        "range": lambda: str(random.randint(0, 100)),
+        "file": lambda: "path/to/file.txt",
+        "search": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
+        "checkbox": lambda: random.choice([True, False]),
+        "radio": lambda: random.choice(["option1", "option2", "option3"]),
+        "select": lambda: random.choice(["Credit Card", "PayPal", "Bank Transfer"]),
+        "textarea": lambda: ' '.join(''.join(random.choices(string.ascii_letters, k=5)) for _ in range(3)),
+        "multiselect": lambda: random.sample(["Feature 1", "Feature 2", "Feature 3", "Feature 4"], 2),
+    }
+    return value_generators.get(field["type"], lambda: "default")()
+
+
+def timed(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fields", type=int, nargs="+", default=[20, 1000])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    for count in args.fields:
+        fields = schema(count)
+        legacy = timed(lambda: [legacy_generate(field) for field in fields], args.runs)
+        batch = timed(lambda: ValueGenerator(seed=1).generate(fields), args.runs)
+        same = ValueGenerator(seed=1).generate(fields) == ValueGenerator(seed=1).generate(fields)
+        print(f"{count:>5} fields: legacy {legacy * 1000:.3f}ms  batch {batch * 1000:.3f}ms  "
+              f"({legacy / batch:.1f}x)  reproducible with a seed: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Compare script.py's one-field-per-iteration loop with the compiled LangGraph (batched fill,
+# rediscovery only after revealing batches) on generated forms of increasing size.
+# Reports iterations (loop passes / fill batches), discovery passes, filled fields and wall time.
+# Run from the repository root: python -m benchmarks.graph_bench --sizes 10 50 200 --runs 3
+import argparse
+import statistics
+import time
+from browser_profile import create_driver
+from driver_stats import RoundTripCounter
+from script import FormAgent, run_fill_graph, run_fill_loop
+from benchmarks.fixture_server import generated_path, serve
+
+
+def run(name: str, fill, driver, url: str, runs: int, size: int):
+    counter = RoundTripCounter(driver)
+    walls, iterations, filled, trips = [], [], [], []
+    for _ in range(runs):
+        agent = FormAgent(url, driver=driver)
+        counter.reset()
+        started = time.perf_counter()
+        state = fill(agent)
+        walls.append(time.perf_counter() - started)
+        iterations.append(state.iteration_count)
+        filled.append(sum(field.filled for field in state.fields))
+        trips.append(counter.count)
+    print(f"{size:>5} fields {name:>5}: wall {statistics.median(walls):.3f}s  "
+          f"iterations {statistics.median(iterations):.0f}  filled {statistics.median(filled):.0f}  "
+          f"round trips {statistics.median(trips):.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    driver = create_driver()
+    try:
+        for size in args.sizes:
+            url = base_url + generated_path(fields=size, dynamic=1)
+            # The loop keeps its default cap of 30 iterations, as main() runs it
+            run("loop", run_fill_loop, driver, url, args.runs, size)
+            run("graph", run_fill_graph, driver, url, args.runs, size)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
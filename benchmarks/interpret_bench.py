@@ -0,0 +1,73 @@
+# Compare per-field, batch and async LLM interpretation offline with the fake chat model.
+# Run from the repository root: python -m benchmarks.interpret_bench --fields 20 --latency 0.2 --error-rate 0.1
+import argparse
+import asyncio
+import time
+from form_agent import AIFormAgent, Field
+from fake_llm import FakeFormLLM
+from llm_pipeline import pipeline_stats
+from value_cache import ValueCache
+from value_generator import ValueGenerator
+
+FIELD_TEMPLATES = [
+    ("Email:", "email", None),
+    ("First name:", "text", None),
+    ("Telephone:", "tel", None),
+    ("Payment Method:", "select", ["Select payment method", "Credit Card", "PayPal", "Bank Transfer"]),
+    ("Features (Multi-Select):", "multiselect", ["Feature 1", "Feature 2", "Feature 3", "Feature 4"]),
+    ("I agree to terms", "checkbox", None),
+    ("Number:", "number", None),
+    ("Comments:", "textarea", None),
+]
+
+
+def make_fields(count: int) -> list:
+    return [
+        Field(id=f"field{i}", label=label, type=field_type, options=options)
+        for i, (label, field_type, options) in ((i, FIELD_TEMPLATES[i % len(FIELD_TEMPLATES)]) for i in range(count))
+    ]
+
+
+# An agent without a browser (interpretation never touches the driver) and with an empty cache
+def offline_agent(llm) -> AIFormAgent:
+    agent = object.__new__(AIFormAgent)
+    agent.llm = llm
+    agent.value_cache = ValueCache()
+    agent.llm_calls = 0
+    agent.fallback_ids = set()
+    agent.cached_ids = set()
+    agent.value_generator = ValueGenerator()
+    return agent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--omit-rate", type=float, default=0.0, help="fraction of batch entries the fake drops")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake waits per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake calls that raise")
+    args = parser.parse_args()
+    fields = make_fields(args.fields)
+
+    def fake(**overrides):
+        return FakeFormLLM(latency=args.latency, error_rate=args.error_rate, **overrides)
+
+    agent = offline_agent(fake())
+    started = time.perf_counter()
+    per_field = {field.id: agent.interpret_field(field) for field in fields}
+    print(f"per_field: {agent.llm_calls} LLM calls, {len(per_field)} values, {time.perf_counter() - started:.3f}s")
+
+    agent = offline_agent(fake(omit_rate=args.omit_rate))
+    started = time.perf_counter()
+    batch = agent.interpret_fields(fields)
+    print(f"    batch: {agent.llm_calls} LLM calls, {len(batch)} values, {time.perf_counter() - started:.3f}s")
+
+    agent = offline_agent(fake())
+    started = time.perf_counter()
+    concurrent = asyncio.run(agent.ainterpret_fields(fields))
+    print(f"    async: {agent.llm_calls} LLM calls, {len(concurrent)} values, {time.perf_counter() - started:.3f}s")
+    print(f"pipeline: {pipeline_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Fire concurrent /process-form requests at the API against the local form fixture.
+# Run from the repository root: python -m benchmarks.load_test --app form_api --concurrency 4
+import argparse
+import asyncio
+import importlib
+import statistics
+import threading
+import time
+import httpx
+import uvicorn
+from benchmarks.fixture_server import serve
+
+
+# Run the FastAPI app in-process on a background thread
+def start_api(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API failed to start")
+        time.sleep(0.05)
+    return server
+
+
+async def post_form(client: httpx.AsyncClient, api_url: str, form_url: str):
+    started = time.perf_counter()
+    response = await client.post(f"{api_url}/process-form", params={"url": form_url})
+    return response.status_code, time.perf_counter() - started
+
+
+async def run_load(api_url: str, form_url: str, concurrency: int):
+    async with httpx.AsyncClient(timeout=300) as client:
+        # One warm-up request gives the single-form baseline
+        _, single = await post_form(client, api_url, form_url)
+        started = time.perf_counter()
+        results = await asyncio.gather(*[post_form(client, api_url, form_url) for _ in range(concurrency)])
+        wall = time.perf_counter() - started
+        stats = (await client.get(f"{api_url}/executor/stats")).json()
+    return single, wall, results, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="form_api", help="module exposing the FastAPI app")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    fixture, form_url = serve()
+    api = start_api(importlib.import_module(args.app).app, args.port)
+    try:
+        single, wall, results, stats = asyncio.run(
+            run_load(f"http://127.0.0.1:{args.port}", form_url, args.concurrency)
+        )
+    finally:
+        api.should_exit = True
+        fixture.shutdown()
+
+    latencies = [latency for status, latency in results if status == 200]
+    statuses = [status for status, _ in results]
+    print(f"single form latency: {single:.3f}s")
+    print(f"{args.concurrency} concurrent requests: wall {wall:.3f}s "
+          f"({wall / single:.2f}x single), statuses {dict((s, statuses.count(s)) for s in set(statuses))}")
+    if latencies:
+        print(f"per-request latency: mean {statistics.mean(latencies):.3f}s max {max(latencies):.3f}s")
+    print(f"executor stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Compare per-request browser startup with pooled sessions against the local form fixture.
+# Run from the repository root: python -m benchmarks.pool_bench --runs 10 --size 2
+import argparse
+import statistics
+import time
+from browser_pool import BrowserPool, create_headless_driver
+from benchmarks.fixture_server import serve
+
+
+def time_cold(url: str, runs: int) -> list:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        driver = create_headless_driver()
+        driver.get(url)
+        driver.quit()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def time_pooled(pool: BrowserPool, url: str, runs: int) -> list:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with pool.session() as driver:
+            driver.get(url)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+# A returned session must come back blank: no cookies, no storage, on about:blank
+def check_reset(pool: BrowserPool, url: str):
+    with pool.session() as driver:
+        driver.get(url)
+        driver.add_cookie({"name": "pool_check", "value": "1"})
+        driver.execute_script("localStorage.setItem('pool_check', '1'); sessionStorage.setItem('pool_check', '1');")
+    with pool.session() as driver:
+        assert driver.current_url == "about:blank", driver.current_url
+        driver.get(url)
+        assert driver.get_cookie("pool_check") is None, "cookie survived reset"
+        assert driver.execute_script("return localStorage.getItem('pool_check')") is None, "localStorage survived reset"
+        assert driver.execute_script("return sessionStorage.getItem('pool_check')") is None, "sessionStorage survived reset"
+    print("Reset check passed")
+
+
+def check_recycle(url: str):
+    pool = BrowserPool(size=1, max_uses=2)
+    pool.start()
+    for _ in range(3):
+        with pool.session() as driver:
+            driver.get(url)
+    pool.close()
+    stats = pool.stats()
+    assert stats["recycled"] >= 1 and stats["created"] >= 2, stats
+    print("Recycle check passed")
+
+
+def summarize(name: str, durations: list):
+    print(f"{name:>8}: mean {statistics.mean(durations):.3f}s  "
+          f"min {min(durations):.3f}s  max {max(durations):.3f}s  (n={len(durations)})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--size", type=int, default=2)
+    args = parser.parse_args()
+
+    server, url = serve()
+    pool = BrowserPool(size=args.size)
+    try:
+        pool.start()
+        check_reset(pool, url)
+        check_recycle(url)
+        summarize("cold", time_cold(url, args.runs))
+        summarize("pooled", time_pooled(pool, url, args.runs))
+        print(f"Pool stats: {pool.stats()}")
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
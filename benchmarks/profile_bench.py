@@ -0,0 +1,86 @@
+# Compare stock Chrome with the performance profile: page-ready time and per-session RSS
+# (chromedriver plus every Chrome process it started) on the heavy form fixture.
+# Run from the repository root: python -m benchmarks.profile_bench --runs 5 [--block-third-party]
+import argparse
+import os
+import statistics
+import time
+from browser_profile import BrowserProfile, create_driver
+from driver_backend import SeleniumBackend
+from waits import FormWaiter
+from benchmarks.fixture_server import serve
+
+
+def process_tree_rss(pid: int) -> int:
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [root, *root.children(recursive=True)])
+    except ImportError:
+        pass
+    # No psutil: walk /proc (Linux only)
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except OSError:
+                continue
+    tree, frontier = {pid}, [pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [p for p, pp in parents.items() if pp == parent and p not in tree]
+        tree.update(children)
+        frontier.extend(children)
+    rss = 0
+    for p in tree:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                rss += next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            continue
+    return rss
+
+
+def run(name: str, profile: BrowserProfile, url: str, runs: int):
+    driver = create_driver(profile)
+    try:
+        ready = []
+        for _ in range(runs):
+            driver.get("about:blank")
+            started = time.perf_counter()
+            driver.get(url)
+            FormWaiter(SeleniumBackend(driver)).page_ready()
+            ready.append(time.perf_counter() - started)
+        rss = process_tree_rss(driver.service.process.pid)
+        blocked = driver.request_blocker.stats() if driver.request_blocker else {}
+    finally:
+        driver.quit()
+    # page_ready includes the field-set quiet period, identical for both profiles
+    print(f"{name:>11}: page ready mean {statistics.mean(ready) * 1000:.0f}ms  max {max(ready) * 1000:.0f}ms  "
+          f"RSS {rss / 2 ** 20:.0f}MB  requests {blocked or 'not intercepted'}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--headed-default", action="store_true", help="run the stock profile with a visible window")
+    parser.add_argument("--block-third-party", action="store_true", help="also block the fixture's third-party script")
+    args = parser.parse_args()
+
+    server, url = serve()
+    try:
+        baseline = BrowserProfile.default()
+        # Headless stock Chrome by default so the comparison isolates the other settings
+        baseline.headless = not args.headed_default
+        run("stock", baseline, url + "heavy", args.runs)
+        performance = BrowserProfile.performance()
+        performance.block_third_party = performance.block_third_party or args.block_third_party
+        run("performance", performance, url + "heavy", args.runs)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Cost of recording field results on the request path, and of the /results/stats aggregates,
+# for a synthetic history written through ResultStore into a scratch SQLite file.
+# Run from the repository root: python -m benchmarks.results_bench --forms 20000 --fields 50
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+from result_store import ResultStore
+from benchmarks.fixture_server import GENERATED_TYPES
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--forms", type=int, default=20000)
+    parser.add_argument("--fields", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultStore(path=os.path.join(directory, "results.db"))
+        calls = []
+        started = time.perf_counter()
+        for form in range(args.forms):
+            fields = [
+                SimpleNamespace(id=f"field_{index}", type=GENERATED_TYPES[index % len(GENERATED_TYPES)],
+                                label=f"Field {index}", filled=rng.random() > 0.05)
+                for index in range(args.fields)
+            ]
+            seconds = {field.id: rng.expovariate(50) for field in fields}
+            sources = {field.id: rng.choice(("llm", "cache", "rule")) for field in fields}
+            call = time.perf_counter()
+            store.record_form(f"http://forms.test/{form % 100}", f"layout-{form % 10}", fields, seconds, sources)
+            calls.append(time.perf_counter() - call)
+        recorded = time.perf_counter() - started
+        store.flush()
+        written = time.perf_counter() - started
+        stats = store.stats()
+
+        queried = time.perf_counter()
+        report = store.query_stats()
+        queried = time.perf_counter() - queried
+        calls.sort()
+        print(f"record_form: p50 {statistics.median(calls) * 1e6:.0f}us  p99 {calls[int(len(calls) * 0.99)] * 1e6:.0f}us  "
+              f"max {calls[-1] * 1000:.2f}ms  ({args.forms} forms queued in {recorded:.2f}s)")
+        print(f"writer: {stats['fields']} field rows in {stats['batches']} batches, all written after {written:.2f}s  "
+              f"dropped forms {stats['dropped_forms']}  file {os.path.getsize(store.path) / 1e6:.1f}MB")
+        print(f"query_stats over {report['fields']} rows: {queried * 1000:.0f}ms  "
+              f"worst type {report['by_type'][0]['type']} ({report['by_type'][0]['failure_rate']:.2%} failed)")
+
+
+if __name__ == "__main__":
+    main()
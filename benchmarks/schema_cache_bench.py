@@ -0,0 +1,75 @@
+# Compare a cold run (full discovery and interpretation) with repeat runs served from the
+# form schema cache, using the AI agent with the offline fake LLM on the App.js fixture.
+# Run from the repository root: python -m benchmarks.schema_cache_bench --runs 5 --latency 0.2
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+from browser_pool import create_headless_driver
+from dom_extract import extract_fields
+from driver_backend import SeleniumBackend
+from driver_stats import RoundTripCounter
+from fake_llm import FakeFormLLM
+from schema_cache import SchemaCache, form_fingerprint
+from value_cache import ValueCache
+from benchmarks.fixture_server import serve
+
+
+def time_call(fn, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return statistics.mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake LLM call")
+    parser.add_argument("--interpret-mode", default="batch", choices=["per_field", "batch", "async"])
+    args = parser.parse_args()
+
+    os.environ["FORM_AGENT_LLM"] = "fake"
+    import form_agent
+
+    server, url = serve()
+    driver = create_headless_driver()
+    try:
+        driver.get(url)
+        extract = time_call(lambda: extract_fields(driver), 20)
+        fingerprint = time_call(lambda: form_fingerprint(SeleniumBackend(driver)), 20)
+        print(f"discovery {extract * 1000:.1f}ms  fingerprint {fingerprint * 1000:.1f}ms per call")
+
+        # Fresh caches so the first run is a genuine miss; the value cache is per run so only the schema cache helps
+        form_agent.schema_cache = SchemaCache(path=None)
+        form_agent.create_llm = lambda: FakeFormLLM(latency=args.latency)
+
+        class SingleDriverPool:
+            @contextlib.contextmanager
+            def session(self):
+                yield driver
+
+        form_agent.browser_pool = SingleDriverPool()
+        counter = RoundTripCounter(driver)
+        for run in range(args.runs + 1):
+            form_agent.value_cache = ValueCache(path=None)
+            counter.reset()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = form_agent.fill_form(url, interpret_mode=args.interpret_mode)
+            elapsed = time.perf_counter() - started
+            print(f"{'cold' if run == 0 else 'warm':>5}: {elapsed * 1000:7.0f}ms  {result.llm_calls} LLM calls  "
+                  f"{counter.count} round trips  schema cache hit: {result.schema_cache_hit}")
+        counter.detach()
+        print(f"Schema cache: {form_agent.schema_cache.stats()}")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Bootstrap time with and without session snapshots, through form_api.fill_form on a pooled
+# browser. The fixture's /gated form sits behind a consent page that has to be clicked through;
+# with snapshots only the first run does that, later runs open the form directly.
+# Run from the repository root: python -m benchmarks.snapshot_bench --runs 5
+import argparse
+import os
+import statistics
+
+os.environ.setdefault("SESSION_SNAPSHOT_PATH", "")  # In-memory store: every bench starts cold
+
+import form_api
+from benchmarks.fixture_server import serve
+
+
+def run(name: str, url: str, runs: int, session_snapshot: bool):
+    form_api.session_snapshots.clear()
+    reports, navigation = [], []
+    for _ in range(runs):
+        result = form_api.fill_form(url, include_timings=True, session_snapshot=session_snapshot, warmup=["#accept"])
+        reports.append(result.session_snapshot)
+        navigation.append(result.timings["phases"]["navigation"])
+    restored = sum(report["restored"] for report in reports)
+    saved = [report["saved_seconds"] for report in reports if report["restored"]] or [0.0]
+    print(f"{name:>12}: navigation first {navigation[0]:.3f}s  repeat median {statistics.median(navigation[1:] or navigation):.3f}s  "
+          f"restored {restored}/{runs}  saved per restored run {statistics.median(saved):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    form_api.browser_pool.start(1)
+    try:
+        run("no snapshot", base_url + "gated", args.runs, session_snapshot=False)
+        run("snapshot", base_url + "gated", args.runs, session_snapshot=True)
+    finally:
+        form_api.browser_pool.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
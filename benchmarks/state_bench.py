@@ -0,0 +1,99 @@
+# Compare the in-place FormState with the previous copy-per-step state on synthetic forms.
+# No browser is involved: only state bookkeeping and value generation are timed.
+# Run from the repository root: python -m benchmarks.state_bench --sizes 10 100 1000
+import argparse
+import contextlib
+import io
+import time
+from typing import List, Optional
+from pydantic import BaseModel, Field as PydanticField
+from script import Field, FormState, find_unfilled_field, generate_input_for_field, has_new_or_unfilled_fields
+
+FIELD_TYPES = ["text", "email", "number", "tel", "date", "checkbox", "textarea"]
+
+
+def synthetic_payload(size: int) -> List[dict]:
+    return [{"id": f"field{i}", "label": f"Field {i}", "type": FIELD_TYPES[i % len(FIELD_TYPES)]} for i in range(size)]
+
+
+# The state model and step pattern the loop used before: a new validated FormState per step
+class CopyingFormState(BaseModel):
+    url: str
+    fields: List[Field] = PydanticField(default_factory=list)
+    current_field_id: Optional[str] = None
+    initial_fields_fetched: bool = False
+    submission_attempted: bool = False
+    iteration_count: int = 0
+    max_iterations: int = 30
+
+
+def copying_step(state: CopyingFormState, payload: List[dict]) -> CopyingFormState:
+    current_ids = {field.id for field in state.fields}
+    fields = state.fields + [Field(**item) for item in payload if item["id"] not in current_ids]
+    state = CopyingFormState(url=state.url, fields=fields, initial_fields_fetched=True,
+                             iteration_count=state.iteration_count + 1, max_iterations=state.max_iterations)
+    unfilled = [field for field in state.fields if not field.filled]
+    if not unfilled:
+        return state
+    state = CopyingFormState(url=state.url, fields=state.fields, current_field_id=unfilled[0].id,
+                             iteration_count=state.iteration_count, max_iterations=state.max_iterations)
+    fields = state.fields.copy()
+    current = next(field for field in fields if field.id == state.current_field_id)
+    current.value = "value"
+    fields = [f if f.id != current.id else current for f in fields]
+    state = CopyingFormState(url=state.url, fields=fields, current_field_id=current.id,
+                             iteration_count=state.iteration_count, max_iterations=state.max_iterations)
+    fields = state.fields.copy()
+    current.filled = True
+    fields = [f if f.id != current.id else current for f in fields]
+    return CopyingFormState(url=state.url, fields=fields, current_field_id=current.id,
+                            iteration_count=state.iteration_count, max_iterations=state.max_iterations)
+
+
+def run_copying(payload: List[dict]) -> int:
+    state = CopyingFormState(url="bench", max_iterations=len(payload) + 1)
+    while any(not field.filled for field in state.fields) or not state.initial_fields_fetched:
+        state = copying_step(state, payload)
+    return state.iteration_count
+
+
+def run_in_place(payload: List[dict]) -> int:
+    state = FormState("bench", max_iterations=len(payload) + 1)
+    while True:
+        # Same discovery contract as get_form_fields: the whole form is read, only new ids are validated
+        state.add_fields([Field(**item) for item in payload if item["id"] not in state])
+        state.iteration_count += 1
+        if not has_new_or_unfilled_fields(state):
+            break
+        find_unfilled_field(state)
+        generate_input_for_field(state, agent=None)
+        state.mark_filled(state.current_field)
+    return state.iteration_count
+
+
+def timed(fn, payload, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # The steps log every field
+            fn(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        payload = synthetic_payload(size)
+        copying = timed(run_copying, payload, args.runs)
+        in_place = timed(run_in_place, payload, args.runs)
+        print(f"{size:>5} fields: copying {copying * 1000:9.1f}ms  in-place {in_place * 1000:8.1f}ms  "
+              f"({copying / in_place:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
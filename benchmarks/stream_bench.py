@@ -0,0 +1,66 @@
+# Time to first progress event with /process-form/stream against the buffered /process-form
+# response, on generated forms of increasing size. Also reports the event count and the
+# largest event, which stays one field's worth regardless of form size.
+# Run from the repository root: python -m benchmarks.stream_bench --app form_api --sizes 20 200
+import argparse
+import importlib
+import json
+import statistics
+import time
+import httpx
+from benchmarks.fixture_server import generated_path, serve
+from benchmarks.load_test import start_api
+
+
+def buffered(client: httpx.Client, api_url: str, form_url: str) -> float:
+    started = time.perf_counter()
+    client.post(f"{api_url}/process-form", params={"url": form_url}).raise_for_status()
+    return time.perf_counter() - started
+
+
+def streamed(client: httpx.Client, api_url: str, form_url: str):
+    started = time.perf_counter()
+    first_field, events, largest = None, 0, 0
+    with client.stream("POST", f"{api_url}/process-form/stream", params={"format": "ndjson"}, json={"url": form_url}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            events += 1
+            largest = max(largest, len(line))
+            if first_field is None and event["event"] == "field":
+                first_field = time.perf_counter() - started
+            if event["event"] == "error":
+                raise RuntimeError(event["error"])
+    return first_field, time.perf_counter() - started, events, largest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="form_api", help="module exposing the FastAPI app")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    fixture, base_url = serve()
+    api = start_api(importlib.import_module(args.app).app, args.port)
+    api_url = f"http://127.0.0.1:{args.port}"
+    try:
+        with httpx.Client(timeout=600) as client:
+            for size in args.sizes:
+                form_url = base_url + generated_path(fields=size)
+                whole = [buffered(client, api_url, form_url) for _ in range(args.runs)]
+                runs = [streamed(client, api_url, form_url) for _ in range(args.runs)]
+                print(f"{size:>5} fields: buffered response {statistics.median(whole):.3f}s  "
+                      f"stream first field {statistics.median(r[0] for r in runs):.3f}s  "
+                      f"stream total {statistics.median(r[1] for r in runs):.3f}s  "
+                      f"events {runs[0][2]}  largest event {max(r[3] for r in runs)} bytes")
+    finally:
+        api.should_exit = True
+        fixture.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# Reproducible end-to-end benchmark: FormAgent (script.py fill loop), AIFormAgent with the fake
+# LLM, and the FastAPI endpoint, all against generated forms on the local fixture server.
+# Reports p50/p95 latency, throughput and memory, and writes them to JSON for comparison.
+# Run from the repository root:
+#   python -m benchmarks.suite --targets form_agent ai_agent api --runs 10 --fields 20
+#   python -m benchmarks.suite --compare benchmark-results/suite-20240517-093000.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+# Offline and reproducible: the fake LLM, and caches kept in memory rather than in shared SQLite files
+os.environ.setdefault("FORM_AGENT_LLM", "fake")
+os.environ.setdefault("FORM_SCHEMA_CACHE_PATH", "")
+
+import httpx
+from benchmarks.fixture_server import generated_path, serve
+from benchmarks.load_test import start_api
+from benchmarks.profile_bench import process_tree_rss
+
+TARGETS = ("form_agent", "ai_agent", "api")
+RESULTS_DIR = "benchmark-results"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# Peak RSS of this process and every process it started (chromedriver, Chrome), sampled on a thread
+class MemorySampler:
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = 0
+        self.last = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        self.last = process_tree_rss(os.getpid())
+        self.peak = max(self.peak, self.last)
+
+    def __enter__(self):
+        self.sample()
+        self.baseline = self.last
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def summarize(latencies: List[float], outcomes: List[dict], wall: float, memory: MemorySampler) -> dict:
+    ok = [o for o in outcomes if o["ok"]]
+    fields = sum(o.get("fields", 0) for o in ok)
+    summary = {
+        "runs": len(outcomes),
+        "ok": len(ok),
+        "errors": len(outcomes) - len(ok),
+        "latency": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "min": round(min(latencies), 4) if latencies else 0.0,
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+        "throughput_forms_per_second": round(len(ok) / wall, 3) if wall else 0.0,
+        "fields_per_second": round(fields / wall, 2) if wall else 0.0,
+        "wall_seconds": round(wall, 3),
+        "memory_mb": {
+            "baseline": round(memory.baseline / 2 ** 20, 1),
+            "peak": round(memory.peak / 2 ** 20, 1),
+            "end": round(memory.last / 2 ** 20, 1),
+        },
+    }
+    for key in ("llm_calls", "schema_cache_hits"):
+        if any(key in o for o in outcomes):
+            summary[key] = sum(o.get(key, 0) for o in outcomes)
+    return summary
+
+
+# Sequential runs of one form function; warm-up runs are excluded from the figures
+def run_sequential(run_one: Callable[[], dict], runs: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        run_one()
+    latencies, outcomes = [], []
+    with MemorySampler() as memory:
+        started = time.perf_counter()
+        for _ in range(runs):
+            run_started = time.perf_counter()
+            try:
+                outcome = run_one()
+            except Exception as e:
+                outcome = {"ok": False, "error": str(e)}
+            latencies.append(time.perf_counter() - run_started)
+            outcomes.append(outcome)
+        wall = time.perf_counter() - started
+    return summarize(latencies, outcomes, wall, memory)
+
+
+# script.py: one FormAgent per form on a single browser, discover/fill/rediscover loop
+def bench_form_agent(url: str, args) -> dict:
+    from browser_profile import create_driver
+    from script import FormAgent, run_fill_loop
+
+    driver = create_driver()
+
+    def run_one():
+        agent = FormAgent(url, driver=driver)
+        state = run_fill_loop(agent, max_iterations=args.fields * 4)
+        filled = sum(field.filled for field in state.fields)
+        return {"ok": state.submission_attempted and filled > 0, "fields": filled}
+
+    try:
+        return run_sequential(run_one, args.runs, args.warmup)
+    finally:
+        driver.quit()
+
+
+# form_agent.fill_form on its browser pool, with the fake LLM
+def bench_ai_agent(url: str, args) -> dict:
+    import form_agent
+
+    form_agent.browser_pool.start()
+
+    def run_one():
+        if args.cold:
+            form_agent.value_cache.clear()
+            form_agent.schema_cache.clear()
+        result = form_agent.fill_form(url, fill_mode=args.fill_mode, interpret_mode=args.interpret_mode)
+        filled = sum(field.filled for field in result.state.fields)
+        return {
+            "ok": result.status == "success",
+            "fields": filled,
+            "llm_calls": result.llm_calls,
+            "schema_cache_hits": int(result.schema_cache_hit),
+        }
+
+    try:
+        return run_sequential(run_one, args.runs, args.warmup)
+    finally:
+        form_agent.browser_pool.close()
+
+
+# POST /process-form on the in-process API with `concurrency` requests in flight
+def bench_api(url: str, args) -> dict:
+    import importlib
+
+    module = importlib.import_module(args.app)
+    server = start_api(module.app, args.port)
+    api_url = f"http://127.0.0.1:{args.port}"
+
+    async def post(client, semaphore):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"{api_url}/process-form", params={"url": url, "fill_mode": args.fill_mode})
+                body = response.json() if response.status_code == 200 else {}
+                outcome = {
+                    "ok": response.status_code == 200,
+                    "fields": len(body.get("filled_fields", [])),
+                    "schema_cache_hits": int(bool(body.get("schema_cache_hit"))),
+                }
+            except httpx.HTTPError as e:
+                outcome = {"ok": False, "error": str(e)}
+            return time.perf_counter() - started, outcome
+
+    async def run_all(count: int):
+        semaphore = asyncio.Semaphore(args.concurrency)
+        async with httpx.AsyncClient(timeout=300) as client:
+            return await asyncio.gather(*[post(client, semaphore) for _ in range(count)])
+
+    try:
+        asyncio.run(run_all(args.warmup))
+        with MemorySampler() as memory:
+            started = time.perf_counter()
+            results = asyncio.run(run_all(args.runs))
+            wall = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+    return summarize([latency for latency, _ in results], [outcome for _, outcome in results], wall, memory)
+
+
+BENCHMARKS = {"form_agent": bench_form_agent, "ai_agent": bench_ai_agent, "api": bench_api}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_report(report: dict, previous: Optional[dict] = None):
+    for name, result in report["targets"].items():
+        latency = result.get("latency")
+        if latency is None:
+            print(f"{name:>10}: failed ({result.get('error')})")
+            continue
+        line = (f"{name:>10}: p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  "
+                f"{result['throughput_forms_per_second']:.2f} forms/s  {result['fields_per_second']:.1f} fields/s  "
+                f"peak RSS {result['memory_mb']['peak']:.0f}MB  ok {result['ok']}/{result['runs']}")
+        before = (previous or {}).get("targets", {}).get(name, {}).get("latency")
+        if before and before["p50"]:
+            line += f"  (p50 {(latency['p50'] / before['p50'] - 1) * 100:+.1f}% vs {previous['meta'].get('commit')})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--fields", type=int, default=20, help="static fields, cycling through every input type")
+    parser.add_argument("--dynamic", type=int, default=2, help="checkbox-revealed fields")
+    parser.add_argument("--slow", type=int, default=2, help="fields rendered after --slow-delay")
+    parser.add_argument("--slow-delay", type=int, default=300, help="milliseconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fill-mode", choices=["per_field", "bulk"], default="per_field")
+    parser.add_argument("--interpret-mode", choices=["per_field", "batch", "async"], default="batch")
+    parser.add_argument("--cold", action="store_true", help="clear the value and schema caches before each AI run")
+    parser.add_argument("--app", default="form_api", help="module exposing the FastAPI app for the api target")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight for the api target")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help=f"report path (default: {RESULTS_DIR}/suite-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier report to compare p50 latency against")
+    args = parser.parse_args()
+
+    form = {"fields": args.fields, "dynamic": args.dynamic, "slow": args.slow, "slow_delay": args.slow_delay, "seed": args.seed}
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "form": form,
+            "args": vars(args),
+        },
+        "targets": {},
+    }
+
+    fixture, base_url = serve()
+    url = base_url + generated_path(**form)
+    try:
+        for name in args.targets:
+            try:
+                report["targets"][name] = BENCHMARKS[name](url, args)
+            except Exception as e:
+                report["targets"][name] = {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        fixture.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Memory per concurrent form: one browser per form (BrowserPool) versus tabs in shared browsers
+# (TabPool). N forms are filled at once with script.py's loop, holding every session until all
+# are done, and the RSS of this process plus every chromedriver/Chrome process is sampled.
+# Run from the repository root: python -m benchmarks.tabs_bench --forms 4 --max-tabs 4
+import argparse
+import threading
+import time
+from browser_pool import BrowserPool
+from browser_tabs import TabPool
+from script import FormAgent, run_fill_loop
+from benchmarks.fixture_server import generated_path, serve
+from benchmarks.suite import MemorySampler
+
+
+def run(name: str, pool, url: str, forms: int):
+    results = []
+    all_done = threading.Barrier(forms)
+
+    def fill_one():
+        started = time.perf_counter()
+        try:
+            with pool.session() as driver:
+                state = run_fill_loop(FormAgent(url, driver=driver), max_iterations=200)
+                results.append((time.perf_counter() - started, sum(field.filled for field in state.fields)))
+                all_done.wait(timeout=300)  # Keep every session open until the last form is filled
+                memory.sample()
+        except Exception as e:
+            all_done.abort()
+            print(f"{name}: form failed: {e}")
+
+    try:
+        with MemorySampler() as memory:  # Baseline before any browser starts
+            pool.start()
+            started = time.perf_counter()
+            threads = [threading.Thread(target=fill_one) for _ in range(forms)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    per_form = (memory.peak - memory.baseline) / forms
+    latencies = [latency for latency, _ in results] or [0.0]
+    print(f"{name:>8}: {per_form / 2 ** 20:6.0f}MB per form  peak {memory.peak / 2 ** 20:.0f}MB  "
+          f"wall {wall:.2f}s  form latency max {max(latencies):.2f}s  "
+          f"fields {sum(filled for _, filled in results)}  browsers {stats.get('browsers', stats['created'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--forms", type=int, default=4, help="forms filled at the same time")
+    parser.add_argument("--max-tabs", type=int, default=4, help="tab cap per shared browser")
+    parser.add_argument("--isolation", choices=["context", "tab"], default="context")
+    parser.add_argument("--fields", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    url = base_url + generated_path(fields=args.fields, dynamic=1, slow=1)
+    try:
+        run("process", BrowserPool(size=args.forms), url, args.forms)
+        run("tabs", TabPool(size=args.forms, max_tabs=args.max_tabs, isolation=args.isolation), url, args.forms)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
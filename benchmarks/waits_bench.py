@@ -0,0 +1,53 @@
+# Page-ready time with and without the field watch: a static form (no fields added after load)
+# and one whose fields render up to slow_delay ms after load. Without the watch every page pays
+# the full quiet period after the first poll; with it a quiet page passes on the first check and
+# the slow one still waits for its last field.
+# Run from the repository root: python -m benchmarks.waits_bench --runs 5
+import argparse
+import contextlib
+import statistics
+import time
+from browser_profile import create_driver
+from driver_backend import SeleniumBackend
+from waits import FormWaiter
+from benchmarks.fixture_server import generated_path, serve
+
+
+def run(name: str, backend: SeleniumBackend, url: str, runs: int, watch: bool):
+    ready, fields = [], set()
+    for _ in range(runs):
+        backend.navigate("about:blank")
+        waiter = FormWaiter(backend)
+        started = time.perf_counter()
+        with waiter.watching_fields() if watch else contextlib.nullcontext():
+            backend.navigate(url)
+            waiter.page_ready()
+        ready.append(time.perf_counter() - started)
+        fields.add(backend.evaluate("return document.querySelectorAll('form input').length"))
+    print(f"{name:>22}: page ready mean {statistics.mean(ready) * 1000:.0f}ms  max {max(ready) * 1000:.0f}ms  "
+          f"inputs seen {sorted(fields)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fields", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = serve()
+    driver = create_driver()
+    backend = SeleniumBackend(driver)
+    try:
+        for form, path in (
+            ("static", generated_path(fields=args.fields, dynamic=0, slow=0)),
+            ("slow", generated_path(fields=args.fields, dynamic=0, slow=2, slow_delay=300)),
+        ):
+            run(f"{form} signature", backend, base_url + path, args.runs, watch=False)
+            run(f"{form} field watch", backend, base_url + path, args.runs, watch=True)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
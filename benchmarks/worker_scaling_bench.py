@@ -0,0 +1,46 @@
+# Measure form throughput with 1..N worker processes against the local form fixture.
+# Run from the repository root: python -m benchmarks.worker_scaling_bench --max-workers 4 --forms 16
+import argparse
+import asyncio
+import os
+import time
+from worker_supervisor import WorkerSupervisor
+from benchmarks.fixture_server import serve
+
+
+async def run_forms(supervisor: WorkerSupervisor, url: str, forms: int):
+    # fill_form is resolved by name inside each worker's own import of form_api
+    from form_api import fill_form
+    results = await asyncio.gather(*[supervisor.run(fill_form, url) for _ in range(forms)], return_exceptions=True)
+    return sum(not isinstance(r, Exception) for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--forms", type=int, default=16)
+    parser.add_argument("--sessions", type=int, default=1, help="browser sessions per worker")
+    args = parser.parse_args()
+
+    server, url = serve()
+    try:
+        baseline = None
+        for processes in range(1, args.max_workers + 1):
+            supervisor = WorkerSupervisor("form_api", processes, sessions_per_worker=args.sessions, max_queue=args.forms)
+            supervisor.start()
+            # Warm every worker so process and browser startup stay out of the measurement
+            asyncio.run(run_forms(supervisor, url, processes * args.sessions))
+            started = time.perf_counter()
+            ok = asyncio.run(run_forms(supervisor, url, args.forms))
+            elapsed = time.perf_counter() - started
+            supervisor.shutdown()
+            throughput = ok / elapsed
+            baseline = baseline or throughput
+            print(f"{processes} workers: {ok}/{args.forms} forms in {elapsed:.2f}s, "
+                  f"{throughput:.2f} forms/s ({throughput / baseline:.2f}x)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional, Set
+from urllib.parse import urlsplit
+from selenium.common.exceptions import NoAlertPresentException
+from browser_profile import create_driver
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (overridable through the environment)
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "50"))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "30"))
+# "process": one browser per session; "tabs": sessions are tabs of shared browsers (browser_tabs.py);
+# "cdp": sessions are pages of browsers driven over DevTools without chromedriver (cdp_backend.py)
+POOL_MODE = os.getenv("BROWSER_POOL_MODE", "process")
+
+# Clears web storage for whatever origin the session is currently on (drivers without CDP)
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+def _storage_origin(url: Optional[str]) -> Optional[str]:
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None  # about:, data:, chrome: and friends hold no per-origin data
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# Origins a tab may have left data for: every top-level page after the history entry `after`
+# (all of them when it's gone or None; redirect sources included) and every frame of the page
+# still loaded, cross-origin iframes too. Chromium drivers only.
+def visited_origins(driver, after: Optional[int] = None) -> Set[str]:
+    entries = driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+    ids = [entry["id"] for entry in entries]
+    if after in ids:
+        entries = entries[ids.index(after) + 1:]
+    urls = [url for entry in entries for url in (entry.get("url"), entry.get("userTypedURL"))]
+    frames = [driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]]
+    while frames:
+        frame = frames.pop()
+        urls.append(frame["frame"].get("url"))
+        frames.extend(frame.get("childFrames", []))
+    return {origin for origin in map(_storage_origin, urls) if origin}
+
+
+# Cookies, local/session storage, IndexedDB, Cache Storage and service workers of each origin
+def clear_origins(driver, origins: Set[str]):
+    for origin in sorted(origins):
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+# Id of the tab's current history entry: the mark the next reset's visited_origins starts after
+def current_history_entry(driver) -> Optional[int]:
+    history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+    return history["entries"][history["currentIndex"]]["id"]
+
+
+# Default factory for pooled sessions: Chrome with the configured profile (headless by default)
+def create_headless_driver():
+    return create_driver()
+
+
+# A pre-started browser session plus its usage bookkeeping
+class PooledSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.history_mark: Optional[int] = None  # Last history entry of the previous reset
+
+
+# Bounded pool of reusable browser sessions
+class BrowserPool:
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_uses: int = POOL_MAX_USES,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        driver_factory: Callable = create_headless_driver,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory
+        self._idle = deque()
+        self._live = 0  # idle + checked out (+ sessions being created)
+        self._closed = False
+        self._cond = threading.Condition()
+        self._counters = {
+            "created": 0,
+            "checkouts": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "acquire_timeouts": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # Pre-start sessions so the first requests don't pay for browser startup
+    def start(self, count: Optional[int] = None):
+        count = self.size if count is None else min(count, self.size)
+        for _ in range(count):
+            if not self._reserve_slot():
+                break
+            session = self._create_session()
+            if session is not None:
+                self._push_idle(session)
+        logger.info("Browser pool started", extra={"idle": len(self._idle)})
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledSession:
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            session = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolExhaustedError("Browser pool is closed")
+                    if self._idle:
+                        session = self._idle.popleft()
+                        break
+                    if self._live < self.size:
+                        # Reserve a slot and start the browser outside the lock
+                        self._live += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["acquire_timeouts"] += 1
+                        raise PoolExhaustedError(f"No browser session available after {timeout:.1f}s")
+                    self._cond.wait(remaining)
+
+            if session is None:
+                session = self._create_session()
+                if session is None:
+                    raise PoolExhaustedError("Failed to start a browser session")
+                break
+            if self._is_healthy(session):
+                break
+            # Free its slot, then take another idle session or start one in that slot
+            logger.warning("Discarding unhealthy browser session")
+            with self._cond:
+                self._counters["unhealthy"] += 1
+            self._discard(session)
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._counters["checkouts"] += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        session.uses += 1
+        return session
+
+    def release(self, session: PooledSession):
+        recycle = self._closed or session.uses >= self.max_uses
+        if not recycle:
+            try:
+                session.history_mark = self.reset(session.driver, session.history_mark)
+            except Exception as e:
+                logger.warning("Browser session reset failed, recycling", extra={"error": str(e)})
+                recycle = True
+
+        if recycle:
+            with self._cond:
+                self._counters["recycled"] += 1
+            self._discard(session)
+            if not self._closed:
+                # Replace the recycled session in the background to keep the pool warm
+                threading.Thread(target=self.start, args=(1,), daemon=True).start()
+        else:
+            self._push_idle(session)
+
+    # Check out a driver for the duration of a `with` block
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self.release(pooled)
+
+    # Return a session to a blank state: no alerts, extra windows, cookies or storage. Data is
+    # cleared for every origin the session visited since the last reset (pages, redirects, iframes,
+    # popups), once the session is on about:blank so no page can write it back. Returns the
+    # history mark for the next reset.
+    def reset(self, driver, history_mark: Optional[int] = None) -> Optional[int]:
+        try:
+            driver.switch_to.alert.dismiss()
+        except NoAlertPresentException:
+            pass
+        chromium = hasattr(driver, "execute_cdp_cmd")
+        origins = set()
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            if chromium:
+                origins |= visited_origins(driver)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        if chromium:
+            origins |= visited_origins(driver, history_mark)
+        else:
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)  # Only the current origin can be reached
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+        if not chromium:
+            return None
+        clear_origins(driver, origins)
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        return current_history_entry(driver)
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._counters["checkouts"]
+            return {
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "in_use": self._live - len(self._idle),
+                **self._counters,
+                "wait_seconds_total": round(self._wait_total, 4),
+                "wait_seconds_max": round(self._wait_max, 4),
+                "wait_seconds_avg": round(self._wait_total / checkouts, 4) if checkouts else 0.0,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for session in idle:
+            self._discard(session)
+        logger.info("Browser pool closed")
+
+    def _reserve_slot(self) -> bool:
+        with self._cond:
+            if self._closed or self._live >= self.size:
+                return False
+            self._live += 1
+            return True
+
+    # Start a browser for an already reserved slot
+    def _create_session(self) -> Optional[PooledSession]:
+        try:
+            session = PooledSession(self.driver_factory())
+        except Exception as e:
+            logger.error("Failed to start browser session", extra={"error": str(e)})
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            return None
+        with self._cond:
+            self._counters["created"] += 1
+        return session
+
+    def _push_idle(self, session: PooledSession):
+        with self._cond:
+            if self._closed:
+                discard = True
+            else:
+                discard = False
+                self._idle.append(session)
+                self._cond.notify()
+        if discard:
+            self._discard(session)
+
+    # Any error counts: a dead chromedriver raises urllib3/socket errors, not WebDriverException
+    def _is_healthy(self, session: PooledSession) -> bool:
+        try:
+            return session.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _discard(self, session: PooledSession):
+        self._quit(session)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    def _quit(self, session: PooledSession):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logger.warning("Error quitting browser session", extra={"error": str(e)})
+
+
+# The pool the apps (and each worker process) use: a BrowserPool, a TabPool with
+# BROWSER_POOL_MODE=tabs, or a CdpPool with BROWSER_POOL_MODE=cdp
+def create_browser_pool(size: int = POOL_SIZE) -> BrowserPool:
+    if POOL_MODE == "tabs":
+        from browser_tabs import TabPool
+        return TabPool(size=size)
+    if POOL_MODE == "cdp":
+        from cdp_backend import CdpPool
+        return CdpPool(size=size)
+    return BrowserPool(size=size)
@@ -0,0 +1,287 @@
+import ipaddress
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import websocket
+try:
+    import tldextract  # Optional: public suffix list for the third-party check
+except ImportError:
+    tldextract = None
+from selenium import webdriver
+from chromedriver import chromedriver_service
+
+logger = logging.getLogger(__name__)
+
+# Profile configuration (overridable through the environment). BROWSER_PROFILE=default
+# starts Chrome with its stock options, as FormAgent did before profiles existed.
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "performance")
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "1") != "0"
+BROWSER_PAGE_LOAD_STRATEGY = os.getenv("BROWSER_PAGE_LOAD_STRATEGY", "eager")
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "Image,Media,Font")
+BROWSER_BLOCK_THIRD_PARTY = os.getenv("BROWSER_BLOCK_THIRD_PARTY", "0") == "1"  # Opt-in: CDN-hosted forms break
+BROWSER_DISK_CACHE_DIR = os.getenv("BROWSER_DISK_CACHE_DIR", os.path.join(tempfile.gettempdir(), "form-agent-chrome-cache"))
+BROWSER_DISK_CACHE_SIZE = int(os.getenv("BROWSER_DISK_CACHE_SIZE", str(100 * 1024 * 1024)))
+BROWSER_RENDERER_LIMIT = int(os.getenv("BROWSER_RENDERER_LIMIT", "2"))
+BROWSER_JS_HEAP_MB = int(os.getenv("BROWSER_JS_HEAP_MB", "512"))
+
+# Background services a form-filling session never needs
+PERFORMANCE_ARGUMENTS = [
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+]
+
+# Keeps timers and rendering of background tabs at full speed (several forms per browser)
+BACKGROUND_TAB_ARGUMENTS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+
+# Launch settings for one browser session
+class BrowserProfile:
+    def __init__(
+        self,
+        name: str = "performance",
+        headless: bool = True,
+        page_load_strategy: str = "eager",
+        block_resource_types: Sequence[str] = ("Image", "Media", "Font"),
+        block_third_party: bool = False,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_size: int = BROWSER_DISK_CACHE_SIZE,
+        renderer_limit: int = 0,
+        js_heap_mb: int = 0,
+        tuned: bool = True,
+        background_tabs: bool = False,
+    ):
+        self.name = name
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.block_resource_types = list(block_resource_types)
+        self.block_third_party = block_third_party
+        self.disk_cache_dir = disk_cache_dir
+        self.disk_cache_size = disk_cache_size
+        self.renderer_limit = renderer_limit
+        self.js_heap_mb = js_heap_mb
+        self.tuned = tuned  # Adds PERFORMANCE_ARGUMENTS
+        self.background_tabs = background_tabs  # Adds BACKGROUND_TAB_ARGUMENTS
+
+    # Stock Chrome: visible window, normal page loads, nothing blocked
+    @classmethod
+    def default(cls) -> "BrowserProfile":
+        return cls(
+            name="default",
+            headless=False,
+            page_load_strategy="normal",
+            block_resource_types=(),
+            block_third_party=False,
+            tuned=False,
+        )
+
+    @classmethod
+    def performance(cls) -> "BrowserProfile":
+        return cls(
+            headless=BROWSER_HEADLESS,
+            page_load_strategy=BROWSER_PAGE_LOAD_STRATEGY,
+            block_resource_types=[t.strip() for t in BROWSER_BLOCK_RESOURCES.split(",") if t.strip()],
+            block_third_party=BROWSER_BLOCK_THIRD_PARTY,
+            disk_cache_dir=BROWSER_DISK_CACHE_DIR or None,
+            renderer_limit=BROWSER_RENDERER_LIMIT,
+            js_heap_mb=BROWSER_JS_HEAP_MB,
+        )
+
+    @classmethod
+    def from_env(cls) -> "BrowserProfile":
+        return cls.default() if BROWSER_PROFILE == "default" else cls.performance()
+
+    @property
+    def blocks_requests(self) -> bool:
+        return bool(self.block_resource_types) or self.block_third_party
+
+    def chrome_options(self, disk_cache_dir: Optional[str] = None) -> webdriver.ChromeOptions:
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--disable-gpu")
+        if self.tuned:
+            for argument in PERFORMANCE_ARGUMENTS:
+                options.add_argument(argument)
+        if self.background_tabs:
+            for argument in BACKGROUND_TAB_ARGUMENTS:
+                options.add_argument(argument)
+        if "Image" in self.block_resource_types:
+            # Skip image decoding outright; interception below also stops the downloads
+            options.add_argument("--blink-settings=imagesEnabled=false")
+        if disk_cache_dir:
+            options.add_argument(f"--disk-cache-dir={disk_cache_dir}")
+            options.add_argument(f"--disk-cache-size={self.disk_cache_size}")
+        if self.renderer_limit:
+            options.add_argument(f"--renderer-process-limit={self.renderer_limit}")
+        if self.js_heap_mb:
+            options.add_argument(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+        return options
+
+
+# Chrome locks its disk cache, so each live session gets its own slot directory. Slots are
+# reused after a session quits, so recycled sessions start with a warm cache.
+_cache_slots = set()
+_cache_slots_lock = threading.Lock()
+
+
+def _acquire_cache_slot() -> int:
+    with _cache_slots_lock:
+        slot = next(i for i in range(len(_cache_slots) + 1) if i not in _cache_slots)
+        _cache_slots.add(slot)
+        return slot
+
+
+def _release_cache_slot(slot: int):
+    with _cache_slots_lock:
+        _cache_slots.discard(slot)
+
+
+# Second-level labels under which country TLDs register names (example.co.uk, example.com.au);
+# the fallback when tldextract is not installed
+COUNTRY_SECOND_LEVELS = {"ac", "co", "com", "edu", "gov", "ltd", "me", "net", "nic", "or", "org", "plc", "sch"}
+
+if tldextract is not None:
+    # The bundled public suffix snapshot; never fetched at runtime. Private suffixes
+    # (github.io, cloudfront.net) count as public, so two tenants are two sites.
+    _suffix_list = tldextract.TLDExtract(suffix_list_urls=(), include_psl_private_domains=True)
+
+
+# The registrable domain ("site") a host belongs to
+def _site(host: str) -> str:
+    host = host.rstrip(".").lower()
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    if tldextract is not None:
+        parts = _suffix_list(host)
+        return ".".join(label for label in (parts.domain, parts.suffix) if label) or host
+    labels = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in COUNTRY_SECOND_LEVELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+# Decides which paused requests (Fetch.requestPaused events) to fail: the blocked resource
+# types, and other sites' requests once the top-level document has set the first party
+class RequestFilter:
+    def __init__(self, resource_types: Sequence[str], block_third_party: bool, main_frame: str):
+        self.resource_types = set(resource_types)
+        self.block_third_party = block_third_party
+        self.main_frame = main_frame  # A tab's target id is its main frame id
+        self.first_party: Optional[str] = None
+        self.counters = {"blocked": 0, "allowed": 0}
+
+    # Fetch.enable patterns: third-party checks need to see every request
+    def patterns(self) -> list:
+        if self.block_third_party:
+            return [{"urlPattern": "*"}]
+        return [{"urlPattern": "*", "resourceType": t} for t in self.resource_types]
+
+    def blocked(self, event: dict) -> bool:
+        resource_type = event.get("resourceType")
+        host = urlsplit(event["request"]["url"]).hostname or ""
+        if resource_type == "Document" and event.get("frameId") == self.main_frame:
+            self.first_party = _site(host)  # Top-level navigation defines the first party
+            blocked = False
+        elif resource_type in self.resource_types:
+            blocked = True
+        else:
+            blocked = bool(self.block_third_party and self.first_party and host and _site(host) != self.first_party)
+        self.counters["blocked" if blocked else "allowed"] += 1
+        return blocked
+
+    # The command that answers a paused request
+    def answer(self, event: dict) -> Tuple[str, dict]:
+        if self.blocked(event):
+            return "Fetch.failRequest", {"requestId": event["requestId"], "errorReason": "BlockedByClient"}
+        return "Fetch.continueRequest", {"requestId": event["requestId"]}
+
+
+# Fails image/media/font and third-party requests through CDP Fetch interception. Runs on
+# its own DevTools connection to the session's tab, answering paused requests on a daemon
+# thread; if the connection drops Chrome stops intercepting, so requests never hang.
+class RequestBlocker:
+    def __init__(self, driver, resource_types: Sequence[str], block_third_party: bool):
+        self.driver = driver
+        self.filter = RequestFilter(resource_types, block_third_party, driver.current_window_handle)
+        self._socket = None
+        self._ids = 0
+
+    def start(self):
+        address = self.driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        self._socket = websocket.create_connection(
+            f"ws://{address}/devtools/page/{self.filter.main_frame}", suppress_origin=True
+        )
+        self._send("Fetch.enable", {"patterns": self.filter.patterns()})
+        threading.Thread(target=self._run, daemon=True, name="request-blocker").start()
+
+    def _send(self, method: str, params: dict):
+        self._ids += 1
+        self._socket.send(json.dumps({"id": self._ids, "method": method, "params": params}))
+
+    def _run(self):
+        try:
+            while True:
+                message = json.loads(self._socket.recv())
+                if message.get("method") == "Fetch.requestPaused":
+                    self._send(*self.filter.answer(message["params"]))
+        except (websocket.WebSocketException, OSError):
+            pass  # Session closed
+
+    def stats(self) -> dict:
+        return dict(self.filter.counters)
+
+
+# Start a Chrome session with the given (or configured) profile on the shared chromedriver
+def create_driver(profile: Optional[BrowserProfile] = None, service=None):
+    profile = profile or BrowserProfile.from_env()
+    cache_slot = _acquire_cache_slot() if profile.disk_cache_dir else None
+    cache_dir = None
+    if cache_slot is not None:
+        cache_dir = os.path.join(profile.disk_cache_dir, f"worker{os.getenv('FORM_WORKER_INDEX', '0')}-slot{cache_slot}")
+    try:
+        driver = webdriver.Chrome(service=service or chromedriver_service(), options=profile.chrome_options(cache_dir))
+    except Exception:
+        if cache_slot is not None:
+            _release_cache_slot(cache_slot)
+        raise
+
+    if cache_slot is not None:
+        quit_driver = driver.quit
+
+        def quit_and_release():
+            try:
+                quit_driver()
+            finally:
+                _release_cache_slot(cache_slot)
+
+        driver.quit = quit_and_release
+
+    driver.request_blocker = None
+    if profile.blocks_requests:
+        try:
+            driver.request_blocker = RequestBlocker(driver, profile.block_resource_types, profile.block_third_party)
+            driver.request_blocker.start()
+        except Exception as e:
+            logger.warning("Request blocking unavailable, loading every resource", extra={"error": str(e)})
+            driver.request_blocker = None
+    return driver
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from typing import Optional
+import websocket
+from selenium.common.exceptions import NoAlertPresentException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from browser_pool import (
+    POOL_ACQUIRE_TIMEOUT,
+    POOL_MAX_USES,
+    POOL_SIZE,
+    BrowserPool,
+    clear_origins,
+    current_history_entry,
+    visited_origins,
+)
+from browser_profile import BrowserProfile, RequestBlocker, create_driver
+
+logger = logging.getLogger(__name__)
+
+# Tab mode configuration (overridable through the environment)
+BROWSER_MAX_TABS = int(os.getenv("BROWSER_MAX_TABS", "4"))
+# "context": each tab in its own browser context (separate cookies, storage and cache);
+# "tab": plain tabs sharing one cookie jar, for pages that don't care
+BROWSER_TAB_ISOLATION = os.getenv("BROWSER_TAB_ISOLATION", "context")
+TAB_OPEN_TIMEOUT = 10
+
+# Instance attributes of the browser's driver that must not be shared with its tabs
+_DRIVER_ONLY_ATTRIBUTES = ("quit", "execute", "request_blocker")
+
+
+# Browser-level DevTools connection, for creating and disposing browser contexts and targets
+class BrowserTargets:
+    def __init__(self, debugger_address: str):
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=TAB_OPEN_TIMEOUT) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        self._socket = websocket.create_connection(url, suppress_origin=True, timeout=TAB_OPEN_TIMEOUT)
+        self._ids = 0
+
+    # Send one command and wait for its reply (no events are enabled on this connection)
+    def call(self, method: str, params: Optional[dict] = None) -> dict:
+        self._ids += 1
+        request_id = self._ids
+        self._socket.send(json.dumps({"id": request_id, "method": method, "params": params or {}}))
+        while True:
+            message = json.loads(self._socket.recv())
+            if message.get("id") != request_id:
+                continue
+            if "error" in message:
+                raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+            return message.get("result", {})
+
+    def close(self):
+        try:
+            self._socket.close()
+        except (websocket.WebSocketException, OSError):
+            pass
+
+
+# A WebDriver bound to one tab of a shared browser. Every command first switches the session
+# to the tab, under the browser's lock, so code written for a dedicated driver (discovery,
+# fill, waits, change feed) runs unchanged; elements found through it route through it too.
+class TabDriver:
+    def execute(self, driver_command, params=None):
+        if not isinstance(driver_command, str):
+            return super().execute(driver_command, params)  # BiDi commands carry their own context
+        with self.browser.lock:
+            self.browser.focus(self.window_handle)
+            return super().execute(driver_command, params)
+
+    @property
+    def current_window_handle(self) -> str:
+        return self.window_handle
+
+    # Closing or quitting a tab never takes the shared browser down
+    def close(self):
+        self.browser.close_tab(self)
+
+    def quit(self):
+        self.browser.close_tab(self)
+
+
+_tab_classes = {}
+
+
+def _tab_driver(browser: "SharedBrowser", handle: str, context_id: Optional[str]):
+    base = type(browser.driver)
+    cls = _tab_classes.get(base)
+    if cls is None:
+        cls = _tab_classes[base] = type(f"Tab{base.__name__}", (TabDriver, base), {})
+    tab = cls.__new__(cls)
+    tab.__dict__.update({k: v for k, v in vars(browser.driver).items() if k not in _DRIVER_ONLY_ATTRIBUTES})
+    tab._switch_to = SwitchTo(tab)
+    tab.browser = browser
+    tab.window_handle = handle
+    tab.context_id = context_id
+    tab.request_blocker = None
+    return tab
+
+
+# One Chrome process serving up to max_tabs forms at once. Its first window stays open and
+# blank so the browser outlives its tabs. chromedriver runs one command at a time per
+# session, so tabs share the browser's command stream: memory per form drops, latency rises.
+class SharedBrowser:
+    def __init__(self, profile: BrowserProfile, max_tabs: int = BROWSER_MAX_TABS, isolation: str = BROWSER_TAB_ISOLATION):
+        self.profile = profile
+        self.max_tabs = max_tabs
+        self.isolation = isolation
+        self.lock = threading.RLock()
+        self.tabs = {}
+        self.opened = 0
+        self.driver = create_driver(profile)
+        try:
+            self.home = self.current = self.driver.current_window_handle
+            self._targets = None
+            if isolation == "context":
+                self._targets = BrowserTargets(self.driver.capabilities["goog:chromeOptions"]["debuggerAddress"])
+        except Exception:
+            self.driver.quit()
+            raise
+
+    def focus(self, handle: str):
+        if self.current != handle:
+            self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self.current = handle
+
+    def open_tab(self):
+        with self.lock:
+            if len(self.tabs) >= self.max_tabs:
+                raise RuntimeError(f"Browser already has {self.max_tabs} tabs open")
+            context_id = None
+            if self._targets is not None:
+                context_id = self._targets.call("Target.createBrowserContext", {"disposeOnDetach": True})["browserContextId"]
+                handle = self._targets.call("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})["targetId"]
+                self._wait_for_handle(handle)
+            else:
+                self.driver.switch_to.new_window("tab")
+                handle = self.current = self.driver.current_window_handle
+            tab = _tab_driver(self, handle, context_id)
+            self.tabs[handle] = tab
+            self.opened += 1
+        if self.profile.blocks_requests:
+            try:
+                tab.request_blocker = RequestBlocker(tab, self.profile.block_resource_types, self.profile.block_third_party)
+                tab.request_blocker.start()
+            except Exception as e:
+                logger.warning("Request blocking unavailable for tab", extra={"error": str(e)})
+                tab.request_blocker = None
+        return tab
+
+    # chromedriver picks up targets created over DevTools on its next window listing
+    def _wait_for_handle(self, handle: str):
+        deadline = time.monotonic() + TAB_OPEN_TIMEOUT
+        while handle not in self.driver.window_handles:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"chromedriver did not report the new tab {handle}")
+            time.sleep(0.05)
+
+    def close_tab(self, tab):
+        with self.lock:
+            if self.tabs.pop(tab.window_handle, None) is None:
+                return
+            try:
+                if self._targets is not None:
+                    self._targets.call("Target.closeTarget", {"targetId": tab.window_handle})
+                    self._targets.call("Target.disposeBrowserContext", {"browserContextId": tab.context_id})
+                else:
+                    self.focus(tab.window_handle)
+                    self.driver.execute(Command.CLOSE)
+            finally:
+                if self.current == tab.window_handle:
+                    self.current = None
+
+    # Cookies of the tab's own context; plain tabs share a jar, so only the current site's go
+    def clear_cookies(self, tab):
+        if self._targets is not None:
+            self._targets.call("Storage.clearCookies", {"browserContextId": tab.context_id})
+        else:
+            tab.delete_all_cookies()
+
+    def quit(self):
+        with self.lock:
+            self.tabs.clear()
+            if self._targets is not None:
+                self._targets.close()
+            self.driver.quit()
+
+
+# BrowserPool whose sessions are tabs (by default isolated browser contexts) in shared
+# browsers: `size` forms at once across ceil(size / max_tabs) Chrome processes.
+class TabPool(BrowserPool):
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_uses: int = POOL_MAX_USES,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        max_tabs: int = BROWSER_MAX_TABS,
+        isolation: str = BROWSER_TAB_ISOLATION,
+        profile: Optional[BrowserProfile] = None,
+    ):
+        super().__init__(size, max_uses, acquire_timeout, driver_factory=self._open_tab)
+        self.max_tabs = max(1, max_tabs)
+        self.isolation = isolation
+        self.profile = profile or BrowserProfile.from_env()
+        self.profile.background_tabs = True
+        self._browsers = []
+        self._browsers_lock = threading.Lock()
+
+    # Open a tab in the least-loaded browser with room, starting a browser when all are full
+    def _open_tab(self):
+        with self._browsers_lock:
+            browser = min(
+                (b for b in self._browsers if len(b.tabs) < self.max_tabs), key=lambda b: len(b.tabs), default=None
+            )
+            if browser is not None:
+                try:
+                    return browser.open_tab()
+                except Exception as e:
+                    logger.warning("Shared browser failed to open a tab, replacing it", extra={"error": str(e)})
+                    self._browsers.remove(browser)
+                    self._quit_browser(browser)
+            browser = SharedBrowser(self.profile, self.max_tabs, self.isolation)
+            self._browsers.append(browser)
+            return browser.open_tab()
+
+    # Tabs are reset in place: closing other windows would close other forms' tabs
+    def reset(self, tab, history_mark: Optional[int] = None) -> Optional[int]:
+        try:
+            tab.switch_to.alert.dismiss()
+        except NoAlertPresentException:
+            pass
+        origins = visited_origins(tab, history_mark)
+        tab.browser.clear_cookies(tab)
+        tab.get("about:blank")
+        clear_origins(tab, origins)
+        return current_history_entry(tab)
+
+    def stats(self) -> dict:
+        with self._browsers_lock:
+            tabs = [len(b.tabs) for b in self._browsers]
+        return {
+            **super().stats(),
+            "mode": "tabs",
+            "isolation": self.isolation,
+            "max_tabs": self.max_tabs,
+            "browsers": len(tabs),
+            "tabs_per_browser": tabs,
+        }
+
+    def close(self):
+        super().close()
+        with self._browsers_lock:
+            browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            self._quit_browser(browser)
+
+    def _quit_browser(self, browser: SharedBrowser):
+        try:
+            browser.quit()
+        except Exception as e:
+            logger.warning("Error quitting shared browser", extra={"error": str(e)})
@@ -0,0 +1,582 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+from browser_pool import POOL_ACQUIRE_TIMEOUT, POOL_MAX_USES, POOL_SIZE, BrowserPool, PooledSession
+from browser_profile import BrowserProfile, RequestFilter
+from dom_extract import EXTRACT_FIELDS_SCRIPT
+from driver_backend import DriverBackend, ElementNotFoundError
+from element_cache import SUBMIT_CANDIDATES_JS
+
+logger = logging.getLogger(__name__)
+
+# Chrome binary for the CDP backend (no chromedriver involved); looked up on PATH when unset
+CHROME_BINARY = os.getenv("CHROME_BINARY")
+CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+CDP_LAUNCH_TIMEOUT = float(os.getenv("CDP_LAUNCH_TIMEOUT", "20"))
+CDP_NAVIGATION_TIMEOUT = float(os.getenv("CDP_NAVIGATION_TIMEOUT", "30"))
+# Pages per Chrome process in BROWSER_POOL_MODE=cdp, as for tab mode
+CDP_MAX_PAGES = int(os.getenv("BROWSER_MAX_TABS", "4"))
+
+# Input types a keyboard can't type a value into (pickers and sliders); set as the bulk fill does
+SETTER_INPUT_TYPES = {"date", "time", "datetime-local", "month", "week", "color", "range"}
+
+# Focuses a control and selects its current value, so inserted text replaces it; returns its type
+FOCUS_AND_SELECT_SCRIPT = """
+var el = document.getElementById(arguments[0]);
+if (!el) { return null; }
+el.focus();
+try { el.select(); } catch (e) {}
+return el.type || el.tagName.toLowerCase();
+"""
+
+# Fires change and blurs, as a user tabbing out of the field would; returns the value the control kept
+COMMIT_INPUT_SCRIPT = """
+var el = document.getElementById(arguments[0]);
+el.dispatchEvent(new Event('change', {bubbles: true}));
+el.blur();
+return el.value;
+"""
+
+# Sets the value through the prototype's native setter (so React's value tracker notices),
+# fires input/change and returns the value the control kept after sanitising it
+SET_VALUE_SCRIPT = """
+var el = document.getElementById(arguments[0]);
+var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+el.blur();
+return el.value;
+"""
+
+CLICK_SCRIPT = """
+var el = document.querySelector(arguments[0]);
+if (!el) { return false; }
+el.scrollIntoView({block: 'center'});
+el.click();
+return true;
+"""
+
+# Chooses options by visible text (whitespace-normalised, as Selenium's Select does), only
+# those for a multiple select. Returns null when done, false without a select, else the first
+# text no option carries.
+SELECT_OPTIONS_SCRIPT = """
+var el = document.getElementById(arguments[0]), texts = arguments[1];
+if (!el || !el.options) { return false; }
+function norm(s) { return String(s).replace(/\\s+/g, ' ').trim(); }
+var options = Array.from(el.options), chosen = [];
+for (var i = 0; i < texts.length; i++) {
+    var text = norm(texts[i]);
+    var match = options.filter(function (o) { return norm(o.text) === text; })[0];
+    if (!match) { return texts[i]; }
+    chosen.push(match);
+}
+if (el.multiple) {
+    options.forEach(function (o) { o.selected = chosen.indexOf(o) >= 0; });
+} else if (chosen.length) {
+    chosen[chosen.length - 1].selected = true;
+}
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return null;
+"""
+
+# Clicks a checkbox when its state differs, as a user would
+SET_CHECKED_SCRIPT = """
+var el = document.getElementById(arguments[0]);
+if (!el) { return false; }
+if (el.checked !== arguments[1]) { el.scrollIntoView({block: 'center'}); el.click(); }
+return true;
+"""
+
+CHOOSE_RADIO_SCRIPT = """
+var name = arguments[0], value = arguments[1];
+var radio = Array.from(document.querySelectorAll("input[type='radio']")).filter(function (el) {
+    return el.value === value && (!name || el.name === name);
+})[0];
+if (!radio) { return false; }
+radio.scrollIntoView({block: 'center'});
+radio.click();
+return true;
+"""
+
+# Clicks the first submit candidate that can take a click (enabled and rendered)
+CLICK_SUBMIT_SCRIPT = SUBMIT_CANDIDATES_JS + """
+var candidates = submitCandidates(arguments[0]);
+if (candidates === null) { return 'no_form'; }
+var target = candidates.filter(function (el) { return !el.disabled && el.getClientRects().length; })[0];
+if (!target) { return candidates.length ? 'not_clickable' : 'no_control'; }
+target.scrollIntoView({block: 'center'});
+target.click();
+return 'clicked';
+"""
+
+
+class ChromeNotFoundError(Exception):
+    pass
+
+
+class CdpError(Exception):
+    pass
+
+
+class ValueRejectedError(Exception):
+    pass
+
+
+def find_chrome() -> str:
+    if CHROME_BINARY:
+        return CHROME_BINARY
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise ChromeNotFoundError("No Chrome binary: set CHROME_BINARY or put Chrome on PATH")
+
+
+# One browser-level DevTools websocket. Pages are attached as flattened sessions, so every
+# page's commands and events share this connection; a reader task routes replies and events.
+class CdpConnection:
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._listeners: Dict[Optional[str], Callable[[str, dict], None]] = {}
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def open(cls, url: str) -> "CdpConnection":
+        return cls(await connect(url, max_size=None, ping_interval=None))
+
+    async def send(self, method: str, params: Optional[dict] = None, session_id: Optional[str] = None) -> dict:
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        try:
+            await self._websocket.send(json.dumps(message))
+            return await future
+        finally:
+            self._pending.pop(message_id, None)
+
+    # Events of one session (None: browser-level events) go to its listener
+    def listen(self, session_id: Optional[str], listener: Callable[[str, dict], None]):
+        self._listeners[session_id] = listener
+
+    def unlisten(self, session_id: Optional[str]):
+        self._listeners.pop(session_id, None)
+
+    async def _read(self):
+        try:
+            async for raw in self._websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    listener = self._listeners.get(message.get("sessionId"))
+                    if listener is not None:
+                        listener(message["method"], message.get("params", {}))
+        except ConnectionClosed:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("DevTools connection closed"))
+
+    async def close(self):
+        await self._websocket.close()
+        await self._reader
+
+
+# A Chrome process driven directly over DevTools. Each page is a tab in its own browser
+# context, so pages on one browser don't share cookies or storage.
+class CdpBrowser:
+    def __init__(self, process, connection: CdpConnection, profile: BrowserProfile, user_data_dir: str):
+        self.process = process
+        self.connection = connection
+        self.profile = profile
+        self.user_data_dir = user_data_dir
+        self.loop = asyncio.get_running_loop()
+        self.pages = 0
+
+    @classmethod
+    async def launch(cls, profile: Optional[BrowserProfile] = None) -> "CdpBrowser":
+        profile = profile or BrowserProfile.from_env()
+        user_data_dir = tempfile.mkdtemp(prefix="form-agent-cdp-")
+        arguments = profile.chrome_options().arguments + [
+            "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}", "about:blank",
+        ]
+        process = await asyncio.create_subprocess_exec(
+            find_chrome(), *arguments, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            url = await cls._debugger_url(process, user_data_dir)
+            connection = await CdpConnection.open(url)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        return cls(process, connection, profile, user_data_dir)
+
+    # Chrome writes its DevTools port and browser target path to DevToolsActivePort once listening
+    @staticmethod
+    async def _debugger_url(process, user_data_dir: str) -> str:
+        path = os.path.join(user_data_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + CDP_LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.returncode is not None:
+                raise ChromeNotFoundError(f"Chrome exited during startup (code {process.returncode})")
+            try:
+                with open(path) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            except FileNotFoundError:
+                pass
+            await asyncio.sleep(0.05)
+        raise TimeoutError(f"Chrome did not open a DevTools port within {CDP_LAUNCH_TIMEOUT:.0f}s")
+
+    # A blank tab in a new browser context: (target id, context id, session id)
+    async def open_target(self) -> tuple:
+        send = self.connection.send
+        context_id = (await send("Target.createBrowserContext", {"disposeOnDetach": True}))["browserContextId"]
+        target_id = (await send("Target.createTarget", {"url": "about:blank", "browserContextId": context_id}))["targetId"]
+        session_id = (await send("Target.attachToTarget", {"targetId": target_id, "flatten": True}))["sessionId"]
+        return target_id, context_id, session_id
+
+    async def new_page(self) -> "CdpPage":
+        page = CdpPage(self, *await self.open_target())
+        await page.aenable()
+        self.pages += 1
+        return page
+
+    async def close(self):
+        try:
+            await self.connection.send("Browser.close")
+        except CdpError:
+            pass
+        await self.connection.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+# One tab driven natively over CDP: commands are websocket messages, never blocking the loop.
+# Dialogs are accepted as they open and recorded for take_dialog. Coroutines (a-prefixed) serve
+# code already on the browser's event loop; the blocking DriverBackend methods the form agents
+# call from their worker threads hand the same coroutines to that loop and wait.
+class CdpPage(DriverBackend):
+    name = "cdp"
+
+    def __init__(self, browser: CdpBrowser, target_id: str, context_id: str, session_id: str):
+        self.browser = browser
+        self.request_filter: Optional[RequestFilter] = None
+        self._dialogs = deque()
+        self._loaded = asyncio.Event()
+        self._tasks = set()
+        self.commands = Counter()
+        self.exceptions = Counter()
+        # With the eager page-load strategy the page is usable once the DOM is parsed
+        eager = browser.profile.page_load_strategy in ("eager", "none")
+        self._load_event = "Page.domContentEventFired" if eager else "Page.loadEventFired"
+        self._attach(target_id, context_id, session_id)
+
+    def _attach(self, target_id: str, context_id: str, session_id: str):
+        self.target_id = target_id
+        self.context_id = context_id
+        self.session_id = session_id
+        self.browser.connection.listen(session_id, self._on_event)
+
+    async def _send(self, method: str, params: Optional[dict] = None) -> dict:
+        self.commands[method] += 1
+        return await self.browser.connection.send(method, params, self.session_id)
+
+    async def aenable(self):
+        await self._send("Page.enable")
+        profile = self.browser.profile
+        if profile.blocks_requests:
+            self.request_filter = RequestFilter(profile.block_resource_types, profile.block_third_party, self.target_id)
+            await self._send("Fetch.enable", {"patterns": self.request_filter.patterns()})
+
+    # Event handlers run on the reader task; replies are sent from their own tasks
+    def _reply(self, method: str, params: dict):
+        task = asyncio.create_task(self._send(method, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_event(self, method: str, params: dict):
+        if method == self._load_event:
+            self._loaded.set()
+        elif method == "Page.javascriptDialogOpening":
+            self._dialogs.append(params.get("message", ""))
+            self._reply("Page.handleJavaScriptDialog", {"accept": True})
+        elif method == "Fetch.requestPaused" and self.request_filter is not None:
+            self._reply(*self.request_filter.answer(params))
+
+    async def anavigate(self, url: str):
+        self._loaded.clear()
+        result = await self._send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CdpError(f"Navigation to {url} failed: {result['errorText']}")
+        await asyncio.wait_for(self._loaded.wait(), CDP_NAVIGATION_TIMEOUT)
+
+    async def aevaluate(self, script: str, *args) -> Any:
+        expression = f"(function () {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+        result = await self._send("Runtime.evaluate", {"expression": expression, "returnByValue": True, "awaitPromise": True})
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CdpError(details.get("exception", {}).get("description") or details.get("text", "Script error"))
+        return result["result"].get("value")
+
+    # The value is read back: a control that sanitised it away (a bad date, truncation at
+    # maxlength) raises instead of counting as filled
+    async def atype_text(self, element_id: str, text: str):
+        kind = await self.aevaluate(FOCUS_AND_SELECT_SCRIPT, element_id)
+        if kind is None:
+            raise ElementNotFoundError(element_id)
+        if kind in SETTER_INPUT_TYPES:
+            value = await self.aevaluate(SET_VALUE_SCRIPT, element_id, text)
+        else:
+            await self._send("Input.insertText", {"text": text})
+            value = await self.aevaluate(COMMIT_INPUT_SCRIPT, element_id)
+        if str(value).lower() != text.lower():
+            raise ValueRejectedError(f"{element_id} kept {value!r} instead of {text!r}")
+
+    async def aset_files(self, element_id: str, paths: List[str]):
+        root = (await self._send("DOM.getDocument", {"depth": 0}))["root"]["nodeId"]
+        selector = '[id="' + element_id.replace("\\", "\\\\").replace('"', '\\"') + '"]'
+        node = (await self._send("DOM.querySelector", {"nodeId": root, "selector": selector}))["nodeId"]
+        if not node:
+            raise ElementNotFoundError(element_id)
+        await self._send("DOM.setFileInputFiles", {"nodeId": node, "files": [os.path.abspath(p) for p in paths]})
+
+    # A fresh browser context replaces the page's own, so nothing a form left behind (cookies,
+    # storage, cache, service workers) reaches the next one
+    async def areset(self):
+        await self._dispose()
+        self._dialogs.clear()
+        self._attach(*await self.browser.open_target())
+        await self.aenable()
+
+    async def aquit(self):
+        await self._dispose()
+        self.browser.pages -= 1
+
+    async def _dispose(self):
+        self.browser.connection.unlisten(self.session_id)
+        send = self.browser.connection.send
+        try:
+            await send("Target.closeTarget", {"targetId": self.target_id})
+            await send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+        except Exception as e:
+            logger.warning("Error closing CDP page", extra={"error": str(e)})
+
+    # Blocking calls from a worker thread; on the loop's own thread they would deadlock
+    def _run(self, coro):
+        loop = self.browser.loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("Blocking CdpPage calls can't run on the browser's event loop; await the a-prefixed coroutines")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    @property
+    def page_load_strategy(self) -> str:
+        return self.browser.profile.page_load_strategy
+
+    def navigate(self, url: str):
+        self._run(self.anavigate(url))
+
+    def evaluate(self, script: str, *args) -> Any:
+        return self._run(self.aevaluate(script, *args))
+
+    def cdp(self, method: str, params: Optional[dict] = None) -> dict:
+        return self._run(self._send(method, params))
+
+    def discover_fields(self, form_selector: Optional[str] = None) -> List[dict]:
+        payload = self.evaluate(EXTRACT_FIELDS_SCRIPT, form_selector)
+        if payload is None:
+            raise ElementNotFoundError(f"No form found (selector: {form_selector or 'form'})")
+        return payload
+
+    def ensure_element(self, element_id: str):
+        if not self.evaluate("return !!document.getElementById(arguments[0])", element_id):
+            raise ElementNotFoundError(element_id)
+
+    def type_text(self, element_id: str, text: str):
+        self._run(self.atype_text(element_id, text))
+
+    def set_files(self, element_id: str, paths: List[str]):
+        self._run(self.aset_files(element_id, paths))
+
+    def select_options(self, element_id: str, texts: List[str]):
+        missing = self.evaluate(SELECT_OPTIONS_SCRIPT, element_id, list(texts))
+        if missing is False:
+            raise ElementNotFoundError(element_id)
+        if missing is not None:
+            raise ElementNotFoundError(f"{element_id}: no option {missing}")
+
+    def set_checked(self, element_id: str, checked: bool):
+        if not self.evaluate(SET_CHECKED_SCRIPT, element_id, checked):
+            raise ElementNotFoundError(element_id)
+
+    def choose_radio(self, name: Optional[str], value: str):
+        if not self.evaluate(CHOOSE_RADIO_SCRIPT, name, value):
+            raise ElementNotFoundError(f"No radio with value {value} (group: {name})")
+
+    def click(self, selector: str):
+        if not self.evaluate(CLICK_SCRIPT, selector):
+            raise ElementNotFoundError(selector)
+
+    def click_submit(self, form_selector: Optional[str] = None, before_click: Optional[Callable[[], None]] = None):
+        if before_click is not None:
+            before_click()
+        result = self.evaluate(CLICK_SUBMIT_SCRIPT, form_selector)
+        if result == "no_form":
+            raise ElementNotFoundError(f"No form found (selector: {form_selector or 'form'})")
+        if result == "no_control":
+            raise ElementNotFoundError("No submit control in the form")
+        if result != "clicked":
+            raise ElementNotFoundError("No submit control in the form takes a click")
+
+    def take_dialog(self) -> Optional[str]:
+        return self._dialogs.popleft() if self._dialogs else None
+
+    def reset_stats(self):
+        self.commands.clear()
+        self.exceptions.clear()
+
+    def note_exception(self, error: Exception):
+        self.exceptions[type(error).__name__] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "round_trips": sum(self.commands.values()),
+            "by_command": dict(self.commands),
+            "exceptions": dict(self.exceptions),
+        }
+
+    def reset(self):
+        self._run(self.areset())
+
+    def quit(self):
+        self._run(self.aquit())
+
+
+# An event loop on its own thread. Blocking callers (the form worker threads of a CdpPool)
+# hand it coroutines and wait, while every page's DevTools traffic shares the one loop.
+class CdpLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="cdp-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+# BrowserPool whose sessions are CdpPages (each its own browser context) in Chrome processes
+# driven over DevTools, with no chromedriver: `size` forms at once across
+# ceil(size / max_pages) browsers, all on one CdpLoop.
+class CdpPool(BrowserPool):
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_uses: int = POOL_MAX_USES,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        max_pages: int = CDP_MAX_PAGES,
+        profile: Optional[BrowserProfile] = None,
+    ):
+        super().__init__(size, max_uses, acquire_timeout, driver_factory=self._open_page)
+        self.max_pages = max(1, max_pages)
+        self.profile = profile or BrowserProfile.from_env()
+        self._loop: Optional[CdpLoop] = None
+        self._browsers: List[CdpBrowser] = []
+        self._browsers_lock = threading.Lock()
+
+    # Open a page in the least-loaded browser with room, starting a browser when all are full
+    def _open_page(self) -> CdpPage:
+        with self._browsers_lock:
+            if self._loop is None:
+                self._loop = CdpLoop()
+            browser = min(
+                (b for b in self._browsers if b.pages < self.max_pages), key=lambda b: b.pages, default=None
+            )
+            if browser is not None:
+                try:
+                    return self._loop.run(browser.new_page())
+                except Exception as e:
+                    logger.warning("CDP browser failed to open a page, replacing it", extra={"error": str(e)})
+                    self._browsers.remove(browser)
+                    self._close_browser(browser)
+            browser = self._loop.run(CdpBrowser.launch(self.profile))
+            self._browsers.append(browser)
+            return self._loop.run(browser.new_page())
+
+    def reset(self, page: CdpPage, history_mark: Optional[int] = None) -> Optional[int]:
+        page.reset()
+        return None
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        try:
+            return session.driver.evaluate("return 1") == 1
+        except Exception:
+            return False
+
+    def stats(self) -> dict:
+        with self._browsers_lock:
+            pages = [b.pages for b in self._browsers]
+        return {
+            **super().stats(),
+            "mode": "cdp",
+            "max_pages": self.max_pages,
+            "browsers": len(pages),
+            "pages_per_browser": pages,
+        }
+
+    def close(self):
+        super().close()
+        with self._browsers_lock:
+            browsers, self._browsers = self._browsers, []
+            loop, self._loop = self._loop, None
+        for browser in browsers:
+            self._close_browser(browser, loop)
+        if loop is not None:
+            loop.close()
+
+    def _close_browser(self, browser: CdpBrowser, loop: Optional[CdpLoop] = None):
+        try:
+            (loop or self._loop).run(browser.close())
+        except Exception as e:
+            logger.warning("Error closing CDP browser", extra={"error": str(e)})
@@ -0,0 +1,104 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger(__name__)
+
+# Pinned chromedriver binary; without it the binary is looked up on PATH, then downloaded once
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+# Set to 0 on offline hosts so a missing binary fails instead of trying a download
+CHROMEDRIVER_AUTO_INSTALL = os.getenv("CHROMEDRIVER_AUTO_INSTALL", "1") != "0"
+CHROMEDRIVER_CHECK_TIMEOUT = 10
+
+
+class ChromeDriverNotFoundError(Exception):
+    pass
+
+
+_resolve_lock = threading.Lock()
+_resolution: Optional[dict] = None
+
+
+# Path of the chromedriver binary, resolved once per process
+def resolve_chromedriver() -> str:
+    global _resolution
+    with _resolve_lock:
+        if _resolution is not None:
+            return _resolution["path"]
+        started = time.perf_counter()
+        pinned = os.getenv("CHROMEDRIVER_PATH", CHROMEDRIVER_PATH)
+        if pinned:
+            if not (os.path.isfile(pinned) and os.access(pinned, os.X_OK)):
+                raise ChromeDriverNotFoundError(f"CHROMEDRIVER_PATH {pinned} is not an executable file")
+            path, source = pinned, "env"
+        elif shutil.which("chromedriver"):
+            path, source = shutil.which("chromedriver"), "path"
+        elif CHROMEDRIVER_AUTO_INSTALL:
+            from webdriver_manager.chrome import ChromeDriverManager
+            try:
+                path, source = ChromeDriverManager().install(), "webdriver_manager"
+            except Exception as e:
+                raise ChromeDriverNotFoundError(f"Could not download chromedriver: {e}") from e
+        else:
+            raise ChromeDriverNotFoundError("No chromedriver: set CHROMEDRIVER_PATH or put chromedriver on PATH")
+        _resolution = {"path": path, "source": source, "seconds": round(time.perf_counter() - started, 4)}
+        return path
+
+
+# Startup health check: resolve the binary and make sure it runs. Exports the resolved path
+# so worker processes inherit it instead of resolving again.
+def check_chromedriver() -> dict:
+    path = resolve_chromedriver()
+    try:
+        version = subprocess.run(
+            [path, "--version"], capture_output=True, text=True, timeout=CHROMEDRIVER_CHECK_TIMEOUT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError) as e:
+        raise ChromeDriverNotFoundError(f"chromedriver at {path} does not run: {e}") from e
+    os.environ["CHROMEDRIVER_PATH"] = path
+    logger.info("Using chromedriver", extra={"version": version, "source": _resolution["source"], "path": path})
+    return {**_resolution, "version": version}
+
+
+# One chromedriver process serves every session in this process: the first session starts it,
+# later ones attach to it, and it stops when the last session quits.
+class SharedChromeService(Service):
+    def __init__(self, executable_path: str):
+        super().__init__(executable_path=executable_path)
+        self._lock = threading.Lock()
+        self._sessions = 0
+        self.starts = 0
+
+    def start(self):
+        with self._lock:
+            if self._sessions == 0 or self.process is None or self.process.poll() is not None:
+                super().start()
+                self.starts += 1
+            self._sessions += 1
+
+    def stop(self):
+        with self._lock:
+            self._sessions = max(0, self._sessions - 1)
+            if self._sessions == 0:
+                super().stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": self._sessions, "starts": self.starts, "path": self.path}
+
+
+_shared_service: Optional[SharedChromeService] = None
+_service_lock = threading.Lock()
+
+
+def chromedriver_service() -> SharedChromeService:
+    global _shared_service
+    with _service_lock:
+        if _shared_service is None:
+            _shared_service = SharedChromeService(resolve_chromedriver())
+        return _shared_service
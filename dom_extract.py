@@ -0,0 +1,98 @@
+from typing import Any, List, Optional, Tuple
+from selenium.common.exceptions import NoSuchElementException
+
+# Shared helpers: describeField(el) returns the metadata of one form control
+FIELD_HELPERS_JS = """
+function text(node) { return node ? (node.innerText || node.textContent || '').trim() : ''; }
+
+function labelFor(el) {
+    var label = '';
+    if (el.id) {
+        var byFor = document.querySelector('label[for="' + CSS.escape(el.id) + '"]');
+        label = text(byFor);
+    }
+    if (!label) { label = text(el.closest('label')); }
+    if (!label) { label = (el.getAttribute('aria-label') || '').trim(); }
+    if (!label && el.getAttribute('aria-labelledby')) {
+        label = el.getAttribute('aria-labelledby').split(/\\s+/).map(function (id) {
+            return text(document.getElementById(id));
+        }).join(' ').trim();
+    }
+    return label || el.getAttribute('name') || 'Unknown';
+}
+
+function fieldType(el) {
+    var tag = el.tagName.toLowerCase();
+    if (tag === 'select') { return el.multiple ? 'multiselect' : 'select'; }
+    if (tag === 'textarea') { return 'textarea'; }
+    return (el.getAttribute('type') || el.type || tag).toLowerCase();
+}
+
+function isVisible(el) {
+    if (!el.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function describeField(el) {
+    var tag = el.tagName.toLowerCase();
+    return {
+        id: el.id,
+        name: el.getAttribute('name'),
+        type: fieldType(el),
+        tag: tag,
+        label: labelFor(el),
+        // A radio's option is its own value; the group is the radios sharing its name
+        options: tag === 'select' ? Array.from(el.options).map(function (o) { return o.text; })
+            : (el.type === 'radio' ? [el.value] : null),
+        required: el.required,
+        pattern: el.getAttribute('pattern'),
+        min: el.getAttribute('min'),
+        max: el.getAttribute('max'),
+        maxlength: el.maxLength > 0 ? el.maxLength : null,
+        visible: isVisible(el)
+    };
+}
+
+function formRoot(selector) {
+    return (selector && document.querySelector(selector)) || document.querySelector('form');
+}
+
+function describeControls(root) {
+    return Array.from(root.querySelectorAll('input, select, textarea')).filter(function (el) {
+        return el.id;
+    }).map(describeField);
+}
+"""
+
+# Collects every form control and its metadata in a single execute_script round trip.
+# Mirrors the per-element discovery: only controls with an id are returned.
+EXTRACT_FIELDS_SCRIPT = FIELD_HELPERS_JS + """
+var root = formRoot(arguments[0]);
+return root ? describeControls(root) : null;
+"""
+
+# Same read, plus the WebElement of each control (WebDriver only; element references don't
+# survive a by-value CDP evaluation)
+EXTRACT_FIELDS_AND_ELEMENTS_SCRIPT = FIELD_HELPERS_JS + """
+var root = formRoot(arguments[0]);
+if (!root) { return null; }
+var controls = Array.from(root.querySelectorAll('input, select, textarea')).filter(function (el) { return el.id; });
+return [controls.map(describeField), controls];
+"""
+
+
+# Returns one dict per form control (id, name, type, tag, label, options, constraints, visibility)
+def extract_fields(driver, form_selector: Optional[str] = None) -> List[dict]:
+    payload = driver.execute_script(EXTRACT_FIELDS_SCRIPT, form_selector)
+    if payload is None:
+        raise NoSuchElementException(f"No form found (selector: {form_selector or 'form'})")
+    return payload
+
+
+# Field dicts and the matching WebElements, in the same order, from one round trip
+def extract_fields_and_elements(driver, form_selector: Optional[str] = None) -> Tuple[List[dict], List[Any]]:
+    payload = driver.execute_script(EXTRACT_FIELDS_AND_ELEMENTS_SCRIPT, form_selector)
+    if payload is None:
+        raise NoSuchElementException(f"No form found (selector: {form_selector or 'form'})")
+    return payload[0], payload[1]
@@ -0,0 +1,78 @@
+from typing import List
+
+# Types a script cannot set; these always go through per-field send_keys
+SCRIPT_UNFILLABLE_TYPES = {"file"}
+
+# Sets every value in one execute_script call. Text-like values go through the prototype's native
+# value setter so React's value tracker notices the change, then input/change events are dispatched
+# so controlled components (e.g. App.js handleChange) update their state. Returns the ids that
+# could not be set and need the per-field fallback.
+BULK_FILL_SCRIPT = """
+var items = arguments[0];
+var failed = [];
+
+function nativeSetter(el) {
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    return Object.getOwnPropertyDescriptor(proto, 'value').set;
+}
+
+function fire(el, names) {
+    names.forEach(function (name) { el.dispatchEvent(new Event(name, {bubbles: true})); });
+}
+
+function truthy(value) {
+    return value === true || String(value).toLowerCase() === 'true';
+}
+
+items.forEach(function (item) {
+    var el = document.getElementById(item.id);
+    if (!el || el.disabled) { failed.push(item.id); return; }
+    try {
+        if (item.type === 'checkbox') {
+            if (el.checked !== truthy(item.value)) { el.click(); }
+        } else if (item.type === 'radio') {
+            var scope = el.form || document;
+            var radio = Array.from(scope.querySelectorAll('input[type="radio"]')).find(function (r) {
+                return r.name === el.name && r.value === String(item.value);
+            });
+            if (!radio) { failed.push(item.id); return; }
+            if (!radio.checked) { radio.click(); }
+        } else if (el.tagName === 'SELECT') {
+            var wanted = Array.isArray(item.value) ? item.value.map(String) : [String(item.value)];
+            var matched = 0;
+            Array.from(el.options).forEach(function (option) {
+                var selected = wanted.indexOf(option.text) !== -1 || wanted.indexOf(option.value) !== -1;
+                option.selected = selected;
+                if (selected) { matched++; }
+            });
+            if (!matched) { failed.push(item.id); return; }
+            fire(el, ['input', 'change']);
+        } else {
+            var value = item.value === null || item.value === undefined ? '' : String(item.value);
+            el.focus();
+            nativeSetter(el).call(el, value);
+            // Inputs sanitise values they don't accept (bad dates, out-of-range numbers...)
+            if (String(el.value).toLowerCase() !== value.toLowerCase()) { failed.push(item.id); return; }
+            fire(el, ['input', 'change']);
+            el.blur();
+        }
+    } catch (e) {
+        failed.push(item.id);
+    }
+});
+return failed;
+"""
+
+
+# Fill all fields in one round trip; returns the ids that need a per-field fallback
+def bulk_fill(backend, fields) -> List[str]:
+    items = []
+    fallback = []
+    for field in fields:
+        if field.type in SCRIPT_UNFILLABLE_TYPES:
+            fallback.append(field.id)
+        else:
+            items.append({"id": field.id, "type": field.type, "value": field.value})
+    if items:
+        fallback.extend(backend.evaluate(BULK_FILL_SCRIPT, items))
+    return fallback
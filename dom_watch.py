@@ -0,0 +1,125 @@
+import os
+from typing import List, Optional, Tuple
+from selenium.common.exceptions import NoSuchElementException
+from dom_extract import FIELD_HELPERS_JS
+
+# Set FORM_CHANGE_FEED=0 to rescan the whole form on every iteration instead
+CHANGE_FEED_ENABLED = os.getenv("FORM_CHANGE_FEED", "1") != "0"
+
+# Attributes that change what discovery reports about a control (or a label's target)
+WATCHED_ATTRIBUTES = [
+    "id", "type", "name", "multiple", "required", "pattern", "min", "max", "maxlength",
+    "hidden", "style", "class", "disabled", "aria-label", "aria-labelledby", "for",
+]
+
+# Installs a MutationObserver on the form that records the ids of controls added, removed
+# or changed since the last read, and returns the full field list in the same round trip.
+WATCH_FORM_SCRIPT = FIELD_HELPERS_JS + """
+var root = formRoot(arguments[0]);
+if (!root) { return null; }
+var previous = window.__formAgentWatch;
+if (previous) { previous.observer.disconnect(); }
+
+var CONTROLS = 'input, select, textarea';
+var watch = window.__formAgentWatch = {root: root, dirty: new Set(), removed: new Set()};
+
+function controlsIn(node) {
+    if (node.nodeType !== 1) { return []; }
+    var found = node.matches(CONTROLS) ? [node] : [];
+    return found.concat(Array.from(node.querySelectorAll(CONTROLS)));
+}
+
+function markDirty(el) { if (el && el.id) { watch.dirty.add(el.id); } }
+
+// Label edits change the label of the control they point at
+function markLabel(node) {
+    var el = node.nodeType === 1 ? node : node.parentElement;
+    var label = el && el.closest('label');
+    if (!label) { return; }
+    markDirty(label.htmlFor ? document.getElementById(label.htmlFor) : label.querySelector(CONTROLS));
+}
+
+watch.handle = function (records) {
+    records.forEach(function (record) {
+        var target = record.target;
+        if (record.type === 'childList') {
+            record.addedNodes.forEach(function (node) { controlsIn(node).forEach(markDirty); });
+            record.removedNodes.forEach(function (node) {
+                controlsIn(node).forEach(function (el) { if (el.id) { watch.removed.add(el.id); } });
+            });
+            var select = target.closest && target.closest('select');
+            if (select) { markDirty(select); }  // Options added or removed
+            markLabel(target);
+        } else if (record.type === 'characterData') {
+            markLabel(target);
+        } else if (target.matches(CONTROLS)) {
+            if (record.attributeName === 'id' && record.oldValue) { watch.removed.add(record.oldValue); }
+            markDirty(target);
+        } else if (record.attributeName === 'for' || target.tagName === 'LABEL') {
+            markLabel(target);
+        } else {
+            // Visibility of a container (style/class/hidden) affects every control inside it
+            controlsIn(target).forEach(markDirty);
+        }
+    });
+};
+watch.observer = new MutationObserver(watch.handle);
+watch.observer.observe(root, {
+    childList: true, subtree: true, characterData: true,
+    attributes: true, attributeOldValue: true, attributeFilter: arguments[1]
+});
+return describeControls(root);
+"""
+
+# Returns the controls changed since the last read and the ids removed, then clears them.
+# Returns null when the observer is gone (navigation, or the form element was replaced).
+READ_CHANGES_SCRIPT = FIELD_HELPERS_JS + """
+var watch = window.__formAgentWatch;
+if (!watch || !document.contains(watch.root)) { return null; }
+watch.handle(watch.observer.takeRecords());
+
+function current(id) {
+    var el = document.getElementById(id);
+    return el && watch.root.contains(el) && el.matches('input, select, textarea') ? el : null;
+}
+
+var changed = [];
+watch.dirty.forEach(function (id) {
+    var el = current(id);
+    if (el) { changed.push(describeField(el)); } else { watch.removed.add(id); }
+});
+var removed = Array.from(watch.removed).filter(function (id) { return !current(id); });
+watch.dirty.clear();
+watch.removed.clear();
+return {changed: changed, removed: removed};
+"""
+
+
+# Incremental field discovery: one full read when the feed is installed, then only deltas
+class DomChangeFeed:
+    def __init__(self, driver, form_selector: Optional[str] = None):
+        self.driver = driver
+        self.form_selector = form_selector
+        self.counters = {"full_scans": 0, "delta_reads": 0, "fallbacks": 0, "changed": 0, "removed": 0}
+
+    # Installs (or reinstalls) the observer and returns every field, like extract_fields
+    def start(self) -> List[dict]:
+        payload = self.driver.execute_script(WATCH_FORM_SCRIPT, self.form_selector, WATCHED_ATTRIBUTES)
+        if payload is None:
+            raise NoSuchElementException(f"No form found (selector: {self.form_selector or 'form'})")
+        self.counters["full_scans"] += 1
+        return payload
+
+    # (changed fields, removed ids) since the last read, or None when a full rescan is needed
+    def changes(self) -> Optional[Tuple[List[dict], List[str]]]:
+        result = self.driver.execute_script(READ_CHANGES_SCRIPT)
+        if result is None:
+            self.counters["fallbacks"] += 1
+            return None
+        self.counters["delta_reads"] += 1
+        self.counters["changed"] += len(result["changed"])
+        self.counters["removed"] += len(result["removed"])
+        return result["changed"], result["removed"]
+
+    def stats(self) -> dict:
+        return dict(self.counters)
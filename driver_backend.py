@@ -0,0 +1,262 @@
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from selenium.common.exceptions import NoAlertPresentException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select
+from dom_extract import extract_fields_and_elements
+from driver_stats import RoundTripCounter
+from element_cache import ElementCache
+
+
+class ElementNotFoundError(Exception):
+    pass
+
+
+# A backend bound to one tab was used after its form released the tab, or its driver no longer
+# drives that tab; the command is refused instead of landing in another form's page
+class TabMismatchError(Exception):
+    pass
+
+
+# What the form agents need from a browser tab: discovery, filling, submission and what the
+# waits read. Calls block; the agents run each form on a worker thread. Scripts use
+# execute_script conventions: a function body that reads `arguments` and returns a
+# JSON-serialisable value. Controls are addressed by id, radios by group name and value.
+class DriverBackend:
+    name = "base"
+    page_load_strategy = "normal"
+
+    def navigate(self, url: str):
+        raise NotImplementedError
+
+    def evaluate(self, script: str, *args) -> Any:
+        raise NotImplementedError
+
+    def current_url(self) -> str:
+        return self.evaluate("return location.href")
+
+    # A Chrome DevTools Protocol command on this tab
+    def cdp(self, method: str, params: Optional[dict] = None) -> dict:
+        raise NotImplementedError
+
+    # Metadata of every control of the form (by selector, else the first form), as extract_fields returns it
+    def discover_fields(self, form_selector: Optional[str] = None) -> List[dict]:
+        raise NotImplementedError
+
+    # Fields known without discovery (a cached schema), and fields gone from the page
+    def prime_fields(self, fields: Iterable[dict]):
+        pass
+
+    def forget_field(self, element_id: str):
+        pass
+
+    # Raises ElementNotFoundError (or the driver's own error) when there is no control with this id
+    def ensure_element(self, element_id: str):
+        raise NotImplementedError
+
+    # Replace the value of a text-like control with real keystrokes
+    def type_text(self, element_id: str, text: str):
+        raise NotImplementedError
+
+    def set_files(self, element_id: str, paths: List[str]):
+        raise NotImplementedError
+
+    # Choose these option texts (only them, for a multiple select); raises if one is missing
+    def select_options(self, element_id: str, texts: List[str]):
+        raise NotImplementedError
+
+    def set_checked(self, element_id: str, checked: bool):
+        raise NotImplementedError
+
+    # Click the radio of group `name` (any group when None) carrying `value`
+    def choose_radio(self, name: Optional[str], value: str):
+        raise NotImplementedError
+
+    # Click the first element matching a CSS selector; raises when it is missing or not clickable
+    def click(self, selector: str):
+        raise NotImplementedError
+
+    # Click the form's first submit control that takes the click, in SUBMIT_CANDIDATES_SCRIPT
+    # order; before_click runs ahead of each click (e.g. arming the submit waiter)
+    def click_submit(self, form_selector: Optional[str] = None, before_click: Optional[Callable[[], None]] = None):
+        raise NotImplementedError
+
+    # Accept an open alert/confirm/prompt and return its text, or None if there is none
+    def take_dialog(self) -> Optional[str]:
+        raise NotImplementedError
+
+    # Commands issued, and exceptions callers reported, since reset_stats
+    def reset_stats(self):
+        pass
+
+    def note_exception(self, error: Exception):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    # The form is done with the tab; a backend that owns its browser shuts it down
+    def close(self):
+        pass
+
+
+# Backend commands check first that the backend still drives the tab it was created for
+def _in_tab(method):
+    @functools.wraps(method)
+    def checked(self, *args, **kwargs):
+        self.check_tab()
+        return method(self, *args, **kwargs)
+
+    return checked
+
+
+# A Selenium WebDriver session (a pooled browser, or one tab of a shared browser). Discovery
+# returns the element handles with the metadata and fills go through the ElementCache, so a
+# control is looked up once per form; every WebDriver command is counted from reset_stats on.
+# A tab's backend records the tab's window handle and refuses commands once the tab is no
+# longer its own (see check_tab).
+class SeleniumBackend(DriverBackend):
+    name = "selenium"
+
+    def __init__(self, driver, owns_driver: bool = False, window_handle: Optional[str] = None):
+        self.driver = driver
+        self.owns_driver = owns_driver
+        # Tab drivers (browser_tabs.TabDriver) carry their handle; dedicated sessions have one window
+        self.window_handle = window_handle or getattr(driver, "window_handle", None)
+        self.closed = False
+        self.elements = ElementCache(driver)
+        self.round_trips: Optional[RoundTripCounter] = None
+
+    @property
+    def page_load_strategy(self) -> str:
+        return (getattr(self.driver, "capabilities", None) or {}).get("pageLoadStrategy", "normal")
+
+    # Raises TabMismatchError when a tab backend's form has released the tab, its driver is bound
+    # to another handle, or its shared browser closed (or replaced) the tab. No WebDriver command.
+    def check_tab(self):
+        if self.window_handle is None:
+            return
+        bound = getattr(self.driver, "window_handle", None)
+        tabs = getattr(getattr(self.driver, "browser", None), "tabs", None)
+        if self.closed or bound != self.window_handle or (tabs is not None and tabs.get(bound) is not self.driver):
+            raise TabMismatchError(f"Backend for tab {self.window_handle} no longer drives it (driver on {bound})")
+
+    @_in_tab
+    def navigate(self, url: str):
+        self.driver.get(url)
+
+    @_in_tab
+    def evaluate(self, script: str, *args) -> Any:
+        return self.driver.execute_script(script, *args)
+
+    @_in_tab
+    def current_url(self) -> str:
+        return self.driver.current_url
+
+    @_in_tab
+    def cdp(self, method: str, params: Optional[dict] = None) -> dict:
+        return self.driver.execute_cdp_cmd(method, params or {})
+
+    @_in_tab
+    def discover_fields(self, form_selector: Optional[str] = None) -> List[dict]:
+        payload, elements = extract_fields_and_elements(self.driver, form_selector)
+        self.elements.remember(payload, {item["id"]: element for item, element in zip(payload, elements)})
+        return payload
+
+    def prime_fields(self, fields: Iterable[dict]):
+        self.elements.prime(fields)
+
+    def forget_field(self, element_id: str):
+        self.elements.forget(element_id)
+
+    @_in_tab
+    def ensure_element(self, element_id: str):
+        self.elements.element(element_id)
+
+    @_in_tab
+    def type_text(self, element_id: str, text: str):
+        def type_into(element):
+            element.clear()
+            element.send_keys(text)
+
+        self.elements.act(element_id, type_into)
+
+    @_in_tab
+    def set_files(self, element_id: str, paths: List[str]):
+        self.elements.act(element_id, lambda element: element.send_keys("\n".join(paths)))
+
+    @_in_tab
+    def select_options(self, element_id: str, texts: List[str]):
+        def choose(element):
+            select = Select(element)
+            if select.is_multiple:
+                select.deselect_all()
+            for text in texts:
+                select.select_by_visible_text(text)
+
+        self.elements.act(element_id, choose)
+
+    @_in_tab
+    def set_checked(self, element_id: str, checked: bool):
+        def toggle(element):
+            if element.is_selected() != checked:
+                element.click()
+
+        self.elements.act(element_id, toggle)
+
+    @_in_tab
+    def choose_radio(self, name: Optional[str], value: str):
+        self.elements.act_radio(name, value, lambda element: element.click())
+
+    @_in_tab
+    def click(self, selector: str):
+        try:
+            element = self.driver.find_element(By.CSS_SELECTOR, selector)
+        except NoSuchElementException as e:
+            raise ElementNotFoundError(selector) from e
+        element.click()
+
+    @_in_tab
+    def click_submit(self, form_selector: Optional[str] = None, before_click: Optional[Callable[[], None]] = None):
+        self.elements.click_submit(form_selector, before_click=before_click)
+
+    @_in_tab
+    def take_dialog(self) -> Optional[str]:
+        try:
+            alert = self.driver.switch_to.alert
+            text = alert.text
+            alert.accept()
+            return text
+        except NoAlertPresentException:
+            return None
+
+    def reset_stats(self):
+        if self.round_trips is None:
+            self.round_trips = RoundTripCounter(self.driver)
+        else:
+            self.round_trips.reset()
+
+    def note_exception(self, error: Exception):
+        self.elements.note_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "round_trips": self.round_trips.count if self.round_trips is not None else 0,
+            "by_command": dict(self.round_trips.by_command) if self.round_trips is not None else {},
+            "elements": self.elements.stats(),
+        }
+
+    def close(self):
+        self.closed = True
+        if self.round_trips is not None:
+            self.round_trips.detach()
+        if self.owns_driver:
+            self.driver.quit()
+
+
+# Pools hand out WebDriver sessions (process and tab modes) or CDP pages (which already are backends)
+def as_backend(driver, owns_driver: bool = False) -> DriverBackend:
+    if isinstance(driver, DriverBackend):
+        return driver
+    return SeleniumBackend(driver, owns_driver=owns_driver)
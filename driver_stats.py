@@ -0,0 +1,30 @@
+from collections import Counter
+
+
+# Counts WebDriver commands issued through a driver; each one is an HTTP round trip to chromedriver
+class RoundTripCounter:
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self.by_command = Counter()
+        self._execute = driver.execute
+        self._outer = driver.__dict__.get("execute")  # A counter attached before this one, if any
+        # WebElements call back into driver.execute, so element commands are counted too
+        driver.execute = self._counted_execute
+
+    def _counted_execute(self, driver_command, params=None):
+        self.count += 1
+        self.by_command[driver_command] += 1
+        return self._execute(driver_command, params)
+
+    def reset(self):
+        self.count = 0
+        self.by_command.clear()
+
+    # Counters nest (a benchmark's around a form's); detaching hands execute back to the outer one
+    def detach(self):
+        if self.driver.__dict__.get("execute") == self._counted_execute:
+            if self._outer is not None:
+                self.driver.execute = self._outer
+            else:
+                del self.driver.execute
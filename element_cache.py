@@ -0,0 +1,153 @@
+import json
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.by import By
+
+logger = logging.getLogger(__name__)
+
+# Handles for a list of control ids in one round trip (null where an id is gone)
+RESOLVE_SCRIPT = "return arguments[0].map(function (id) { return document.getElementById(id); });"
+
+# submitCandidates(selector): the form (by selector, else the first form; null when there is
+# none) and every control that can submit it, in the order they are tried: button[type=submit],
+# input[type=submit], then untyped buttons (submit by default). Shared with backends that click in-page.
+SUBMIT_CANDIDATES_JS = """
+function submitCandidates(selector) {
+    var form = (selector && document.querySelector(selector)) || document.querySelector('form');
+    if (!form) { return null; }
+    var candidates = [];
+    ["button[type='submit']", "input[type='submit']", "button:not([type])"].forEach(function (s) {
+        Array.prototype.push.apply(candidates, form.querySelectorAll(s));
+    });
+    return candidates;
+}
+"""
+
+SUBMIT_CANDIDATES_SCRIPT = SUBMIT_CANDIDATES_JS + "return submitCandidates(arguments[0]);"
+
+# Click failures after which the next submit candidate is tried
+CLICK_ERRORS = (StaleElementReferenceException, ElementNotInteractableException, ElementClickInterceptedException)
+
+
+def _css_string(value: Any) -> str:
+    return json.dumps(str(value))  # A double-quoted CSS string; JSON escaping covers quotes and backslashes
+
+
+# Per-session WebElement handles, keyed by field id. Discovery fills it (handles come back with
+# the field metadata, or in one resolve call), so fills skip find_element. Radios resolve within
+# their group (name) from the discovered options instead of a document-wide XPath on the value.
+# Fields are discovery payload items (dicts). A stale handle is resolved again once, transparently.
+# Counts hits and misses per form, and exceptions: the ones it recovers from here, plus whatever
+# callers report through note_exception.
+class ElementCache:
+    def __init__(self, driver):
+        self.driver = driver
+        self._handles: Dict[str, Any] = {}
+        self._radios: Dict[tuple, str] = {}  # (group name, value) -> radio id
+        self.counters = Counter(hits=0, misses=0, stale_recoveries=0)
+        self.exceptions = Counter()
+
+    # Discovered fields, with their handles (by field id) when discovery returned them
+    def remember(self, fields: Iterable[dict], handles: Optional[Dict[str, Any]] = None):
+        for field in fields:
+            if field["type"] == "radio" and field.get("name") and field.get("options"):
+                self._radios[(field["name"], field["options"][0])] = field["id"]
+            if handles and handles.get(field["id"]) is not None:
+                self._handles[field["id"]] = handles[field["id"]]
+
+    # Resolve every field without a handle in one script call
+    def prime(self, fields: Iterable[dict]):
+        fields = list(fields)
+        self.remember(fields)
+        missing = [field["id"] for field in fields if field["id"] not in self._handles]
+        if not missing:
+            return
+        try:
+            handles = self.driver.execute_script(RESOLVE_SCRIPT, missing)
+        except Exception as e:
+            self.note_exception(e)
+            logger.warning("Resolving element handles failed", extra={"error": str(e)})
+            return
+        for field_id, handle in zip(missing, handles or []):
+            if handle is not None:
+                self._handles[field_id] = handle
+
+    def forget(self, field_id: str):
+        self._handles.pop(field_id, None)
+
+    def clear(self):
+        self._handles.clear()
+        self._radios.clear()
+
+    def element(self, field_id: str):
+        handle = self._handles.get(field_id)
+        if handle is not None:
+            self.counters["hits"] += 1
+            return handle
+        self.counters["misses"] += 1
+        handle = self.driver.find_element(By.ID, field_id)
+        self._handles[field_id] = handle
+        return handle
+
+    # The radio of group `name` carrying `value`
+    def radio(self, name: Optional[str], value: str):
+        radio_id = self._radios.get((name, value))
+        if radio_id is not None:
+            return self.element(radio_id)
+        self.counters["misses"] += 1
+        selector = f"input[type='radio'][value={_css_string(value)}]"
+        if name:
+            selector += f"[name={_css_string(name)}]"
+        return self.driver.find_element(By.CSS_SELECTOR, selector)
+
+    # Run action on the control's element; a stale handle is dropped and resolved once more
+    # before the action is retried
+    def act(self, field_id: str, action: Callable[[Any], Any]):
+        return self._retry_stale(lambda: action(self.element(field_id)), [field_id])
+
+    def act_radio(self, name: Optional[str], value: str, action: Callable[[Any], Any]):
+        return self._retry_stale(lambda: action(self.radio(name, value)), [self._radios.get((name, value), "")])
+
+    def _retry_stale(self, attempt: Callable[[], Any], field_ids):
+        try:
+            return attempt()
+        except StaleElementReferenceException as e:
+            self.note_exception(e)
+            self.counters["stale_recoveries"] += 1
+            for field_id in field_ids:
+                self.forget(field_id)
+            return attempt()
+
+    # Every submit candidate comes back from one script call; they are clicked in order until one
+    # takes the click. before_click runs ahead of each click (e.g. arming the submit waiter).
+    def click_submit(self, form_selector: Optional[str] = None, before_click: Optional[Callable[[], None]] = None):
+        candidates = self.driver.execute_script(SUBMIT_CANDIDATES_SCRIPT, form_selector)
+        if candidates is None:
+            raise NoSuchElementException(f"No form found (selector: {form_selector or 'form'})")
+        if not candidates:
+            raise NoSuchElementException("No submit control in the form")
+        error = None
+        for candidate in candidates:
+            if before_click is not None:
+                before_click()
+            try:
+                candidate.click()
+                return candidate
+            except CLICK_ERRORS as e:
+                self.note_exception(e)
+                error = e
+                logger.debug("Submit candidate not clickable, trying the next", extra={"error": str(e)})
+        raise error
+
+    def note_exception(self, error: Exception):
+        self.exceptions[type(error).__name__] += 1
+
+    def stats(self) -> dict:
+        return {"handles": len(self._handles), **self.counters, "exceptions": dict(self.exceptions)}
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Plausible values by field type and by well-known label words
+TYPE_VALUES = {
+    "email": "jane.doe@example.com",
+    "password": "S3cure!Passw0rd",
+    "number": "42",
+    "range": "50",
+    "tel": "555-123-4567",
+    "url": "https://example.com",
+    "date": "2024-05-17",
+    "time": "09:30",
+    "datetime-local": "2024-05-17T09:30",
+    "month": "2024-05",
+    "week": "2024-W20",
+    "color": "#3366cc",
+    "checkbox": "true",
+    "textarea": "Looking forward to hearing from you.",
+    "search": "form automation",
+}
+LABEL_VALUES = {
+    "first name": "Jane",
+    "last name": "Doe",
+    "name": "Jane Doe",
+    "country": "United States",
+    "city": "Springfield",
+    "company": "Example Corp",
+}
+
+
+# Offline stand-in for ChatOpenAI that answers both the per-field and the batch prompts
+class FakeFormLLM(BaseChatModel):
+    seed: int = 0
+    omit_rate: float = 0.0  # Fraction of batch entries left out of each reply, to exercise retries
+    latency: float = 0.0  # Seconds added to every call
+    error_rate: float = 0.0  # Fraction of calls that raise, to exercise timeouts/retries/the breaker
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-form-llm"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._start_call()
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._start_call()
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+    def _start_call(self):
+        self.calls += 1
+        if self.error_rate and random.Random(self.seed * 100003 + self.calls).random() < self.error_rate:
+            raise RuntimeError("Injected LLM failure")
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = messages[-1].content
+        batch = re.search(r"```json\s*(\[.*?\])\s*```", prompt, re.DOTALL)
+        if batch:
+            content = json.dumps(self._batch_reply(json.loads(batch.group(1))))
+        else:
+            content = self._single_reply(prompt)
+        # Rough token counts (about four characters per token) so usage metrics have something to show
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _batch_reply(self, fields: List[dict]) -> dict:
+        rng = random.Random(self.seed + self.calls)
+        return {
+            field["id"]: self.value_for(field.get("label", ""), field.get("type", "text"), field.get("options"))
+            for field in fields
+            if rng.random() >= self.omit_rate
+        }
+
+    def _single_reply(self, prompt: str) -> str:
+        def line(name):
+            match = re.search(rf"{name}:\s*(.*)", prompt)
+            return match.group(1).strip() if match else ""
+
+        options = line("Options")
+        try:
+            options = json.loads(options.replace("'", '"')) if options.startswith("[") else None
+        except ValueError:
+            options = None
+        value = self.value_for(line("Label"), line("Type") or "text", options)
+        return ", ".join(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def value_for(label: str, field_type: str, options: Optional[List[str]] = None):
+        choices = [option for option in options or [] if option and not option.lower().startswith("select")]
+        if field_type == "multiselect" and choices:
+            return choices[:2]
+        if choices:
+            return choices[0]
+        if field_type in TYPE_VALUES:
+            return TYPE_VALUES[field_type]
+        normalized = label.lower().strip(" :*")
+        for key, value in LABEL_VALUES.items():
+            if key in normalized:
+                return value
+        return f"Sample {label.strip(' :*') or 'value'}"
@@ -1,30 +1,58 @@
+import asyncio
+import json
+import logging
 import os
-import random
-import string
 import time
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Union
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field as PydanticField
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from fastapi import FastAPI, HTTPException
+from browser_profile import create_driver
+from chromedriver import check_chromedriver
+from driver_backend import DriverBackend, as_backend
+from dom_fill import bulk_fill
+from waits import FormWaiter
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from browser_pool import POOL_MODE, PoolExhaustedError, create_browser_pool
+from form_executor import QueueFullError
+from worker_supervisor import WorkerSupervisor, create_form_executor, pool_stats_source
+from jobs import create_jobs_router
+from form_stream import create_stream_router, field_event, phase_listener
+from result_store import ResultStore, create_results_router
+from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
+from fake_llm import FakeFormLLM
+from value_cache import ValueCache, field_signature
+from value_generator import VALUE_SEED, ValueGenerator
+from schema_cache import SchemaCache, form_fingerprint
+from session_snapshot import SessionSnapshotStore, open_form
+from llm_pipeline import AsyncFieldInterpreter, field_prompt_inputs, pipeline_stats
+from observability import FormTimings, configure_logging, record_llm_call, register_cache_gauge, register_runtime_gauges, registry
 
 # Load environment variables
 load_dotenv()
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Define the Field model
 class Field(BaseModel):
     id: str
     label: str
     type: str
+    name: Optional[str] = None
+    tag: Optional[str] = None
     options: Optional[List[str]] = None
+    required: bool = False
+    pattern: Optional[str] = None
+    min: Optional[str] = None
+    max: Optional[str] = None
+    maxlength: Optional[int] = None
+    visible: bool = True
     filled: bool = False
-    value: Optional[str] = None
+    # Checkboxes take booleans and multiselects lists of options
+    value: Optional[Union[str, bool, List[str]]] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -37,103 +65,271 @@ class FormState(BaseModel):
     initial_fields_fetched: bool = False
     submission_attempted: bool = False
 
+# Options accepted per form (query parameters on /process-form, per-URL options on /jobs)
+class FormOptions(BaseModel):
+    fill_mode: Literal["per_field", "bulk"] = "per_field"
+    interpret_mode: Literal["per_field", "batch", "async"] = "per_field"
+    include_timings: bool = False
+    # Reuse a stored browser session (cookies, web storage) for the URL's origin, capturing one if none
+    session_snapshot: bool = False
+    # CSS selectors clicked in order after loading (consent, login or multi-step buttons)
+    warmup: List[str] = PydanticField(default_factory=list)
+
+# Per-form result: the final FormState plus how submission went
+class FormResult(BaseModel):
+    url: str
+    status: str = "success"
+    state: FormState
+    # False when clicking submit or waiting for its outcome failed
+    submitted: bool = False
+    submit_outcome: Optional[str] = None
+    llm_calls: int = 0
+    schema_cache_hit: bool = False
+    wait_timings: Dict[str, float] = PydanticField(default_factory=dict)
+    # Per-phase and per-field durations, when requested
+    timings: Optional[Dict[str, Any]] = None
+    # Whether a session snapshot was restored or captured, and the bootstrap time saved
+    session_snapshot: Optional[Dict[str, Any]] = None
+    # Driver round trips, plus element cache counters (hits, misses) and exceptions, for the form
+    driver_stats: Dict[str, Any] = PydanticField(default_factory=dict)
+
+# Prompt for interpreting a single field
+FIELD_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a web form filling expert. Generate appropriate values based on the context."),
+    ("human", """Generate a valid value for this form field:
+    Label: {label}
+    Type: {field_type}
+    Options: {options}
+    
+    Rules:
+    1. Use realistic values
+    2. Match format requirements
+    3. No placeholder text
+    4. Respond ONLY with the value""")
+])
+
+# Batch interpretation configuration
+BATCH_MAX_ATTEMPTS = int(os.getenv("LLM_BATCH_MAX_ATTEMPTS", "3"))
+
+BATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a web form filling expert. Generate appropriate values based on the context."),
+    ("human", """Generate valid values for all of these form fields:
+    ```json
+    {fields}
+    ```
+    
+    Rules:
+    1. Use realistic values that are consistent across fields
+    2. Match format requirements
+    3. No placeholder text
+    4. For fields with options, use one of the options exactly (a list of options for multiselect)
+    5. Respond ONLY with a JSON object mapping each field id to its value""")
+])
+
+# LLM-generated values shared by every agent in the process (and across workers via VALUE_CACHE_PATH)
+value_cache = ValueCache()
+
+# Discovered fields and value plans by form fingerprint, so known layouts skip discovery and the LLM
+schema_cache = SchemaCache(table="ai_form_schemas")
+
+# Browser sessions by origin, for forms run with session_snapshot
+session_snapshots = SessionSnapshotStore()
+
+# Chat model used by AIFormAgent; FORM_AGENT_LLM=fake swaps in the offline fake
+def create_llm():
+    if os.getenv("FORM_AGENT_LLM") == "fake":
+        return FakeFormLLM()
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        api_key="API_KEY",
+        temperature=0.3
+    )
+
 # Base FormAgent class
 class FormAgent:
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        driver=None,
+        snapshots: Optional[SessionSnapshotStore] = None,
+        warmup: Sequence[str] = (),
+    ):
         self.url = url
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-        self.driver.get(url)
-        time.sleep(2)
-        print(f"Successfully loaded URL: {url}")
+        # A pooled WebDriver session or CDP page; pooled ones belong to the pool, so only
+        # browsers we started ourselves are quit
+        self.owns_driver = driver is None
+        self.backend: DriverBackend = as_backend(driver if driver is not None else create_driver(), self.owns_driver)
+        # Set when the driver is one tab of a shared browser; the backend refuses commands outside that tab
+        self.window_handle = getattr(self.backend, "window_handle", None)
+        # Wait for the page and its form to be ready instead of sleeping a fixed time
+        self.waiter = FormWaiter(self.backend)
+        self.session_snapshot = None
+        with self.waiter.watching_fields():
+            if snapshots is not None or warmup:
+                # Warm-up steps, or a stored session for the origin that skips them
+                self.session_snapshot = open_form(self.backend, self.waiter, url, snapshots, warmup)
+            else:
+                self.backend.navigate(url)
+                self.waiter.page_ready()
+        # Count the commands this form issues from here on
+        self.backend.reset_stats()
+        logger.info("Loaded form page", extra={"url": url, "backend": self.backend.name})
 
-    def get_label_text(self, element):
-        try:
-            label = self.driver.find_element(By.XPATH, f"//label[@for='{element.get_attribute('id')}']")
-            return label.text.strip() or element.get_attribute("name") or "Unknown"
-        except:
-            return element.get_attribute("name") or "Unknown"
+    def driver_stats(self) -> dict:
+        return self.backend.stats()
 
     def close(self):
-        self.driver.quit()
-        print("Browser closed successfully")
+        self.backend.close()
+        if self.owns_driver:
+            logger.info("Browser closed")
 
 # AI-powered FormAgent
 class AIFormAgent(FormAgent):
-    def __init__(self, url: str):
-        super().__init__(url)
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key="API_KEY",
-            temperature=0.3
-        )
+    def __init__(
+        self,
+        url: str,
+        driver=None,
+        llm=None,
+        cache: Optional[ValueCache] = None,
+        snapshots: Optional[SessionSnapshotStore] = None,
+        warmup: Sequence[str] = (),
+    ):
+        super().__init__(url, driver=driver, snapshots=snapshots, warmup=warmup)
+        self.llm = llm if llm is not None else create_llm()
+        self.value_cache = cache if cache is not None else value_cache
+        self.llm_calls = 0
+        self.fallback_ids = set()  # Fields given rule-based values; kept out of cached value plans
+        self.cached_ids = set()  # Fields whose value came from the value cache or a cached value plan
+        self.value_generator = ValueGenerator(VALUE_SEED)
     
-    def get_select_options(self, element) -> List[str]:
-        if element.tag_name.lower() == "select":
-            return [option.text for option in Select(element).options]
-        return []
-
     def interpret_field(self, field: Field) -> str:
+        # Values for a known (label, type, options) signature come from the cache
+        signature = field_signature(field.label, field.type, field.options)
+        cached = self.value_cache.get(signature)
+        if cached is not None:
+            self.cached_ids.add(field.id)
+            return cached
+        started = time.perf_counter()
         try:
-            prompt_template = ChatPromptTemplate.from_messages([
-                ("system", "You are a web form filling expert. Generate appropriate values based on the context."),
-                ("human", """Generate a valid value for this form field:
-                Label: {label}
-                Type: {field_type}
-                Options: {options}
-                
-                Rules:
-                1. Use realistic values
-                2. Match format requirements
-                3. No placeholder text
-                4. Respond ONLY with the value""")
-            ])
+            self.llm_calls += 1
+            chain = FIELD_PROMPT | self.llm
+            response = chain.invoke(field_prompt_inputs(field))
+            record_llm_call("per_field", "ok", time.perf_counter() - started, response)
             
-            chain = prompt_template | self.llm
-            response = chain.invoke({
-                "label": field.label,
-                "field_type": field.type,
-                "options": field.options if field.options else "None"
-            })
-            
-            return response.content.strip()
+            value = response.content.strip()
+            self.value_cache.set(signature, value)
+            return value
         except Exception as e:
-            print(f"LLM Error: {e}")
+            record_llm_call("per_field", "error", time.perf_counter() - started)
+            logger.warning("LLM request failed, using fallback value", extra={"field": field.id, "error": str(e)})
             return self.fallback_value_generator(field)
 
-    def fallback_value_generator(self, field: Field) -> str:
-        # Rule-based fallback
-        generators = {
-            "text": lambda: f"Test {random.randint(100,999)}",
-            "email": lambda: f"user{random.randint(100,999)}@example.com",
-            "password": lambda: ''.join(random.choices(string.ascii_letters + string.digits + '!@#$%', k=12)),
-            "number": lambda: str(random.randint(1, 1000)),
-            "tel": lambda: f"{random.randint(100,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}",
-            "select": lambda: random.choice(field.options) if field.options else "Option 1"
-        }
-        return generators.get(field.type, lambda: "Test Value")()
+    # Interpret every field with one structured request; only missing/invalid entries are retried
+    def interpret_fields(self, fields: List[Field]) -> Dict[str, Any]:
+        values = {}
+        signatures = {f.id: field_signature(f.label, f.type, f.options) for f in fields}
+        for field in fields:
+            cached = self.value_cache.get(signatures[field.id])
+            if cached is not None:
+                values[field.id] = cached
+                self.cached_ids.add(field.id)
+        pending = [f for f in fields if f.id not in values]
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            if not pending:
+                break
+            started = time.perf_counter()
+            message = None
+            try:
+                self.llm_calls += 1
+                message = (BATCH_PROMPT | self.llm.bind(response_format={"type": "json_object"})).invoke({
+                    "fields": json.dumps([
+                        {"id": f.id, "label": f.label, "type": f.type, "options": f.options} for f in pending
+                    ], indent=2)
+                })
+                reply = JsonOutputParser().invoke(message)
+                if not isinstance(reply, dict):
+                    raise ValueError(f"Expected a JSON object, got {type(reply).__name__}")
+                record_llm_call("batch", "ok", time.perf_counter() - started, message)
+            except Exception as e:
+                record_llm_call("batch", "error" if message is None else "invalid", time.perf_counter() - started, message)
+                logger.warning("Batch LLM request failed", extra={"attempt": attempt + 1, "error": str(e)})
+                reply = {}
+
+            for field in pending:
+                value = validate_field_value(field, reply.get(field.id))
+                if value is not None:
+                    values[field.id] = value
+                    self.value_cache.set(signatures[field.id], value)
+            pending = [f for f in pending if f.id not in values]
+            if pending:
+                logger.warning("Batch reply missing or invalid", extra={"fields": [f.id for f in pending]})
+
+        for field in pending:
+            values[field.id] = self.fallback_value_generator(field)
+        return values
+
+    # Interpret every field concurrently with rate limiting, timeouts, retries and the circuit breaker
+    async def ainterpret_fields(self, fields: List[Field]) -> Dict[str, Any]:
+        interpreter = AsyncFieldInterpreter(
+            self.llm,
+            FIELD_PROMPT,
+            fallback=self.fallback_value_generator,
+            validate=validate_field_value,
+            cache=self.value_cache
+        )
+        values = await interpreter.interpret_all(fields)
+        self.llm_calls += interpreter.counters["calls"]
+        self.cached_ids.update(interpreter.cache_hit_ids)
+        logger.debug("Async interpretation finished", extra=interpreter.counters)
+        return values
+
+    def fallback_value_generator(self, field: Field) -> Any:
+        # Rule-based fallback from the shared generator; checkboxes take "true"/"false" like LLM values
+        self.fallback_ids.add(field.id)
+        value = self.value_generator.value_for(field)
+        return str(value).lower() if isinstance(value, bool) else value
+
+    # Where a field's value came from: "rule" (fallback generator), "cache" or "llm"
+    def value_source(self, field_id: str) -> str:
+        if field_id in self.fallback_ids:
+            return "rule"
+        return "cache" if field_id in self.cached_ids else "llm"
+
+# Check one batch-reply entry against the field; returns the normalised value or None if invalid
+def validate_field_value(field: Field, value: Any) -> Any:
+    if value is None or isinstance(value, dict):
+        return None
+    if isinstance(value, bool):
+        value = str(value).lower()
+    options = [o for o in field.options or [] if o]
+    if field.type == "multiselect":
+        chosen = value if isinstance(value, list) else [v.strip() for v in str(value).split(",")]
+        matched = [o for v in chosen for o in options if o.lower() == str(v).strip().lower()]
+        return matched if matched and len(matched) == len(chosen) else None
+    if isinstance(value, list):
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if field.type == "select" and options:
+        return next((o for o in options if o.lower() == value.lower()), None)
+    if field.type == "checkbox":
+        return value.lower() if value.lower() in ("true", "false") else None
+    if field.type in ("number", "range"):
+        try:
+            float(value)
+        except ValueError:
+            return None
+    if field.type == "email" and "@" not in value:
+        return None
+    return value
 
 # Updated form processing functions
 def get_form_fields(state: FormState, agent: AIFormAgent) -> FormState:
     try:
-        form = agent.driver.find_element(By.XPATH, "//form")
-        elements = form.find_elements(By.XPATH, ".//input | .//select | .//textarea")
-        
-        updated_fields = []
-        for element in elements:
-            field_id = element.get_attribute("id")
-            if not field_id:
-                continue
-                
-            field_type = element.get_attribute("type") or element.tag_name.lower()
-            label = agent.get_label_text(element)
-            options = agent.get_select_options(element)
-            
-            updated_fields.append(Field(
-                id=field_id,
-                label=label,
-                type=field_type,
-                options=options
-            ))
+        # One script call returns ids, labels, types and select options for the whole form (with Selenium, the element handles too)
+        payload = agent.backend.discover_fields()
+        updated_fields = [Field(**item) for item in payload]
         
         return FormState(
             url=state.url,
@@ -141,61 +337,323 @@ def get_form_fields(state: FormState, agent: AIFormAgent) -> FormState:
             initial_fields_fetched=True
         )
     except Exception as e:
-        print(f"Field detection error: {e}")
+        logger.error("Field discovery failed", extra={"error": str(e)})
         return state
 
+# Options chosen for a multiselect: a list, or a comma-joined string (per-field LLM replies and
+# their cached copies). Parts are matched to the option texts ignoring case, and consecutive
+# parts are joined back together for options whose own text contains commas.
+def multiselect_values(field: Field) -> List[str]:
+    parts = field.value if isinstance(field.value, list) else str(field.value or "").split(",")
+    options = {o.strip().lower(): o for o in field.options or [] if o}
+    chosen, unmatched, pending = [], [], []
+    for part in (str(p).strip() for p in parts):
+        if not part:
+            continue
+        pending.append(part)
+        joined = ", ".join(pending).lower()
+        if joined in options:
+            chosen.append(options[joined])
+        elif part.lower() in options:
+            unmatched.extend(pending[:-1])
+            chosen.append(options[part.lower()])
+        else:
+            continue
+        pending = []
+    return chosen + unmatched + pending  # Unmatched parts fail in select_options rather than being dropped
+
+# Set one control through the backend (for radios, the group's radio with the chosen value)
+def set_control(field: Field, backend: DriverBackend):
+    # Special handling for different field types
+    if field.type == "select":
+        backend.select_options(field.id, [field.value])
+    elif field.type == "multiselect":
+        backend.select_options(field.id, multiselect_values(field))
+    elif field.type == "checkbox":
+        backend.set_checked(field.id, str(field.value).lower() == "true")
+    elif field.type == "radio":
+        backend.choose_radio(field.name, str(field.value))
+    else:
+        backend.type_text(field.id, str(field.value))
+
+# With Selenium, cached handles, a stale one resolved again once
 def fill_field(field: Field, agent: AIFormAgent) -> Field:
     try:
-        element = agent.driver.find_element(By.ID, field.id)
-        field.value = agent.interpret_field(field)
-        
-        # Special handling for different field types
-        if field.type == "select":
-            Select(element).select_by_visible_text(field.value)
-        elif field.type == "checkbox":
-            if element.is_selected() != (field.value.lower() == "true"):
-                element.click()
-        elif field.type == "radio":
-            agent.driver.find_element(By.XPATH, 
-                f"//input[@type='radio' and @value='{field.value}']").click()
-        else:
-            element.clear()
-            element.send_keys(field.value)
-            
+        agent.backend.ensure_element(field.id)  # A missing control fails before any LLM call
+        if field.value is None:
+            field.value = agent.interpret_field(field)
+        set_control(field, agent.backend)
         field.filled = True
-        print(f"AI-filled {field.label} with {field.value}")
+        logger.debug("Filled field", extra={"field": field.id, "value": field.value})
         return field
     except Exception as e:
-        print(f"Filling error: {e}")
+        agent.backend.note_exception(e)
+        logger.warning("Filling field failed", extra={"field": field.id, "error": str(e)})
         return field
 
+# Fill all interpreted fields in one scripted operation, falling back to fill_field where needed
+def fill_fields_bulk(fields: List[Field], agent: AIFormAgent) -> List[Field]:
+    for field in fields:
+        if field.value is None:
+            field.value = agent.interpret_field(field)
+    try:
+        fallback_ids = set(bulk_fill(agent.backend, fields))
+    except Exception as e:
+        logger.warning("Bulk fill failed, filling field by field", extra={"error": str(e)})
+        fallback_ids = {field.id for field in fields}
+
+    for field in fields:
+        if field.id in fallback_ids:
+            fill_field(field, agent)
+        else:
+            field.filled = True
+    logger.debug("Bulk-filled fields", extra={"filled": len(fields) - len(fallback_ids), "fallback": len(fallback_ids)})
+    return fields
+
+# Function to submit the form; the form and its submit controls come from one script call
+def submit_form(agent: AIFormAgent) -> bool:
+    try:
+        agent.backend.click_submit(before_click=agent.waiter.arm_submit)
+        outcome = agent.waiter.submit_outcome()
+        logger.info("Form submitted", extra={"outcome": outcome})
+        return True
+    except Exception as e:
+        agent.backend.note_exception(e)
+        logger.error("Form submission failed", extra={"error": str(e)})
+        return False
+
+# Process one form on a pooled browser (blocking; runs on a form worker thread)
+def fill_form(
+    url: str,
+    fill_mode: str = "per_field",
+    interpret_mode: str = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: Sequence[str] = (),
+    on_event: Optional[Callable[[dict], None]] = None,
+) -> FormResult:
+    timings = FormTimings(on_phase=phase_listener(on_event))
+    waiting = time.perf_counter()
+    try:
+        with browser_pool.session() as driver:
+            timings.record("browser", time.perf_counter() - waiting)
+            with timings.span("navigation"):
+                agent = AIFormAgent(
+                    url, driver=driver, snapshots=session_snapshots if session_snapshot else None, warmup=warmup
+                )
+            try:
+                state = FormState(url=url)
+            
+                # A known layout (one fingerprint script call) skips discovery and reuses its value plan
+                with timings.span("discovery"):
+                    fingerprint = None
+                    try:
+                        fingerprint = form_fingerprint(agent.backend)
+                    except Exception as e:
+                        logger.warning("Fingerprint failed", extra={"error": str(e)})
+                    cached = schema_cache.get_schema(fingerprint) if fingerprint else None
+                    if cached is not None:
+                        state = FormState(url=url, fields=[Field(**item) for item in cached["fields"]], initial_fields_fetched=True)
+                        values = dict(cached["values"])
+                        agent.cached_ids.update(values)
+                        agent.backend.prime_fields(cached["fields"])
+                    else:
+                        state = get_form_fields(state, agent)
+                        values = {}
+            
+                # Get and fill fields (per_field interpretation happens inside the fill phase)
+                with timings.span("interpretation"):
+                    pending = [field for field in state.fields if field.id not in values]
+                    if interpret_mode == "batch":
+                        values.update(agent.interpret_fields(pending))
+                    elif interpret_mode == "async":
+                        values.update(asyncio.run(agent.ainterpret_fields(pending)))
+                    for field in state.fields:
+                        if field.id in values:
+                            field.value = values[field.id]
+                with timings.span("fill"):
+                    if fill_mode == "bulk":
+                        fill_fields_bulk(state.fields, agent)
+                        if on_event is not None:
+                            for field in state.fields:
+                                on_event(field_event(field))
+                    else:
+                        for field in state.fields:
+                            with timings.field(field.id, field.type):
+                                field = fill_field(field, agent)
+                            if on_event is not None:
+                                on_event(field_event(field, timings.fields.get(field.id)))
+            
+                # Submit form; the form and its submit controls come from one script call
+                with timings.span("submit"):
+                    submitted = submit_form(agent)
+                state.submission_attempted = True
+            
+                if fingerprint:
+                    plan = {f.id: f.value for f in state.fields if f.value is not None and f.id not in agent.fallback_ids}
+                    if cached is None or plan != cached["values"]:
+                        schema_cache.set_schema(fingerprint, [f.dict(exclude={"value", "filled"}) for f in state.fields], plan)
+
+            finally:
+                agent.close()
+    except Exception:
+        timings.finish("error", 0)
+        raise
+    timings.finish("success", sum(f.filled for f in state.fields))
+    sources = {f.id: agent.value_source(f.id) for f in state.fields}
+    result_store.record_form(url, fingerprint, state.fields, timings.fields, sources)
+    return FormResult(
+        url=url,
+        state=state,
+        submitted=submitted,
+        submit_outcome=agent.waiter.submit_result,
+        llm_calls=agent.llm_calls,
+        schema_cache_hit=cached is not None,
+        wait_timings=agent.waiter.timings,
+        timings=timings.as_dict() if include_timings else None,
+        session_snapshot=agent.session_snapshot,
+        driver_stats=agent.driver_stats()
+    )
+
+# /process-form response for one form
+def run_form_job(
+    url: str,
+    fill_mode: str = "per_field",
+    interpret_mode: str = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: Sequence[str] = (),
+) -> dict:
+    result = fill_form(
+        url,
+        fill_mode=fill_mode,
+        interpret_mode=interpret_mode,
+        include_timings=include_timings,
+        session_snapshot=session_snapshot,
+        warmup=warmup,
+    )
+    response = {
+        "status": result.status,
+        "submitted": result.submitted,
+        "submit_outcome": result.submit_outcome,
+        "llm_calls": result.llm_calls,
+        "schema_cache_hit": result.schema_cache_hit,
+        "filled_fields": [{"label": f.label, "value": f.value} for f in result.state.fields],
+        "wait_timings": result.wait_timings
+    }
+    if result.timings is not None:
+        response["timings"] = result.timings
+    if result.session_snapshot is not None:
+        response["session_snapshot"] = result.session_snapshot
+    response["driver_stats"] = result.driver_stats
+    return response
+
 # FastAPI setup
 app = FastAPI()
 
+# Pre-started headless browsers shared by all requests (tabs of shared browsers with BROWSER_POOL_MODE=tabs,
+# pages of browsers driven over DevTools with BROWSER_POOL_MODE=cdp)
+browser_pool = create_browser_pool()
+
+# Field-fill history (append-only SQLite, written by a background thread) for /results/stats
+result_store = ResultStore()
+
+# Worker threads that run form jobs off the event loop (worker processes with FORM_WORKER_PROCESSES)
+form_executor = create_form_executor(__name__)
+
+# What /pool/stats and the pool gauges report: the worker processes' pools when they own the browsers
+pool_view = pool_stats_source(form_executor, browser_pool)
+
+register_runtime_gauges(pool_view, form_executor)
+register_cache_gauge("value_cache", value_cache)
+register_cache_gauge("schema_cache", schema_cache)
+register_cache_gauge("session_snapshots", session_snapshots)
+
+@app.on_event("startup")
+def start_browser_pool():
+    # Fail fast when chromedriver is missing; workers inherit the resolved path. CDP pages don't use it.
+    if POOL_MODE != "cdp":
+        check_chromedriver()
+    if isinstance(form_executor, WorkerSupervisor):
+        # Worker processes own the browsers
+        form_executor.start()
+    else:
+        browser_pool.start()
+
+@app.on_event("shutdown")
+def close_browser_pool():
+    form_executor.shutdown()
+    browser_pool.close()
+    result_store.close()
+
 @app.post("/process-form")
-async def process_form(url: str):
+async def process_form(
+    url: str,
+    fill_mode: Literal["per_field", "bulk"] = "per_field",
+    interpret_mode: Literal["per_field", "batch", "async"] = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: List[str] = Query(default=[])
+):
     try:
-        agent = AIFormAgent(url)
-        state = FormState(url=url)
-        
-        # Get and fill fields
-        state = get_form_fields(state, agent)
-        for field in state.fields:
-            field = fill_field(field, agent)
-        
-        # Submit form
-        submit_button = agent.driver.find_element(By.XPATH, "//form//button[@type='submit']")
-        submit_button.click()
-        time.sleep(2)
-        
-        agent.close()
-        return {
-            "status": "success",
-            "filled_fields": [{"label": f.label, "value": f.value} for f in state.fields]
-        }
+        return await form_executor.run(
+            run_form_job,
+            url,
+            fill_mode=fill_mode,
+            interpret_mode=interpret_mode,
+            include_timings=include_timings,
+            session_snapshot=session_snapshot,
+            warmup=warmup,
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PoolExhaustedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/pool/stats")
+async def pool_stats():
+    return pool_view.stats()
+
+@app.get("/executor/stats")
+async def executor_stats():
+    return form_executor.stats()
+
+# Prometheus metrics: phase/field and LLM latency histograms, token and form counters, pool, executor and cache gauges
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Batch jobs: submit many URLs, stream results as they finish
+app.include_router(create_jobs_router(fill_form, FormOptions, form_executor))
+
+# One form with per-phase and per-field progress events (SSE/NDJSON or WebSocket)
+app.include_router(create_stream_router(fill_form, FormOptions, form_executor))
+
+# Aggregates over the stored field-fill history
+app.include_router(create_results_router(result_store))
+
+# Value cache size and hit/miss counters
+@app.get("/cache/stats")
+async def cache_stats():
+    return value_cache.stats()
+
+# Form schema cache size and hit/miss counters
+@app.get("/schema-cache/stats")
+async def schema_cache_stats():
+    return schema_cache.stats()
+
+# Session snapshot store size and hit/miss counters
+@app.get("/session-snapshots/stats")
+async def session_snapshot_stats():
+    return session_snapshots.stats()
+
+# Shared LLM rate limiter and circuit breaker state
+@app.get("/llm/stats")
+async def llm_stats():
+    return pipeline_stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,22 +1,45 @@
-import random
-import string
+import logging
 import time
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Union
 from pydantic import BaseModel, Field as PydanticField
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from fastapi import FastAPI, HTTPException
+from browser_profile import create_driver
+from chromedriver import check_chromedriver
+from driver_backend import DriverBackend, as_backend
+from schema_cache import SchemaCache, form_fingerprint
+from session_snapshot import SessionSnapshotStore, open_form
+from dom_fill import bulk_fill
+from value_generator import VALUE_SEED, generate_values
+from waits import FormWaiter
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from browser_pool import POOL_MODE, PoolExhaustedError, create_browser_pool
+from form_executor import QueueFullError
+from worker_supervisor import WorkerSupervisor, create_form_executor, pool_stats_source
+from jobs import create_jobs_router
+from form_stream import create_stream_router, field_event, phase_listener
+from result_store import ResultStore, create_results_router
+from observability import FormTimings, configure_logging, register_cache_gauge, register_runtime_gauges, registry
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Define the Field model
 class Field(BaseModel):
     id: str
     label: str
     type: str
+    name: Optional[str] = None
+    tag: Optional[str] = None
+    options: Optional[List[str]] = None
+    required: bool = False
+    pattern: Optional[str] = None
+    min: Optional[str] = None
+    max: Optional[str] = None
+    maxlength: Optional[int] = None
+    visible: bool = True
     filled: bool = False
-    value: Optional[str] = None
+    # Checkboxes take booleans and multiselects lists of options
+    value: Optional[Union[str, bool, List[str]]] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -29,50 +52,79 @@ class FormState(BaseModel):
     initial_fields_fetched: bool = False
     submission_attempted: bool = False
 
+# Options accepted per form (query parameters on /process-form, per-URL options on /jobs)
+class FormOptions(BaseModel):
+    fill_mode: Literal["per_field", "bulk"] = "per_field"
+    include_timings: bool = False
+    # Reuse a stored browser session (cookies, web storage) for the URL's origin, capturing one if none
+    session_snapshot: bool = False
+    # CSS selectors clicked in order after loading (consent, login or multi-step buttons)
+    warmup: List[str] = PydanticField(default_factory=list)
+
+# Per-form result: the final FormState plus how submission went
+class FormResult(BaseModel):
+    url: str
+    status: str = "success"
+    state: FormState
+    submission_success: bool = False
+    submit_outcome: Optional[str] = None
+    schema_cache_hit: bool = False
+    wait_timings: Dict[str, float] = PydanticField(default_factory=dict)
+    # Per-phase and per-field durations, when requested
+    timings: Optional[Dict[str, Any]] = None
+    # Whether a session snapshot was restored or captured, and the bootstrap time saved
+    session_snapshot: Optional[Dict[str, Any]] = None
+    # Driver round trips, plus element cache counters (hits, misses) and exceptions, for the form
+    driver_stats: Dict[str, Any] = PydanticField(default_factory=dict)
+
 # FormAgent class to interact with the form
 class FormAgent:
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        driver=None,
+        snapshots: Optional[SessionSnapshotStore] = None,
+        warmup: Sequence[str] = (),
+    ):
         self.url = url
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-        self.driver.get(url)
-        time.sleep(2)
-        print(f"Successfully loaded URL: {url}")
-
-    def get_label_text(self, element):
-        try:
-            label = self.driver.find_element(By.XPATH, f"//label[@for='{element.get_attribute('id')}']")
-            return label.text.strip() or element.get_attribute("name") or "Unknown"
-        except:
-            return element.get_attribute("name") or "Unknown"
+        # A pooled WebDriver session or CDP page; pooled ones belong to the pool, so only
+        # browsers we started ourselves are quit
+        self.owns_driver = driver is None
+        self.backend: DriverBackend = as_backend(driver if driver is not None else create_driver(), self.owns_driver)
+        # Set when the driver is one tab of a shared browser; the backend refuses commands outside that tab
+        self.window_handle = getattr(self.backend, "window_handle", None)
+        # Wait for the page and its form to be ready instead of sleeping a fixed time
+        self.waiter = FormWaiter(self.backend)
+        self.session_snapshot = None
+        with self.waiter.watching_fields():
+            if snapshots is not None or warmup:
+                # Warm-up steps, or a stored session for the origin that skips them
+                self.session_snapshot = open_form(self.backend, self.waiter, url, snapshots, warmup)
+            else:
+                self.backend.navigate(url)
+                self.waiter.page_ready()
+        # Count the commands this form issues from here on
+        self.backend.reset_stats()
+        logger.info("Loaded form page", extra={"url": url, "backend": self.backend.name})
+
+    def driver_stats(self) -> dict:
+        return self.backend.stats()
 
     def close(self):
-        self.driver.quit()
-        print("Browser closed successfully")
+        self.backend.close()
+        if self.owns_driver:
+            logger.info("Browser closed")
 
 # Function to get form fields
 def get_form_fields(state: FormState, agent: FormAgent) -> FormState:
     try:
-        # Try to find the form in multiple ways
-        try:
-            form = agent.driver.find_element(By.ID, "myForm")
-        except:
-            print("Form with ID 'myForm' not found, trying first form")
-            form = agent.driver.find_element(By.TAG_NAME, "form")
-            
-        elements = form.find_elements(By.XPATH, ".//input | .//select | .//textarea")
+        # Read every field of #myForm (or the first form) in one script call (with Selenium, their element handles too)
+        payload = agent.backend.discover_fields("#myForm")
         current_field_ids = {field.id for field in state.fields}
-        new_fields = []
-
-        for element in elements:
-            field_id = element.get_attribute("id")
-            if not field_id or field_id in current_field_ids:
-                continue
-            field_type = element.get_attribute("type") or element.tag_name
-            label = agent.get_label_text(element)
-            new_fields.append(Field(id=field_id, label=label, type=field_type))
+        new_fields = [Field(**item) for item in payload if item["id"] not in current_field_ids]
 
         updated_fields = state.fields + new_fields
-        print(f"Found {len(updated_fields)} fields: {[f.label for f in updated_fields]}")
+        logger.debug("Found fields", extra={"count": len(updated_fields), "new": [f.id for f in new_fields]})
         return FormState(
             url=state.url,
             fields=updated_fields,
@@ -81,133 +133,285 @@ def get_form_fields(state: FormState, agent: FormAgent) -> FormState:
             submission_attempted=state.submission_attempted
         )
     except Exception as e:
-        print(f"Error in get_form_fields: {e}")
+        logger.error("Field discovery failed", extra={"error": str(e)})
         return state
 
-# Function to generate input for a field
-def generate_input_for_field(field: Field) -> Field:
-    value_generators = {
-        "text": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
-        "email": lambda: f"{''.join(random.choices(string.ascii_lowercase, k=5))}@example.com",
-        "password": lambda: ''.join(random.choices(string.ascii_letters + string.digits, k=10)),
-        "number": lambda: str(random.randint(1, 100)),
-        "tel": lambda: f"{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-        "url": lambda: f"https://{''.join(random.choices(string.ascii_lowercase, k=5))}.com",
-        "date": lambda: "2023-10-15",  # Example date
-        "time": lambda: "12:34",  # Example time
-        "datetime-local": lambda: "2023-10-15T12:34",  # Example datetime
-        "month": lambda: "2023-10",  # Example month
-        "week": lambda: "2023-W42",  # Example week
-        "color": lambda: "#{:06x}".format(random.randint(0, 0xFFFFFF)),  # Random color
-        "range": lambda: str(random.randint(0, 100)),  # Random range value
-        "file": lambda: "C:/Users/avi/Downloads/meeting_analysis.txt",  # Example file path
-        "search": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
-        "checkbox": lambda: random.choice([True, False]),
-        "radio": lambda: random.choice(["option1", "option2", "option3"]),
-        "select": lambda: random.choice(["Credit Card", "PayPal", "Bank Transfer"]),  # Example options
-        "textarea": lambda: ' '.join(''.join(random.choices(string.ascii_letters, k=5)) for _ in range(3)),
-        "multiselect": lambda: random.sample(["Feature 1", "Feature 2", "Feature 3", "Feature 4"], 2)  # Randomly select 2 options
-    }
-    
-    field.value = value_generators.get(field.type, lambda: "default")()
-    print(f"Generated value for {field.label}: {field.value}")
-    return field
+# Give every field a rule-based value; the whole form is generated in one pass
+def generate_inputs(fields: List[Field], seed=VALUE_SEED) -> List[Field]:
+    values = generate_values(fields, seed)
+    for field in fields:
+        field.value = values[field.id]
+    logger.debug("Generated values", extra={"values": values})
+    return fields
+
+# Set one control through the backend (for radios, the group's radio with the chosen value)
+def set_control(field: Field, backend: DriverBackend):
+    if field.type in ["text", "email", "password", "textarea", "tel", "number", "url", "search"]:
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "select":
+        backend.select_options(field.id, [field.value])
+    elif field.type == "multiselect":
+        backend.select_options(field.id, field.value)
+    elif field.type == "checkbox":
+        backend.set_checked(field.id, bool(field.value))
+    elif field.type == "radio":
+        backend.choose_radio(field.name, str(field.value))
+    elif field.type in ["date", "time", "datetime-local", "month", "week"]:
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "color":
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "range":
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "file":
+        backend.set_files(field.id, [field.value])
 
-# Function to fill a field
+# Function to fill a field; with Selenium, cached handles, a stale one resolved again once
 def fill_field(field: Field, agent: FormAgent) -> Field:
     try:
-        element = agent.driver.find_element(By.ID, field.id)
-        if field.type in ["text", "email", "password", "textarea", "tel", "number", "url", "search"]:
-            element.clear()
-            element.send_keys(field.value)
-        elif field.type == "select":
-            Select(element).select_by_visible_text(field.value)
-        elif field.type == "multiselect":
-            select = Select(element)
-            select.deselect_all()
-            for value in field.value:
-                select.select_by_visible_text(value)
-        elif field.type == "checkbox":
-            if element.is_selected() != field.value:
-                element.click()
-        elif field.type == "radio":
-            agent.driver.find_element(By.XPATH, f"//input[@type='radio' and @value='{field.value}']").click()
-        elif field.type in ["date", "time", "datetime-local", "month", "week"]:
-            element.clear()
-            element.send_keys(field.value)
-        elif field.type == "color":
-            element.clear()
-            element.send_keys(field.value)
-        elif field.type == "range":
-            element.clear()
-            element.send_keys(field.value)
-        elif field.type == "file":
-            element.send_keys(field.value)
-        
+        set_control(field, agent.backend)
         field.filled = True
-        print(f"Filled {field.label} with {field.value}")
+        logger.debug("Filled field", extra={"field": field.id, "value": field.value})
         return field
     except Exception as e:
-        print(f"Error filling field {field.label}: {e}")
+        agent.backend.note_exception(e)
+        logger.warning("Filling field failed", extra={"field": field.id, "error": str(e)})
         return field
 
-# Function to submit the form
+# Function to fill all fields in one scripted operation, falling back to fill_field where needed
+def fill_fields_bulk(fields: List[Field], agent: FormAgent) -> List[Field]:
+    try:
+        fallback_ids = set(bulk_fill(agent.backend, fields))
+    except Exception as e:
+        logger.warning("Bulk fill failed, filling field by field", extra={"error": str(e)})
+        fallback_ids = {field.id for field in fields}
+
+    for field in fields:
+        if field.id in fallback_ids:
+            fill_field(field, agent)
+        else:
+            field.filled = True
+    logger.debug("Bulk-filled fields", extra={"filled": len(fields) - len(fallback_ids), "fallback": len(fallback_ids)})
+    return fields
+
+# Function to submit the form; #myForm (or the first form) and its submit controls come from one script call
 def submit_form(agent: FormAgent) -> bool:
     try:
-        try:
-            form = agent.driver.find_element(By.ID, "myForm")
-        except:
-            print("Form with ID 'myForm' not found for submission, trying first form")
-            form = agent.driver.find_element(By.TAG_NAME, "form")
-            
-        try:
-            submit_button = form.find_element(By.XPATH, ".//button[@type='submit']")
-        except:
-            print("Submit button not found, trying input type submit")
-            submit_button = form.find_element(By.XPATH, ".//input[@type='submit']")
-            
-        submit_button.click()
-        time.sleep(2)
-        print("Form submitted successfully")
+        agent.backend.click_submit("#myForm", before_click=agent.waiter.arm_submit)
+        outcome = agent.waiter.submit_outcome()
+        logger.info("Form submitted", extra={"outcome": outcome})
         return True
     except Exception as e:
-        print(f"Error submitting form: {e}")
+        agent.backend.note_exception(e)
+        logger.error("Form submission failed", extra={"error": str(e)})
         return False
 
+# Process one form on a pooled browser (blocking; runs on a form worker thread)
+def fill_form(
+    url: str,
+    fill_mode: str = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: Sequence[str] = (),
+    on_event: Optional[Callable[[dict], None]] = None,
+) -> FormResult:
+    timings = FormTimings(on_phase=phase_listener(on_event))
+    waiting = time.perf_counter()
+    try:
+        with browser_pool.session() as driver:
+            timings.record("browser", time.perf_counter() - waiting)
+
+            # Initialize the agent on a pooled browser
+            with timings.span("navigation"):
+                agent = FormAgent(url, driver=driver, snapshots=session_snapshots if session_snapshot else None, warmup=warmup)
+            try:
+                state = FormState(url=url)
+
+                # A known layout (one fingerprint script call) skips discovery; values are still generated fresh
+                with timings.span("discovery"):
+                    fingerprint = None
+                    try:
+                        fingerprint = form_fingerprint(agent.backend, "#myForm")
+                    except Exception as e:
+                        logger.warning("Fingerprint failed", extra={"error": str(e)})
+                    cached = schema_cache.get_schema(fingerprint) if fingerprint else None
+                    if cached is not None:
+                        state = FormState(url=url, fields=[Field(**item) for item in cached["fields"]], initial_fields_fetched=True)
+                        agent.backend.prime_fields(cached["fields"])
+                    else:
+                        # Get all form fields
+                        state = get_form_fields(state, agent)
+                        if fingerprint and state.fields:
+                            schema_cache.set_schema(fingerprint, [field.dict(exclude={"value", "filled"}) for field in state.fields])
+
+                # Generate and fill all fields
+                with timings.span("generation"):
+                    generate_inputs(state.fields)
+                with timings.span("fill"):
+                    if fill_mode == "bulk":
+                        fill_fields_bulk(state.fields, agent)
+                        if on_event is not None:
+                            for field in state.fields:
+                                on_event(field_event(field))
+                    else:
+                        for field in state.fields:
+                            with timings.field(field.id, field.type):
+                                field = fill_field(field, agent)
+                            if on_event is not None:
+                                on_event(field_event(field, timings.fields.get(field.id)))
+
+                # Submit the form
+                with timings.span("submit"):
+                    submission_success = submit_form(agent)
+                state.submission_attempted = True
+            finally:
+                # Release the agent; the pool resets the browser
+                agent.close()
+    except Exception:
+        timings.finish("error", 0)
+        raise
+    timings.finish("success", sum(field.filled for field in state.fields))
+    result_store.record_form(url, fingerprint, state.fields, timings.fields)
+
+    return FormResult(
+        url=url,
+        state=state,
+        submission_success=submission_success,
+        submit_outcome=agent.waiter.submit_result,
+        schema_cache_hit=cached is not None,
+        wait_timings=agent.waiter.timings,
+        timings=timings.as_dict() if include_timings else None,
+        session_snapshot=agent.session_snapshot,
+        driver_stats=agent.driver_stats()
+    )
+
+# /process-form response for one form
+def run_form_job(
+    url: str,
+    fill_mode: str = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: Sequence[str] = (),
+) -> dict:
+    result = fill_form(
+        url, fill_mode=fill_mode, include_timings=include_timings, session_snapshot=session_snapshot, warmup=warmup
+    )
+    response = {
+        "status": result.status,
+        "submission_success": result.submission_success,
+        "submit_outcome": result.submit_outcome,
+        "schema_cache_hit": result.schema_cache_hit,
+        "filled_fields": [{"label": field.label, "value": field.value} for field in result.state.fields],
+        "wait_timings": result.wait_timings
+    }
+    if result.timings is not None:
+        response["timings"] = result.timings
+    if result.session_snapshot is not None:
+        response["session_snapshot"] = result.session_snapshot
+    response["driver_stats"] = result.driver_stats
+    return response
+
 # FastAPI app
 app = FastAPI()
 
+# Pre-started headless browsers shared by all requests (tabs of shared browsers with BROWSER_POOL_MODE=tabs,
+# pages of browsers driven over DevTools with BROWSER_POOL_MODE=cdp)
+browser_pool = create_browser_pool()
+
+# Discovered fields by form fingerprint, so repeat layouts skip discovery
+schema_cache = SchemaCache()
+
+# Browser sessions by origin, for forms run with session_snapshot
+session_snapshots = SessionSnapshotStore()
+
+# Field-fill history (append-only SQLite, written by a background thread) for /results/stats
+result_store = ResultStore()
+
+# Worker threads that run form jobs off the event loop (worker processes with FORM_WORKER_PROCESSES)
+form_executor = create_form_executor(__name__)
+
+# What /pool/stats and the pool gauges report: the worker processes' pools when they own the browsers
+pool_view = pool_stats_source(form_executor, browser_pool)
+
+register_runtime_gauges(pool_view, form_executor)
+register_cache_gauge("schema_cache", schema_cache)
+register_cache_gauge("session_snapshots", session_snapshots)
+
+@app.on_event("startup")
+def start_browser_pool():
+    # Fail fast when chromedriver is missing; workers inherit the resolved path. CDP pages don't use it.
+    if POOL_MODE != "cdp":
+        check_chromedriver()
+    if isinstance(form_executor, WorkerSupervisor):
+        # Worker processes own the browsers
+        form_executor.start()
+    else:
+        browser_pool.start()
+
+@app.on_event("shutdown")
+def close_browser_pool():
+    form_executor.shutdown()
+    browser_pool.close()
+    result_store.close()
+
 # API endpoint to process the form
 @app.post("/process-form")
-async def process_form(url: str):
+async def process_form(
+    url: str,
+    fill_mode: Literal["per_field", "bulk"] = "per_field",
+    include_timings: bool = False,
+    session_snapshot: bool = False,
+    warmup: List[str] = Query(default=[]),
+):
     try:
-        # Initialize the agent
-        agent = FormAgent(url)
-        state = FormState(url=url)
-
-        # Get all form fields
-        state = get_form_fields(state, agent)
-
-        # Generate and fill all fields
-        for field in state.fields:
-            field = generate_input_for_field(field)
-            field = fill_field(field, agent)
-
-        # Submit the form
-        submission_success = submit_form(agent)
-
-        # Close the agent
-        agent.close()
-
-        # Return the result
-        return {
-            "status": "success",
-            "submission_success": submission_success,
-            "filled_fields": [{"label": field.label, "value": field.value} for field in state.fields]
-        }
+        return await form_executor.run(
+            run_form_job,
+            url,
+            fill_mode=fill_mode,
+            include_timings=include_timings,
+            session_snapshot=session_snapshot,
+            warmup=warmup,
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PoolExhaustedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Browser pool size and wait-time metrics
+@app.get("/pool/stats")
+async def pool_stats():
+    return pool_view.stats()
+
+# Form worker and queue metrics
+@app.get("/executor/stats")
+async def executor_stats():
+    return form_executor.stats()
+
+# Form schema cache size and hit/miss counters
+@app.get("/schema-cache/stats")
+async def schema_cache_stats():
+    return schema_cache.stats()
+
+# Session snapshot store size and hit/miss counters
+@app.get("/session-snapshots/stats")
+async def session_snapshot_stats():
+    return session_snapshots.stats()
+
+# Prometheus metrics: phase/field latency histograms, form counters, pool and executor gauges
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Batch jobs: submit many URLs, stream results as they finish
+app.include_router(create_jobs_router(fill_form, FormOptions, form_executor))
+
+# One form with per-phase and per-field progress events (SSE/NDJSON or WebSocket)
+app.include_router(create_stream_router(fill_form, FormOptions, form_executor))
+
+# Aggregates over the stored field-fill history
+app.include_router(create_results_router(result_store))
+
 # Run the FastAPI app
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from browser_pool import POOL_SIZE
+
+# Executor configuration (overridable through the environment)
+FORM_WORKERS = int(os.getenv("FORM_WORKERS", str(POOL_SIZE)))
+FORM_MAX_QUEUE = int(os.getenv("FORM_MAX_QUEUE", "8"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# Runs blocking form jobs on worker threads so the event loop stays responsive
+class FormJobExecutor:
+    def __init__(self, workers: int = FORM_WORKERS, max_queue: int = FORM_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="form-worker")
+        self._lock = threading.Lock()
+        self._in_flight = 0  # running + queued jobs
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    # Schedule fn(*args, **kwargs) on a worker; raises QueueFullError when the backlog is full
+    async def run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(f"Form queue is full ({self.max_queue} jobs waiting)")
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        # Count the job as done when the worker finishes, even if the client went away
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(self._in_flight, self.workers),
+                "queued": max(0, self._in_flight - self.workers),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Callable, Literal, Optional, Type
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field as PydanticField, ValidationError
+from browser_pool import PoolExhaustedError
+from form_executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Events a form may run ahead of its client before the worker waits (memory per stream stays flat)
+FORM_STREAM_BUFFER = int(os.getenv("FORM_STREAM_BUFFER", "64"))
+STREAM_CLOSED_POLL = 0.5
+
+
+class StreamClosedError(Exception):
+    pass
+
+
+# Progress of one form run: the form function gets an on_event callback, called on its worker
+# thread, and the client reads the events as they are emitted. When the client is FORM_STREAM_BUFFER
+# events behind, on_event blocks; once the client is gone it raises StreamClosedError, which ends the run.
+class FormStream:
+    def __init__(self, executor, run_form: Callable, url: str, options: dict, buffer: int = FORM_STREAM_BUFFER):
+        self.executor = executor
+        self.run_form = run_form
+        self.url = url
+        self.options = options
+        self.buffer = buffer
+        self.result: Any = None
+        self._closed = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._events: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # Submits the run; raises QueueFullError right away when the executor has no room
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue(maxsize=self.buffer)
+        self._task = asyncio.ensure_future(self.executor.run(self.run_form, self.url, on_event=self.emit, **self.options))
+        self._task.add_done_callback(lambda task: task.cancelled() or task.exception())  # Retrieved even if abandoned
+        await asyncio.sleep(0)  # Let the executor accept or reject the job
+        if self._task.done() and self._task.exception() is not None:
+            raise self._task.exception()
+
+    def emit(self, event: dict):
+        if self._closed.is_set():
+            raise StreamClosedError("Client went away")
+        future = asyncio.run_coroutine_threadsafe(self._events.put(event), self._loop)
+        while True:
+            try:
+                return future.result(timeout=STREAM_CLOSED_POLL)
+            except FutureTimeoutError:
+                if self._closed.is_set():
+                    future.cancel()
+                    raise StreamClosedError("Client went away")
+
+    # Events in emission order; the run's return value is in self.result afterwards
+    async def events(self) -> AsyncIterator[dict]:
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._events.get())
+                done, _ = await asyncio.wait({getter, self._task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                while not self._events.empty():
+                    yield self._events.get_nowait()
+                self.result = self._task.result()
+                return
+        finally:
+            self.close()
+
+    def close(self):
+        self._closed.set()
+
+
+# Final event: how the form went, without the per-field state already streamed
+def result_event(result: Any) -> dict:
+    data = result.dict() if isinstance(result, BaseModel) else result
+    fields = data["state"]["fields"]
+    event = {
+        "event": "result",
+        "url": data["url"],
+        "status": data["status"],
+        "submit_outcome": data.get("submit_outcome"),
+        "fields": len(fields),
+        "filled": sum(field["filled"] for field in fields),
+    }
+    for key in ("submission_success", "schema_cache_hit", "llm_calls", "session_snapshot", "driver_stats"):
+        if key in data:
+            event[key] = data[key]
+    if data.get("timings"):
+        event["timings"] = {"total": data["timings"]["total"], "phases": data["timings"]["phases"]}
+    return event
+
+
+# FormTimings on_phase callback sending phase events; None without a listener
+def phase_listener(on_event: Optional[Callable[[dict], None]]) -> Optional[Callable[[str, float], None]]:
+    if on_event is None:
+        return None
+    return lambda phase, seconds: on_event({"event": "phase", "phase": phase, "seconds": round(seconds, 4)})
+
+
+# One filled (or skipped) field; seconds is None when the field was filled in a bulk call
+def field_event(field, seconds: Optional[float] = None) -> dict:
+    return {
+        "event": "field",
+        "id": field.id,
+        "label": field.label,
+        "value": field.value,
+        "filled": field.filled,
+        "seconds": round(seconds, 4) if seconds is not None else None,
+    }
+
+
+def error_event(error: Exception) -> dict:
+    return {"event": "error", "error": str(error)}
+
+
+async def stream_form(stream: FormStream) -> AsyncIterator[dict]:
+    try:
+        async for event in stream.events():
+            yield event
+        yield result_event(stream.result)
+    except StreamClosedError:
+        return
+    except Exception as e:
+        logger.error("Streamed form failed", extra={"url": stream.url, "error": str(e)})
+        yield error_event(e)
+
+
+# /process-form/stream (SSE or NDJSON) and /process-form/ws for a form runner whose form
+# function accepts on_event; options_model declares the per-form options it accepts
+def create_stream_router(run_form: Callable, options_model: Type[BaseModel], executor) -> APIRouter:
+    router = APIRouter()
+
+    class StreamRequest(BaseModel):
+        url: str
+        options: options_model = PydanticField(default_factory=options_model)
+
+    async def start(request: StreamRequest) -> FormStream:
+        stream = FormStream(executor, run_form, request.url, request.options.dict())
+        await stream.start()
+        return stream
+
+    # One event per phase and per filled field, then a result (or error) event
+    @router.post("/process-form/stream")
+    async def process_form_stream(request: StreamRequest, format: Literal["sse", "ndjson"] = "sse"):
+        try:
+            stream = await start(request)
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+        except PoolExhaustedError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        async def body():
+            async for event in stream_form(stream):
+                line = json.dumps(event, default=str)
+                yield f"event: {event['event']}\ndata: {line}\n\n" if format == "sse" else line + "\n"
+
+        media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+        return StreamingResponse(body(), media_type=media_type)
+
+    # Same events over a WebSocket; the client sends {"url": ..., "options": {...}} first
+    @router.websocket("/process-form/ws")
+    async def process_form_ws(websocket: WebSocket):
+        await websocket.accept()
+        stream = None
+        try:
+            try:
+                request = StreamRequest(**await websocket.receive_json())
+                stream = await start(request)
+            except (ValidationError, ValueError, TypeError, QueueFullError, PoolExhaustedError) as e:
+                await websocket.send_json(error_event(e))
+                await websocket.close(code=1008 if isinstance(e, (ValidationError, ValueError, TypeError)) else 1013)
+                return
+            async for event in stream_form(stream):
+                await websocket.send_text(json.dumps(event, default=str))
+            await websocket.close()
+        except WebSocketDisconnect:
+            if stream is not None:
+                stream.close()
+
+    return router
@@ -0,0 +1,210 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, List, Literal, Optional, Type
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field as PydanticField
+from form_executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Job configuration (overridable through the environment)
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "0"))  # 0: one slot per form worker
+JOBS_MAX_RETAINED = int(os.getenv("JOBS_MAX_RETAINED", "100"))
+JOBS_RESULT_WINDOW = int(os.getenv("JOBS_RESULT_WINDOW", "100"))  # Recent per-form results kept per job
+JOBS_QUEUE_RETRY_DELAY = 0.5
+
+
+# One batch of URLs: per-status counters for every form, and only the most recent per-form results
+# (in completion order), so a finished job holds O(window) results however many URLs it had
+class Job:
+    def __init__(self, items: list, concurrency: int, window: int = JOBS_RESULT_WINDOW):
+        self.id = uuid.uuid4().hex
+        self.items = items
+        self.concurrency = concurrency
+        self.status = "pending"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.counts = {}
+        self.done = 0
+        self.results = deque(maxlen=window)  # The last `window` results; result n is results[n - first_kept]
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "cancelled")
+
+    @property
+    def first_kept(self) -> int:
+        return self.done - len(self.results)
+
+    def record(self, result: dict):
+        self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+        self.done += 1
+        self.results.append(result)
+
+    async def add_result(self, result: dict):
+        async with self.changed:
+            self.record(result)
+            self.changed.notify_all()
+
+    async def finish(self, status: str):
+        async with self.changed:
+            self.status = status
+            self.finished_at = time.time()
+            self.changed.notify_all()
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": len(self.items),
+            "done": self.done,
+            "counts": dict(self.counts),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# Schedules job items onto the form executor with a per-job and a global concurrency bound
+class JobManager:
+    def __init__(self, run_form: Callable, executor, concurrency: int = JOBS_CONCURRENCY):
+        self.run_form = run_form
+        self.executor = executor
+        self.concurrency = concurrency or executor.workers
+        self.jobs = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def submit(self, items: list, concurrency: Optional[int] = None) -> Job:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        job = Job(items, min(concurrency or self.concurrency, self.concurrency))
+        self.jobs[job.id] = job
+        self._evict_finished()
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    async def cancel(self, job: Job):
+        if job.task is not None and not job.finished:
+            job.task.cancel()
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        pending = iter(enumerate(job.items))
+        running = {}
+
+        # A fixed set of workers pulls items, so memory stays O(concurrency) for huge jobs
+        async def worker():
+            for index, item in pending:
+                running[index] = item
+                async with self._slots:
+                    result = await self._run_item(item)
+                await job.add_result({"index": index, **result})
+                del running[index]
+
+        workers = [asyncio.create_task(worker()) for _ in range(job.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+            await job.finish("completed")
+        except asyncio.CancelledError:
+            for task in workers:
+                task.cancel()
+            # Only counted (and kept while in the window) as they are walked; finish() wakes the readers
+            for index, item in itertools.chain(list(running.items()), pending):
+                job.record({"index": index, "url": item.url, "status": "cancelled"})
+            await job.finish("cancelled")
+            raise
+
+    async def _run_item(self, item) -> dict:
+        while True:
+            try:
+                result = await self.executor.run(self.run_form, item.url, **item.options.dict())
+                return result.dict() if isinstance(result, BaseModel) else result
+            except QueueFullError:
+                # Interactive requests hold the queue; wait for room rather than failing the item
+                await asyncio.sleep(JOBS_QUEUE_RETRY_DELAY)
+            except Exception as e:
+                logger.error("Job item failed", extra={"url": item.url, "error": str(e)})
+                return {"url": item.url, "status": "error", "error": str(e)}
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self.jobs) - JOBS_MAX_RETAINED)]:
+            del self.jobs[job_id]
+
+
+# Results from the job's window as they are added; a reader that falls more than the window
+# behind skips the results that were dropped meanwhile
+async def stream_results(job: Job, format: str):
+    seen = 0
+    while True:
+        async with job.changed:
+            while seen >= job.done and not job.finished:
+                await job.changed.wait()
+            seen = max(seen, job.first_kept)
+            batch = list(itertools.islice(job.results, seen - job.first_kept, None))
+            finished = job.finished
+        seen += len(batch)
+        for result in batch:
+            line = json.dumps(result, default=str)
+            yield f"event: result\ndata: {line}\n\n" if format == "sse" else line + "\n"
+        if finished and seen >= job.done:
+            break
+    if format == "sse":
+        yield f"event: end\ndata: {json.dumps(job.summary())}\n\n"
+
+
+# /jobs endpoints for a form runner; options_model declares the per-URL options it accepts
+def create_jobs_router(run_form: Callable, options_model: Type[BaseModel], executor) -> APIRouter:
+    manager = JobManager(run_form, executor)
+    router = APIRouter()
+
+    class JobItem(BaseModel):
+        url: str
+        options: options_model = PydanticField(default_factory=options_model)
+
+    class JobRequest(BaseModel):
+        items: List[JobItem]
+        concurrency: Optional[int] = None
+
+    @router.post("/jobs")
+    async def create_job(request: JobRequest):
+        if not request.items:
+            raise HTTPException(status_code=422, detail="A job needs at least one URL")
+        return manager.submit(request.items, request.concurrency).summary()
+
+    @router.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return manager.get(job_id).summary()
+
+    # Results as they finish: NDJSON by default, Server-Sent Events with format=sse
+    @router.get("/jobs/{job_id}/results")
+    async def job_results(job_id: str, format: Literal["ndjson", "sse"] = "ndjson"):
+        job = manager.get(job_id)
+        media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+        return StreamingResponse(stream_results(job, format), media_type=media_type)
+
+    @router.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str):
+        job = manager.get(job_id)
+        await manager.cancel(job)
+        return job.summary()
+
+    return router
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from observability import record_llm_call
+from value_cache import ValueCache, field_signature
+
+logger = logging.getLogger(__name__)
+
+# Pipeline configuration (overridable through the environment)
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "10"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "20"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "15"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("LLM_BREAKER_RESET_TIMEOUT", "30"))
+
+
+# Token bucket shared by every request in the process. Thread-safe, so callers on
+# different worker threads (each with its own event loop) draw from the same budget.
+class TokenBucket:
+    def __init__(self, rate: float = LLM_RATE_PER_SECOND, burst: int = LLM_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _try_take(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+# Opens after consecutive failures so a degraded provider is skipped in favour of the
+# rule-based generators; after the reset timeout a single trial call is let through.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = "half_open"
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == "open":
+                return  # A call started before the breaker opened; wait for the trial call
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._counters["opened"] += 1
+                    logger.warning("LLM circuit breaker opened", extra={"failures": self._failures})
+                self._state = "open"
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures, **self._counters}
+
+
+# Process-wide limits shared by all interpreters
+rate_limiter = TokenBucket()
+circuit_breaker = CircuitBreaker()
+
+
+def field_prompt_inputs(field) -> dict:
+    return {
+        "label": field.label,
+        "field_type": field.type,
+        "options": field.options if field.options else "None",
+    }
+
+
+# Resolves all fields concurrently through ainvoke with rate limiting, timeouts,
+# jittered retries and the circuit breaker; anything unresolved gets the fallback value.
+class AsyncFieldInterpreter:
+    def __init__(
+        self,
+        llm,
+        prompt,
+        fallback: Callable[[Any], Any],
+        validate: Optional[Callable[[Any, Any], Any]] = None,
+        cache: Optional[ValueCache] = None,
+        limiter: TokenBucket = rate_limiter,
+        breaker: CircuitBreaker = circuit_breaker,
+        timeout: float = LLM_CALL_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        concurrency: int = LLM_CONCURRENCY,
+    ):
+        self.chain = prompt | llm
+        self.fallback = fallback
+        self.validate = validate
+        self.cache = cache
+        self.limiter = limiter
+        self.breaker = breaker
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.counters = {"calls": 0, "timeouts": 0, "errors": 0, "invalid": 0, "retries": 0, "fallbacks": 0, "cache_hits": 0}
+        self.cache_hit_ids = set()
+
+    async def interpret_all(self, fields: List[Any]) -> Dict[str, Any]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(field):
+            async with semaphore:
+                return field.id, await self.interpret(field)
+
+        return dict(await asyncio.gather(*[bounded(field) for field in fields]))
+
+    async def interpret(self, field) -> Any:
+        signature = field_signature(field.label, field.type, field.options)
+        if self.cache is not None:
+            cached = self.cache.get(signature)
+            if cached is not None:
+                self.counters["cache_hits"] += 1
+                self.cache_hit_ids.add(field.id)
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                break
+            if attempt:
+                self.counters["retries"] += 1
+            await self.limiter.acquire()
+            self.counters["calls"] += 1
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self.chain.ainvoke(field_prompt_inputs(field)), self.timeout)
+                # The provider answered; an unusable value is retried but doesn't trip the breaker
+                self.breaker.record_success()
+                value = response.content.strip()
+                if self.validate is not None:
+                    value = self.validate(field, value)
+                if value is not None and value != "":
+                    record_llm_call("async", "ok", time.perf_counter() - started, response)
+                    if self.cache is not None:
+                        self.cache.set(signature, value)
+                    return value
+                self.counters["invalid"] += 1
+                record_llm_call("async", "invalid", time.perf_counter() - started, response)
+                logger.warning("Invalid LLM value", extra={"field": field.id, "content": response.content})
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                record_llm_call("async", "timeout", time.perf_counter() - started)
+                self.breaker.record_failure()
+                logger.warning("LLM timeout", extra={"field": field.id, "attempt": attempt + 1})
+            except Exception as e:
+                self.counters["errors"] += 1
+                record_llm_call("async", "error", time.perf_counter() - started)
+                self.breaker.record_failure()
+                logger.warning("LLM error", extra={"field": field.id, "attempt": attempt + 1, "error": str(e)})
+            if attempt < self.max_retries:
+                # Full jitter keeps concurrent retries from hitting the provider in lockstep
+                await asyncio.sleep(random.uniform(0, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+
+        self.counters["fallbacks"] += 1
+        return self.fallback(field)
+
+
+def pipeline_stats() -> dict:
+    return {"rate_limiter": rate_limiter.stats(), "circuit_breaker": circuit_breaker.stats()}
@@ -0,0 +1,310 @@
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+# Logging configuration (overridable through the environment)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" (key=value) or "json"
+
+# Attributes every LogRecord has; anything else was passed through `extra` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+# One line per record: the message plus the `extra` fields as key=value pairs or as JSON
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, fmt: str = LOG_FORMAT):
+        super().__init__()
+        self.json = fmt == "json"
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES}
+        if record.exc_info:
+            fields["exc_info"] = self.formatException(record.exc_info)
+        if self.json:
+            return json.dumps({
+                "ts": round(record.created, 3),
+                "level": record.levelname.lower(),
+                "logger": record.name,
+                "msg": record.getMessage(),
+                **fields,
+            }, default=str)
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+        pairs = " ".join(f"{k}={json.dumps(v, default=str)}" for k, v in fields.items())
+        return f"{timestamp} {record.levelname:<7} {record.name}: {record.getMessage()}{' ' + pairs if pairs else ''}"
+
+
+_logging_configured = False
+
+
+# Install the structured handler on the root logger once per process
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    global _logging_configured
+    if _logging_configured:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(StructuredFormatter(fmt))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    _logging_configured = True
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield f"{self.name}{_label_text(self.labels, key)} {_number(value)}"
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return {"values": list(values.items())}
+
+    def merge(self, delta: dict):
+        for key, value in delta["values"]:
+            self.inc(value, **dict(zip(self.labels, key)))
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, values in series.items():
+            for bound, count in zip(self.buckets + (math.inf,), values[:-2] + [values[-2]]):
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_label_text(self.labels, key, le)} {count}"
+            yield f"{self.name}_count{_label_text(self.labels, key)} {values[-2]}"
+            yield f"{self.name}_sum{_label_text(self.labels, key)} {_number(round(values[-1], 6))}"
+
+    def drain(self) -> dict:
+        with self._lock:
+            series, self._series = self._series, {}
+        return {"series": list(series.items())}
+
+    def merge(self, delta: dict):
+        with self._lock:
+            for key, values in delta["series"]:
+                series = self._series.setdefault(tuple(key), [0] * (len(self.buckets) + 2))
+                for i, value in enumerate(values):
+                    series[i] += value
+
+
+# Gauge read at scrape time from a callback returning {label values: value}
+class CallbackGauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Dict[Tuple[str, ...], float]], labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            logging.getLogger(__name__).warning("Metric callback failed", extra={"metric": self.name, "error": str(e)})
+            return
+        for key, value in values.items():
+            yield f"{self.name}{_label_text(self.labels, key)} {_number(value)}"
+
+
+# Process-wide metrics in the Prometheus text format. Worker processes drain their counters
+# and histograms after each job and the supervisor merges them, so /metrics covers them too.
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackGauge):
+                return existing
+            self._metrics[metric.name] = metric  # Callback gauges: the latest registration wins
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, callback: Callable, labels: Sequence[str] = ()) -> CallbackGauge:
+        return self._register(CallbackGauge(name, help, callback, labels))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> dict:
+        with self._lock:
+            metrics = [m for m in self._metrics.values() if hasattr(m, "drain")]
+        return {m.name: m.drain() for m in metrics}
+
+    def merge(self, delta: dict):
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in delta.items():
+            if name in metrics:
+                metrics[name].merge(values)
+
+
+registry = MetricsRegistry()
+
+FORM_PHASE_SECONDS = registry.histogram("form_phase_seconds", "Time spent per form processing phase", ["phase"])
+FIELD_FILL_SECONDS = registry.histogram("form_field_fill_seconds", "Time to fill one field", ["type"])
+FORMS_TOTAL = registry.counter("forms_processed_total", "Forms processed", ["status"])
+FIELDS_FILLED_TOTAL = registry.counter("form_fields_filled_total", "Fields filled")
+FIELDS_PER_SECOND = registry.histogram(
+    "form_fields_per_second", "Fields filled per second of fill phase, per form",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+LLM_REQUEST_SECONDS = registry.histogram("llm_request_seconds", "LLM request latency", ["mode", "outcome"])
+LLM_TOKENS_TOTAL = registry.counter("llm_tokens_total", "LLM tokens used", ["kind"])
+
+
+# Record one LLM request; token counts come from the message's usage metadata when the model reports it
+def record_llm_call(mode: str, outcome: str, seconds: float, message=None):
+    LLM_REQUEST_SECONDS.observe(seconds, mode=mode, outcome=outcome)
+    usage = getattr(message, "usage_metadata", None) or {}
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS_TOTAL.inc(usage[kind], kind=kind.split("_")[0])
+
+
+# Timing spans for one form: per-phase and per-field durations, also fed into the histograms
+# on_phase(phase, seconds) is called as each phase closes, for progress streaming
+class FormTimings:
+    def __init__(self, on_phase: Optional[Callable[[str, float], None]] = None):
+        self.started = time.perf_counter()
+        self.on_phase = on_phase
+        self.phases: Dict[str, float] = {}
+        self.fields: Dict[str, float] = {}
+        self._lock = threading.Lock()  # Spans may close on several threads (graph branches)
+
+    @contextmanager
+    def span(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def record(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        FORM_PHASE_SECONDS.observe(seconds, phase=phase)
+        if self.on_phase is not None:
+            self.on_phase(phase, seconds)
+
+    @contextmanager
+    def field(self, field_id: str, field_type: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            with self._lock:
+                self.fields[field_id] = self.fields.get(field_id, 0.0) + duration
+            FIELD_FILL_SECONDS.observe(duration, type=field_type)
+
+    # Form-level counters once the form is done
+    def finish(self, status: str, filled: int):
+        FORMS_TOTAL.inc(status=status)
+        FIELDS_FILLED_TOTAL.inc(filled)
+        fill_seconds = self.phases.get("fill")
+        if filled and fill_seconds:
+            FIELDS_PER_SECOND.observe(filled / fill_seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "total": round(time.perf_counter() - self.started, 4),
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            "fields": {field_id: round(seconds, 4) for field_id, seconds in self.fields.items()},
+        }
+
+
+# Gauges for the browser pool and form executor, read from their stats() at scrape time
+# (a pool view over worker processes has no counts until the workers first report)
+def register_runtime_gauges(browser_pool, executor):
+    registry.gauge(
+        "browser_pool_sessions", "Browser sessions by state",
+        lambda: {(state,): browser_pool.stats().get(state, 0) for state in ("idle", "in_use", "live")}, ["state"],
+    )
+    registry.gauge(
+        "browser_pool_wait_seconds_max", "Longest wait for a browser session",
+        lambda: {(): browser_pool.stats().get("wait_seconds_max", 0.0)},
+    )
+    registry.gauge(
+        "form_executor_jobs", "Form jobs by state",
+        lambda: {(state,): executor.stats()[state] for state in ("running", "queued", "completed", "failed", "rejected")},
+        ["state"],
+    )
+
+
+def register_cache_gauge(name: str, cache):
+    registry.gauge(
+        f"{name}_hit_ratio", f"{name.replace('_', ' ').capitalize()} hit ratio", lambda: {(): cache.stats()["hit_rate"]}
+    )
@@ -0,0 +1,235 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from fastapi import APIRouter, Query
+
+logger = logging.getLogger(__name__)
+
+# Result store configuration (overridable through the environment). Recording is off unless
+# RESULT_STORE_PATH names the SQLite file to write, so importing an app creates no file.
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH")
+# Rows written per transaction, and the longest a recorded form waits to be written
+RESULT_STORE_BATCH = int(os.getenv("RESULT_STORE_BATCH", "500"))
+RESULT_STORE_FLUSH_INTERVAL = float(os.getenv("RESULT_STORE_FLUSH_INTERVAL", "1.0"))
+# Forms waiting for the writer; beyond this, results are dropped (and counted) rather than block a form
+RESULT_STORE_QUEUE = int(os.getenv("RESULT_STORE_QUEUE", "10000"))
+
+# Per-form columns live once in forms; field rows carry only what differs per field
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS forms ("
+    "id INTEGER PRIMARY KEY, recorded_at REAL NOT NULL, url TEXT NOT NULL, fingerprint TEXT)",
+    "CREATE INDEX IF NOT EXISTS forms_recorded_at ON forms (recorded_at)",
+    "CREATE INDEX IF NOT EXISTS forms_fingerprint ON forms (fingerprint)",
+    "CREATE TABLE IF NOT EXISTS field_results ("
+    "form_id INTEGER NOT NULL, field_id TEXT NOT NULL, field_type TEXT NOT NULL, label TEXT, "
+    "source TEXT NOT NULL, filled INTEGER NOT NULL, seconds REAL)",
+    "CREATE INDEX IF NOT EXISTS field_results_form_id ON field_results (form_id)",
+)
+
+
+# Append-only history of field fills: a forms row (time, url, form fingerprint) and one row per
+# field (id, type, label, value source, success, fill seconds). record_form only queues the form;
+# a writer thread inserts forms in batched transactions into SQLite in WAL mode, so worker
+# processes can share the file and stats queries read while forms are being written.
+class ResultStore:
+    def __init__(
+        self,
+        path: Optional[str] = RESULT_STORE_PATH,
+        batch_size: int = RESULT_STORE_BATCH,
+        flush_interval: float = RESULT_STORE_FLUSH_INTERVAL,
+        max_queue: int = RESULT_STORE_QUEUE,
+    ):
+        self.path = path or None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._counters = {"forms": 0, "fields": 0, "batches": 0, "dropped_forms": 0, "write_errors": 0}
+        if self.path:
+            conn = self._connect()
+            with conn:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+            conn.close()
+            atexit.register(self.close)  # Write what's still queued when the process exits
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # Queue one form's field results; never blocks. sources maps field id to "llm", "cache" or
+    # "rule" (default "rule"); field_seconds comes from FormTimings.fields.
+    def record_form(
+        self,
+        url: str,
+        fingerprint: Optional[str],
+        fields: Iterable,
+        field_seconds: Optional[Dict[str, float]] = None,
+        sources: Optional[Dict[str, str]] = None,
+    ):
+        if not self.path:
+            return
+        field_seconds, sources = field_seconds or {}, sources or {}
+        rows = [
+            (field.id, field.type, field.label, sources.get(field.id, "rule"), int(field.filled), field_seconds.get(field.id))
+            for field in fields
+        ]
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(((time.time(), url, fingerprint), rows))
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped_forms"] += 1
+            logger.warning("Result store queue full, dropping form results", extra={"url": url})
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="result-store-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        conn = self._connect()
+        pending, rows, deadline, closing = [], 0, None, False
+        while not closing or pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                form = self._queue.get(timeout=timeout)
+                if form is None:
+                    closing = True
+                else:
+                    pending.append(form)
+                    rows += len(form[1])
+                    deadline = deadline or time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if pending and (closing or rows >= self.batch_size or time.monotonic() >= deadline):
+                self._write(conn, pending, rows)
+                pending, rows, deadline = [], 0, None
+        conn.close()
+
+    # One transaction per batch of forms
+    def _write(self, conn: sqlite3.Connection, forms: list, rows: int):
+        try:
+            with conn:
+                for form, fields in forms:
+                    form_id = conn.execute("INSERT INTO forms (recorded_at, url, fingerprint) VALUES (?, ?, ?)", form).lastrowid
+                    conn.executemany(
+                        "INSERT INTO field_results (form_id, field_id, field_type, label, source, filled, seconds) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(form_id, *field) for field in fields],
+                    )
+        except sqlite3.Error as e:
+            with self._lock:
+                self._counters["write_errors"] += 1
+            logger.warning("Result store write failed", extra={"forms": len(forms), "error": str(e)})
+            return
+        with self._lock:
+            self._counters["forms"] += len(forms)
+            self._counters["fields"] += rows
+            self._counters["batches"] += 1
+
+    # Write everything queued so far and stop the writer; the next record_form starts a new one
+    def flush(self):
+        with self._lock:
+            writer = self._writer
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+            with self._lock:
+                self._writer = None
+
+    def close(self):
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": bool(self.path), "queued_forms": self._queue.qsize(), **self._counters}
+
+    # Aggregates over the stored history, optionally since a unix time and for one fingerprint
+    def query_stats(self, since: Optional[float] = None, fingerprint: Optional[str] = None, limit: int = 10) -> dict:
+        if not self.path:
+            return {"enabled": False}
+        where, params = ["1 = 1"], []
+        if since is not None:
+            where.append("forms.recorded_at >= ?")
+            params.append(since)
+        if fingerprint is not None:
+            where.append("forms.fingerprint = ?")
+            params.append(fingerprint)
+        # Unfiltered stats don't need the join
+        source = "field_results" if not params else "field_results JOIN forms ON forms.id = field_results.form_id"
+        condition = " AND ".join(where)
+        conn = self._connect()
+        try:
+            forms, fields, failed, avg_seconds = conn.execute(
+                f"SELECT COUNT(DISTINCT form_id), COUNT(*), COALESCE(SUM(1 - filled), 0), AVG(seconds) "
+                f"FROM {source} WHERE {condition}", params
+            ).fetchone()
+            by_type = conn.execute(
+                f"SELECT field_type, COUNT(*), SUM(1 - filled), AVG(seconds), MAX(seconds) FROM {source} "
+                f"WHERE {condition} GROUP BY field_type ORDER BY 1.0 * SUM(1 - filled) / COUNT(*) DESC, COUNT(*) DESC",
+                params,
+            ).fetchall()
+            by_source = conn.execute(
+                f"SELECT source, COUNT(*), SUM(1 - filled), AVG(seconds), MAX(seconds) FROM {source} "
+                f"WHERE {condition} GROUP BY source ORDER BY COUNT(*) DESC",
+                params,
+            ).fetchall()
+            slowest = conn.execute(
+                f"SELECT label, field_type, COUNT(*), SUM(1 - filled), AVG(seconds), MAX(seconds) FROM {source} "
+                f"WHERE {condition} AND seconds IS NOT NULL GROUP BY label, field_type ORDER BY AVG(seconds) DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        finally:
+            conn.close()
+
+        def group(key: str, row) -> dict:
+            *names, count, failures, average, longest = row
+            return {
+                **dict(zip(key.split(","), names)),
+                "fields": count,
+                "failed": failures,
+                "failure_rate": round(failures / count, 4) if count else 0.0,
+                "avg_seconds": round(average, 4) if average is not None else None,
+                "max_seconds": round(longest, 4) if longest is not None else None,
+            }
+
+        return {
+            "enabled": True,
+            "forms": forms,
+            "fields": fields,
+            "failed": failed,
+            "failure_rate": round(failed / fields, 4) if fields else 0.0,
+            "avg_seconds": round(avg_seconds, 4) if avg_seconds is not None else None,
+            "by_type": [group("type", row) for row in by_type],
+            "by_source": [group("source", row) for row in by_source],
+            "slowest_labels": [group("label,type", row) for row in slowest],
+        }
+
+
+# GET /results/stats (aggregates over the stored history) for an app's result store
+def create_results_router(store: ResultStore) -> APIRouter:
+    router = APIRouter()
+
+    # Failure rate by field type and value source, and the slowest labels; plus writer counters.
+    # A plain def: FastAPI runs it on its thread pool, so scans of a large history stay off the event loop.
+    @router.get("/results/stats")
+    def results_stats(
+        since: Optional[float] = None,
+        fingerprint: Optional[str] = None,
+        limit: int = Query(default=10, ge=1, le=1000),
+    ):
+        stats = store.query_stats(since=since, fingerprint=fingerprint, limit=limit)
+        stats["writer"] = store.stats()
+        return stats
+
+    return router
@@ -0,0 +1,60 @@
+import os
+from typing import Any, Dict, List, Optional
+from dom_extract import FIELD_HELPERS_JS
+from driver_backend import ElementNotFoundError
+from value_cache import ValueCache
+
+# Schema cache configuration (overridable through the environment)
+SCHEMA_CACHE_SIZE = int(os.getenv("FORM_SCHEMA_CACHE_SIZE", "256"))
+SCHEMA_CACHE_TTL = float(os.getenv("FORM_SCHEMA_CACHE_TTL", str(24 * 3600)))
+SCHEMA_CACHE_PATH = os.getenv("FORM_SCHEMA_CACHE_PATH")  # Optional SQLite file persisting the cache
+
+# Structural fingerprint of a form in one round trip: a hash of every control's id, type,
+# label and select options in document order. Skips the layout work full discovery does.
+FINGERPRINT_SCRIPT = FIELD_HELPERS_JS + """
+var root = formRoot(arguments[0]);
+if (!root) { return null; }
+var parts = Array.from(root.querySelectorAll('input, select, textarea')).filter(function (el) {
+    return el.id;
+}).map(function (el) {
+    var options = el.tagName === 'SELECT' ? Array.from(el.options).map(function (o) { return o.text; }) : [];
+    return [el.id, fieldType(el), labelFor(el)].concat(options).join('\\u001f');
+});
+
+// cyrb53: a fast 53-bit string hash, plenty to tell a handful of layouts apart
+var source = parts.join('\\u001e'), h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+for (var i = 0; i < source.length; i++) {
+    var ch = source.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+}
+h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+var hash = (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+return parts.length + ':' + hash;
+"""
+
+
+def form_fingerprint(backend, form_selector: Optional[str] = None) -> str:
+    fingerprint = backend.evaluate(FINGERPRINT_SCRIPT, form_selector)
+    if fingerprint is None:
+        raise ElementNotFoundError(f"No form found (selector: {form_selector or 'form'})")
+    return fingerprint
+
+
+# Fingerprint -> {"fields": discovery payload, "values": field id -> planned value}
+class SchemaCache(ValueCache):
+    def __init__(
+        self,
+        max_entries: int = SCHEMA_CACHE_SIZE,
+        ttl: float = SCHEMA_CACHE_TTL,
+        path: Optional[str] = SCHEMA_CACHE_PATH,
+        table: str = "form_schemas",
+    ):
+        super().__init__(max_entries=max_entries, ttl=ttl, path=path or None, table=table)
+
+    def get_schema(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        return self.get(fingerprint)
+
+    def set_schema(self, fingerprint: str, fields: List[dict], values: Optional[Dict[str, Any]] = None):
+        self.set(fingerprint, {"fields": fields, "values": values or {}})
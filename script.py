@@ -1,287 +1,565 @@
-import random
-import string
-import time
-from typing import List, Optional
+import logging
+import os
+import uuid
+from collections import deque
+from typing import Annotated, Any, Dict, List, Optional, TypedDict, Union
 from pydantic import BaseModel, Field as PydanticField
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from langgraph.graph import StateGraph, END
+from browser_profile import create_driver
+from dom_extract import extract_fields
+from dom_fill import bulk_fill
+from dom_watch import CHANGE_FEED_ENABLED, DomChangeFeed
+from driver_backend import DriverBackend, SeleniumBackend
+from observability import FormTimings, configure_logging
+from result_store import ResultStore
+from schema_cache import form_fingerprint
+from value_generator import VALUE_SEED, ValueGenerator
+from waits import FormWaiter
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+
+logger = logging.getLogger(__name__)
+
+# How main() fills the form: the compiled LangGraph ("graph") or the one-field loop ("loop")
+FILL_MODE = os.getenv("FORM_FILL_MODE", "graph")
+# Fill batches before the graph stops and submits what it has
+GRAPH_MAX_BATCHES = int(os.getenv("FORM_GRAPH_MAX_BATCHES", "50"))
+# Failed fills per field before it is left unfilled
+GRAPH_FILL_ATTEMPTS = int(os.getenv("FORM_GRAPH_FILL_ATTEMPTS", "2"))
+# Times main() reopens the page and resumes a failed form from its checkpoint
+GRAPH_RESUME_ATTEMPTS = int(os.getenv("FORM_GRAPH_RESUME_ATTEMPTS", "1"))
+# Controls whose value can show, hide or replace other fields
+REVEALING_TYPES = {"checkbox", "radio", "select", "multiselect"}
 
 # Define the Field model
 class Field(BaseModel):
     id: str
     label: str
     type: str
+    name: Optional[str] = None
+    tag: Optional[str] = None
+    options: Optional[List[str]] = None
+    required: bool = False
+    pattern: Optional[str] = None
+    min: Optional[str] = None
+    max: Optional[str] = None
+    maxlength: Optional[int] = None
+    visible: bool = True
     filled: bool = False
-    value: Optional[str] = None
+    value: Optional[Union[str, bool, List[str]]] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-# Define the FormState model
-class FormState(BaseModel):
+# Mutable form state shared by the loop steps. Steps update it in place; an id -> field
+# index and a queue of unfilled ids keep lookups and "next field" O(1) instead of
+# rebuilding the field list on every step.
+class FormState:
+    def __init__(self, url: str, max_iterations: int = 30):
+        self.url = url
+        self.fields: List[Field] = []
+        self.current_field_id: Optional[str] = None
+        self.initial_fields_fetched = False
+        self.submission_attempted = False
+        self.iteration_count = 0
+        self.max_iterations = max_iterations  # Safety limit
+        self.value_generator = ValueGenerator(VALUE_SEED)  # One seeded generator per form
+        self._index = {}
+        self._unfilled = deque()
+        self._unfilled_count = 0
+
+    def add_fields(self, fields: List[Field]) -> List[Field]:
+        added = [field for field in fields if field.id not in self._index]
+        for field in added:
+            self._index[field.id] = field
+            self.fields.append(field)
+            if not field.filled:
+                self._unfilled.append(field.id)
+                self._unfilled_count += 1
+        return added
+
+    # Refresh a known field from a discovery payload, keeping its value and filled flag
+    def update_field(self, item: dict):
+        field = self._index[item["id"]]
+        refreshed = Field(**item)
+        for name in item:
+            setattr(field, name, getattr(refreshed, name))
+
+    def remove_fields(self, field_ids: List[str]):
+        removed = {field_id for field_id in field_ids if field_id in self._index}
+        if not removed:
+            return
+        for field_id in removed:
+            if not self._index.pop(field_id).filled:
+                self._unfilled_count -= 1
+        self.fields = [field for field in self.fields if field.id not in removed]
+
+    def get(self, field_id: str) -> Optional[Field]:
+        return self._index.get(field_id)
+
+    def __contains__(self, field_id: str) -> bool:
+        return field_id in self._index
+
+    @property
+    def current_field(self) -> Optional[Field]:
+        return self._index.get(self.current_field_id)
+
+    @property
+    def unfilled_count(self) -> int:
+        return self._unfilled_count
+
+    # First unfilled field in discovery order; filled ids are dropped from the queue lazily
+    def next_unfilled(self) -> Optional[Field]:
+        while self._unfilled and (self._unfilled[0] not in self._index or self._index[self._unfilled[0]].filled):
+            self._unfilled.popleft()
+        return self._index[self._unfilled[0]] if self._unfilled else None
+
+    def mark_filled(self, field: Field):
+        if not field.filled:
+            field.filled = True
+            self._unfilled_count -= 1
+
+    # Validated copy for anything leaving the loop (APIs, logs, persistence)
+    def snapshot(self) -> "FormSnapshot":
+        return FormSnapshot(
+            url=self.url,
+            fields=[field.dict() for field in self.fields],
+            current_field_id=self.current_field_id,
+            initial_fields_fetched=self.initial_fields_fetched,
+            submission_attempted=self.submission_attempted,
+            iteration_count=self.iteration_count,
+            max_iterations=self.max_iterations,
+        )
+
+class FormSnapshot(BaseModel):
     url: str
     fields: List[Field] = PydanticField(default_factory=list)
     current_field_id: Optional[str] = None
     initial_fields_fetched: bool = False
     submission_attempted: bool = False
     iteration_count: int = 0
-    max_iterations: int = 30  # Safety limit
+    max_iterations: int = 30
 
 # FormAgent class to interact with the form
 class FormAgent:
-    def __init__(self, url: str):
+    def __init__(self, url: str, driver=None, change_feed: bool = CHANGE_FEED_ENABLED):
         self.url = url
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-        self.driver.get(url)
-        time.sleep(2)
-        print(f"Successfully loaded URL: {url}")
-
-    def get_label_text(self, element):
-        try:
-            label = self.driver.find_element(By.XPATH, f"//label[@for='{element.get_attribute('id')}']")
-            return label.text.strip() or element.get_attribute("name") or "Unknown"
-        except:
-            return element.get_attribute("name") or "Unknown"
+        self.owns_driver = driver is None
+        self.driver = driver if driver is not None else create_driver()
+        # Fills, submit and waits go through the backend; the change feed reads the driver directly
+        self.backend = SeleniumBackend(self.driver, owns_driver=self.owns_driver)
+        # Set when the driver is one tab of a shared browser; the backend refuses commands outside that tab
+        self.window_handle = self.backend.window_handle
+        # Wait for the page and its form to be ready instead of sleeping a fixed time
+        self.waiter = FormWaiter(self.backend)
+        with self.waiter.watching_fields():
+            self.backend.navigate(url)
+            self.waiter.page_ready()
+        # Rediscovery reads only the fields that changed since the last read
+        self.change_feed = DomChangeFeed(self.driver, "#myForm") if change_feed else None
+        # Count the WebDriver commands this form issues from here on
+        self.backend.reset_stats()
+        logger.info("Loaded form page", extra={"url": url})
 
     def close(self):
-        self.driver.quit()
-        print("Browser closed successfully")
+        self.backend.close()
+        if self.owns_driver:
+            logger.info("Browser closed")
 
 # Function to get form fields
 def get_form_fields(state: FormState, agent: FormAgent) -> FormState:
     try:
-        # Try to find the form in multiple ways
-        try:
-            form = agent.driver.find_element(By.ID, "myForm")
-        except:
-            print("Form with ID 'myForm' not found, trying first form")
-            form = agent.driver.find_element(By.TAG_NAME, "form")
-            
-        elements = form.find_elements(By.XPATH, ".//input | .//select | .//textarea")
-        current_field_ids = {field.id for field in state.fields}
-        new_fields = []
-
-        for element in elements:
-            field_id = element.get_attribute("id")
-            if not field_id or field_id in current_field_ids:
-                continue
-            field_type = element.get_attribute("type") or element.tag_name
-            label = agent.get_label_text(element)
-            new_fields.append(Field(id=field_id, label=label, type=field_type))
-
-        updated_fields = state.fields + new_fields
-        print(f"Found {len(updated_fields)} fields: {[f.label for f in updated_fields]}")
-        return FormState(
-            url=state.url,
-            fields=updated_fields,
-            initial_fields_fetched=True,
-            current_field_id=state.current_field_id,
-            submission_attempted=state.submission_attempted,
-            iteration_count=state.iteration_count + 1,  # Increment iteration counter
-            max_iterations=state.max_iterations
-        )
+        changes = None
+        if agent.change_feed is not None and state.initial_fields_fetched:
+            changes = agent.change_feed.changes()
+        if changes is not None:
+            payload, removed = changes
+            state.remove_fields(removed)
+            for field_id in removed:
+                agent.backend.forget_field(field_id)
+            for item in payload:
+                if item["id"] in state:
+                    state.update_field(item)
+        elif agent.change_feed is not None:
+            # First pass, or the observer was lost (navigation, form re-rendered): full scan and re-arm
+            payload = agent.change_feed.start()
+        else:
+            # Read every field of #myForm (or the first form) in one script call
+            payload = extract_fields(agent.driver, "#myForm")
+        # Only fields not seen before are validated into models
+        new_items = [item for item in payload if item["id"] not in state]
+        new_fields = state.add_fields([Field(**item) for item in new_items])
+        # Handles for the new fields in one call, so fills skip find_element
+        agent.backend.prime_fields(new_items)
+        state.initial_fields_fetched = True
+        state.iteration_count += 1  # Increment iteration counter
+        logger.debug("Found fields", extra={"count": len(state.fields), "new": [f.id for f in new_fields]})
+        return state
     except Exception as e:
-        print(f"Error in get_form_fields: {e}")
+        logger.error("Field discovery failed", extra={"error": str(e)})
         return state
 
 # Function to check if there are new or unfilled fields
 def has_new_or_unfilled_fields(state: FormState) -> bool:
     # Check if max iterations reached
     if state.iteration_count >= state.max_iterations:
-        print(f"Max iterations ({state.max_iterations}) reached")
+        logger.warning("Max iterations reached", extra={"max_iterations": state.max_iterations})
         return False
     
-    unfilled_fields = [field for field in state.fields if not field.filled]
-    result = len(unfilled_fields) > 0 and not state.submission_attempted
-    print(f"Checking unfilled: {len(unfilled_fields)} fields remain, submission_attempted: {state.submission_attempted}")
+    result = state.unfilled_count > 0 and not state.submission_attempted
+    logger.debug("Checked unfilled fields", extra={"unfilled": state.unfilled_count, "submission_attempted": state.submission_attempted})
     return result
 
 # Function to find an unfilled field
 def find_unfilled_field(state: FormState) -> FormState:
-    unfilled_fields = [field for field in state.fields if not field.filled]
-    if not unfilled_fields:
-        print("No unfilled fields found")
+    field = state.next_unfilled()
+    if field is None:
+        logger.debug("No unfilled fields found")
         return state
     
-    field = unfilled_fields[0]
-    print(f"Selected field to fill: {field.label}")
-    return FormState(
-        url=state.url,
-        fields=state.fields,
-        current_field_id=field.id,
-        initial_fields_fetched=state.initial_fields_fetched,
-        submission_attempted=state.submission_attempted,
-        iteration_count=state.iteration_count,
-        max_iterations=state.max_iterations
-    )
-
-# Function to generate input for a field
+    state.current_field_id = field.id
+    logger.debug("Selected field to fill", extra={"field": field.id})
+    return state
+
+# Function to generate input for a field. Values come from the discovered schema, never the
+# DOM; every field still waiting for one is generated in the same pass as the current field.
 def generate_input_for_field(state: FormState, agent: FormAgent) -> FormState:
-    fields = state.fields.copy()
-    current_field = next(field for field in fields if field.id == state.current_field_id)
-    
-    value_generators = {
-        "text": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
-        "email": lambda: f"{''.join(random.choices(string.ascii_lowercase, k=5))}@example.com",
-        "password": lambda: ''.join(random.choices(string.ascii_letters + string.digits, k=10)),
-        "number": lambda: str(random.randint(1, 100)),
-        "tel": lambda: f"{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-        "url": lambda: f"https://{''.join(random.choices(string.ascii_lowercase, k=5))}.com",
-        "date": lambda: "2023-10-15",  # Example date
-        "time": lambda: "12:34",  # Example time
-        "datetime-local": lambda: "2023-10-15T12:34",  # Example datetime
-        "month": lambda: "2023-10",  # Example month
-        "week": lambda: "2023-W42",  # Example week
-        "color": lambda: "#{:06x}".format(random.randint(0, 0xFFFFFF)),  # Random color
-        "range": lambda: str(random.randint(0, 100)),  # Random range value
-        "file": lambda: "path/to/file.txt",  # Example file path
-        "search": lambda: ''.join(random.choices(string.ascii_letters, k=8)),
-        "checkbox": lambda: random.choice([True, False]),
-        "radio": lambda: random.choice(["option1", "option2", "option3"]),
-        "select": lambda: random.choice([opt.text for opt in Select(agent.driver.find_element(By.ID, current_field.id)).options if opt.text]) or "Credit Card",
-        "textarea": lambda: ' '.join(''.join(random.choices(string.ascii_letters, k=5)) for _ in range(3)),
-        "multiselect": lambda: random.sample([opt.text for opt in Select(agent.driver.find_element(By.ID, current_field.id)).options if opt.text], 2)  # Randomly select 2 options
-    }
-    
-    current_field.value = value_generators.get(current_field.type, lambda: "default")()
-    fields = [f if f.id != current_field.id else current_field for f in fields]
-    print(f"Generated value for {current_field.label}: {current_field.value}")
-    
-    return FormState(
-        url=state.url,
-        fields=fields,
-        current_field_id=state.current_field_id,
-        initial_fields_fetched=state.initial_fields_fetched,
-        submission_attempted=state.submission_attempted,
-        iteration_count=state.iteration_count,
-        max_iterations=state.max_iterations
-    )
+    current_field = state.current_field
+    if current_field.value is None:
+        pending = [field for field in state.fields if field.value is None and not field.filled]
+        for field_id, value in state.value_generator.generate(pending).items():
+            state.get(field_id).value = value
+    logger.debug("Generated value", extra={"field": current_field.id, "value": current_field.value})
+    return state
+
+# Set one control through the backend (for radios, the group's radio with the chosen value)
+def set_control(field: Field, backend: DriverBackend):
+    if field.type in ["text", "email", "password", "textarea", "tel", "number", "url", "search"]:
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "select":
+        backend.select_options(field.id, [field.value])
+    elif field.type == "multiselect":
+        backend.select_options(field.id, field.value)
+    elif field.type == "checkbox":
+        backend.set_checked(field.id, bool(field.value))
+    elif field.type == "radio":
+        backend.choose_radio(field.name, str(field.value))
+    elif field.type in ["date", "time", "datetime-local", "month", "week"]:
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "color":
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "range":
+        backend.type_text(field.id, str(field.value))
+    elif field.type == "file":
+        backend.set_files(field.id, [field.value])
+
+# Set one control through WebDriver, from the cached handle (a stale one is resolved again once);
+# raises when it can't be found or set
+def fill_control(field: Field, agent: FormAgent):
+    set_control(field, agent.backend)
 
 # Function to fill a field
 def fill_field(state: FormState, agent: FormAgent) -> FormState:
-    fields = state.fields.copy()
-    current_field = next(field for field in fields if field.id == state.current_field_id)
+    current_field = state.current_field
     
     try:
-        element = agent.driver.find_element(By.ID, current_field.id)
-        if current_field.type in ["text", "email", "password", "textarea", "tel", "number", "url", "search"]:
-            element.clear()
-            element.send_keys(current_field.value)
-        elif current_field.type == "select":
-            Select(element).select_by_visible_text(current_field.value)
-        elif current_field.type == "multiselect":
-            select = Select(element)
-            select.deselect_all()
-            for value in current_field.value:
-                select.select_by_visible_text(value)
-        elif current_field.type == "checkbox":
-            if element.is_selected() != current_field.value:
-                element.click()
-        elif current_field.type == "radio":
-            agent.driver.find_element(By.XPATH, f"//input[@type='radio' and @value='{current_field.value}']").click()
-        elif current_field.type in ["date", "time", "datetime-local", "month", "week"]:
-            element.clear()
-            element.send_keys(current_field.value)
-        elif current_field.type == "color":
-            element.clear()
-            element.send_keys(current_field.value)
-        elif current_field.type == "range":
-            element.clear()
-            element.send_keys(current_field.value)
-        elif current_field.type == "file":
-            element.send_keys(current_field.value)
-        
-        current_field.filled = True
-        fields = [f if f.id != current_field.id else current_field for f in fields]
-        print(f"Filled {current_field.label} with {current_field.value}")
-        return FormState(
-            url=state.url,
-            fields=fields,
-            current_field_id=state.current_field_id,
-            initial_fields_fetched=state.initial_fields_fetched,
-            submission_attempted=state.submission_attempted,
-            iteration_count=state.iteration_count,
-            max_iterations=state.max_iterations
-        )
+        fill_control(current_field, agent)
+        state.mark_filled(current_field)
+        logger.debug("Filled field", extra={"field": current_field.id, "value": current_field.value})
+        return state
     except Exception as e:
-        print(f"Error filling field {current_field.label}: {e}")
+        agent.backend.note_exception(e)
+        logger.warning("Filling field failed", extra={"field": current_field.id, "error": str(e)})
         return state
 
+# Click the form's submit button and wait for the outcome; None if submission failed.
+# #myForm (or the first form) and its submit controls come from one script call.
+def click_submit(agent: FormAgent) -> Optional[str]:
+    try:
+        agent.backend.click_submit("#myForm", before_click=agent.waiter.arm_submit)
+        outcome = agent.waiter.submit_outcome()
+        logger.info("Form submitted", extra={"outcome": outcome})
+        return outcome
+    except Exception as e:
+        agent.backend.note_exception(e)
+        logger.error("Form submission failed", extra={"error": str(e)})
+        return None
+
 # Function to submit the form
 def submit_form(state: FormState, agent: FormAgent) -> FormState:
-    try:
+    click_submit(agent)
+    state.submission_attempted = True  # Marked as attempted even if it failed
+    return state
+
+# Discover, fill one field at a time and submit
+def run_fill_loop(agent: FormAgent, timings: Optional[FormTimings] = None, max_iterations: int = 30) -> FormState:
+    timings = timings or FormTimings()
+    state = FormState(url=agent.url, max_iterations=max_iterations)
+    while True:
+        with timings.span("discovery"):
+            state = get_form_fields(state, agent)
+        if not has_new_or_unfilled_fields(state):
+            with timings.span("submit"):
+                state = submit_form(state, agent)
+            break
+        state = find_unfilled_field(state)
+        with timings.span("generation"):
+            state = generate_input_for_field(state, agent)
+        with timings.span("fill"), timings.field(state.current_field.id, state.current_field.type):
+            state = fill_field(state, agent)
+        if state.iteration_count >= state.max_iterations:
+            logger.warning("Stopping fill loop", extra={"iterations": state.iteration_count})
+            break
+    return state
+
+# Graph mode: the loop's steps as a compiled LangGraph. Values for every unfilled field are
+# generated as parallel branches, fields are filled in batches, and the form is rediscovered
+# only after a batch that can reveal fields. Field data lives in the graph state, so every
+# step is checkpointed and a failed form resumes from its last completed step.
+
+# Entries by id; an entry updated to None is removed
+def merge_by_id(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(current)
+    for key, value in update.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = value
+    return merged
+
+class FillGraphState(TypedDict):
+    url: str
+    fields: Annotated[Dict[str, dict], merge_by_id]  # Field dicts in discovery order
+    attempts: Annotated[Dict[str, int], merge_by_id]  # Failed fills per field
+    batch: List[str]
+    batches: int
+    discoveries: int
+    submitted: bool
+    submit_outcome: Optional[str]
+
+# The browser and timings are passed per run, outside the checkpointed state
+def _graph_context(config: RunnableConfig):
+    configurable = config["configurable"]
+    return configurable["agent"], configurable["timings"]
+
+def discover_node(state: FillGraphState, config: RunnableConfig) -> dict:
+    agent, timings = _graph_context(config)
+    known = state["fields"]
+    with timings.span("discovery"):
+        changes = agent.change_feed.changes() if agent.change_feed is not None and known else None
+        if changes is not None:
+            payload, removed = changes
+        else:
+            # First pass, a fresh page after resuming, or the observer was lost: full scan
+            payload = agent.change_feed.start() if agent.change_feed is not None else extract_fields(agent.driver, "#myForm")
+            seen = {item["id"] for item in payload}
+            removed = [field_id for field_id in known if field_id not in seen]
+    update = {field_id: None for field_id in removed}
+    for item in payload:
+        # Known fields keep their value and filled flag; only new ones are validated
+        update[item["id"]] = {**known[item["id"]], **item} if item["id"] in known else Field(**item).dict()
+    # Handles for new fields in one call, so fills skip find_element
+    for field_id in removed:
+        agent.backend.forget_field(field_id)
+    agent.backend.prime_fields(update[item["id"]] for item in payload if item["id"] not in known)
+    logger.debug("Discovered fields", extra={"changed": len(payload), "removed": len(removed)})
+    return {"fields": update, "discoveries": state["discoveries"] + 1}
+
+# Next batch: every visible unfilled field that can't reveal others, else the revealing ones
+def plan_node(state: FillGraphState, config: RunnableConfig) -> dict:
+    if state["batches"] >= config["configurable"]["max_batches"]:
+        logger.warning("Max fill batches reached", extra={"batches": state["batches"]})
+        return {"batch": []}
+    candidates = [
+        field for field in state["fields"].values()
+        if not field["filled"] and field["visible"] and state["attempts"].get(field["id"], 0) < GRAPH_FILL_ATTEMPTS
+    ]
+    independent = [field["id"] for field in candidates if field["type"] not in REVEALING_TYPES]
+    return {"batch": independent or [field["id"] for field in candidates]}
+
+# Fan out one generation branch per field still without a value (radios of a group together)
+def route_plan(state: FillGraphState):
+    if not state["batch"]:
+        return "submit"
+    units: Dict[str, List[dict]] = {}
+    for field_id in state["batch"]:
+        field = state["fields"][field_id]
+        if field["value"] is None:
+            key = f"radio:{field['name']}" if field["type"] == "radio" and field["name"] else field_id
+            units.setdefault(key, []).append(field)
+    if not units:
+        return "fill"
+    return [Send("generate", {"key": key, "fields": fields}) for key, fields in units.items()]
+
+# Each branch seeds its own generator from the field, so seeded values don't depend on branch order
+def generate_node(task: dict, config: RunnableConfig) -> dict:
+    _, timings = _graph_context(config)
+    with timings.span("generation"):
+        seed = None if VALUE_SEED is None else f"{VALUE_SEED}:{task['key']}"
+        values = ValueGenerator(seed).generate(task["fields"])
+    return {"fields": {field["id"]: {**field, "value": values[field["id"]]} for field in task["fields"]}}
+
+# One bulk script call for the batch, WebDriver calls only for what the script couldn't set
+def fill_node(state: FillGraphState, config: RunnableConfig) -> dict:
+    agent, timings = _graph_context(config)
+    fields = [Field(**state["fields"][field_id]) for field_id in state["batch"] if field_id in state["fields"]]
+    failed = set()
+    with timings.span("fill"):
         try:
-            form = agent.driver.find_element(By.ID, "myForm")
-        except:
-            print("Form with ID 'myForm' not found for submission, trying first form")
-            form = agent.driver.find_element(By.TAG_NAME, "form")
-            
+            fallback_ids = set(bulk_fill(agent.backend, fields))
+        except Exception as e:
+            logger.warning("Bulk fill failed, filling field by field", extra={"error": str(e)})
+            fallback_ids = {field.id for field in fields}
+        for field in fields:
+            if field.id not in fallback_ids:
+                continue
+            try:
+                with timings.field(field.id, field.type):
+                    fill_control(field, agent)
+            except Exception as e:
+                failed.add(field.id)
+                agent.backend.note_exception(e)
+                logger.warning("Filling field failed", extra={"field": field.id, "error": str(e)})
+    logger.debug("Filled batch", extra={"size": len(fields), "fallback": len(fallback_ids), "failed": len(failed)})
+    return {
+        "fields": {field.id: {**state["fields"][field.id], "filled": field.id not in failed} for field in fields},
+        "attempts": {field_id: state["attempts"].get(field_id, 0) + 1 for field_id in failed},
+        "batches": state["batches"] + 1,
+    }
+
+def route_fill(state: FillGraphState) -> str:
+    revealing = any(state["fields"][field_id]["type"] in REVEALING_TYPES for field_id in state["batch"] if field_id in state["fields"])
+    return "discover" if revealing else "plan"
+
+def submit_node(state: FillGraphState, config: RunnableConfig) -> dict:
+    agent, timings = _graph_context(config)
+    with timings.span("submit"):
+        outcome = click_submit(agent)
+    return {"submitted": True, "submit_outcome": outcome}
+
+def build_fill_graph():
+    graph = StateGraph(FillGraphState)
+    graph.add_node("discover", discover_node)
+    graph.add_node("plan", plan_node)
+    graph.add_node("generate", generate_node)
+    graph.add_node("fill", fill_node)
+    graph.add_node("submit", submit_node)
+    graph.add_edge(START, "discover")
+    graph.add_edge("discover", "plan")
+    graph.add_conditional_edges("plan", route_plan, ["generate", "fill", "submit"])
+    graph.add_edge("generate", "fill")
+    graph.add_conditional_edges("fill", route_fill, ["discover", "plan"])
+    graph.add_edge("submit", END)
+    return graph
+
+# Checkpoints are kept per thread (one per form run) until the form completes
+checkpointer = MemorySaver()
+fill_graph = build_fill_graph().compile(checkpointer=checkpointer)
+
+# A resumed run starts on a fresh page: put back what was already filled, in one script call
+def restore_filled(values: dict, agent: FormAgent):
+    fields = [Field(**field) for field in values["fields"].values() if field["filled"]]
+    if not fields:
+        return
+    for field_id in set(bulk_fill(agent.backend, fields)):
         try:
-            submit_button = form.find_element(By.XPATH, ".//button[@type='submit']")
-        except:
-            print("Submit button not found, trying input type submit")
-            submit_button = form.find_element(By.XPATH, ".//input[@type='submit']")
-            
-        submit_button.click()
-        time.sleep(2)
-        print("Form submitted successfully")
-        return FormState(
-            url=state.url,
-            fields=state.fields,
-            current_field_id=state.current_field_id,
-            initial_fields_fetched=state.initial_fields_fetched,
-            submission_attempted=True,
-            iteration_count=state.iteration_count,
-            max_iterations=state.max_iterations
-        )
-    except Exception as e:
-        print(f"Error submitting form: {e}")
-        return FormState(
-            url=state.url,
-            fields=state.fields,
-            current_field_id=state.current_field_id,
-            initial_fields_fetched=state.initial_fields_fetched,
-            submission_attempted=True,  # Mark as attempted even if failed
-            iteration_count=state.iteration_count,
-            max_iterations=state.max_iterations
-        )
+            fill_control(next(field for field in fields if field.id == field_id), agent)
+        except Exception as e:
+            logger.warning("Restoring field failed", extra={"field": field_id, "error": str(e)})
+    logger.info("Restored filled fields", extra={"count": len(fields)})
+
+# Run the compiled graph for one form. Passing the thread_id of a run that failed resumes it
+# from its last checkpoint instead of starting over.
+def run_fill_graph(
+    agent: FormAgent,
+    timings: Optional[FormTimings] = None,
+    thread_id: Optional[str] = None,
+    max_batches: int = GRAPH_MAX_BATCHES,
+) -> FormState:
+    timings = timings or FormTimings()
+    thread_id = thread_id or f"{agent.url}#{uuid.uuid4().hex}"
+    config = {
+        "configurable": {"thread_id": thread_id, "agent": agent, "timings": timings, "max_batches": max_batches},
+        # Each batch takes at most four steps (plan, generate, fill, discover)
+        "recursion_limit": max_batches * 4 + 10,
+    }
+    saved = fill_graph.get_state(config)
+    if saved.next:
+        logger.info("Resuming form from checkpoint", extra={"thread_id": thread_id, "next": list(saved.next)})
+        restore_filled(saved.values, agent)
+        values = fill_graph.invoke(None, config)
+    else:
+        values = fill_graph.invoke({
+            "url": agent.url, "fields": {}, "attempts": {}, "batch": [], "batches": 0, "discoveries": 0,
+            "submitted": False, "submit_outcome": None,
+        }, config)
+    checkpointer.delete_thread(thread_id)
+
+    state = FormState(agent.url, max_iterations=max_batches)
+    state.add_fields([Field(**field) for field in values["fields"].values()])
+    state.iteration_count = values["batches"]
+    state.submission_attempted = values["submitted"]
+    logger.info("Graph run finished", extra={
+        "batches": values["batches"], "discoveries": values["discoveries"], "submit_outcome": values["submit_outcome"],
+    })
+    return state
+
+# Field-fill history of each run (RESULT_STORE_PATH; empty disables it)
+result_store = ResultStore()
 
 # Main function
 def main():
+    configure_logging()
     url = "http://localhost:3000"
+    agent = None
+    thread_id = f"{url}#{uuid.uuid4().hex}"
+    fingerprint = None
     try:
-        agent = FormAgent(url)
-        initial_state = FormState(url=url)
-        
-        # Manual execution
-        state = initial_state
-        while True:
-            state = get_form_fields(state, agent)
-            if not has_new_or_unfilled_fields(state):
-                state = submit_form(state, agent)
-                break
-            state = find_unfilled_field(state)
-            state = generate_input_for_field(state, agent)
-            state = fill_field(state, agent)
-            if state.iteration_count >= state.max_iterations:
-                print(f"Breaking manual execution after {state.iteration_count} iterations")
+        timings = FormTimings()
+        for attempt in range(GRAPH_RESUME_ATTEMPTS + 1):
+            try:
+                with timings.span("navigation"):
+                    agent = FormAgent(url)
+                if fingerprint is None:
+                    # Taken before filling; the layout the run history is grouped by
+                    try:
+                        fingerprint = form_fingerprint(agent.backend)
+                    except Exception as e:
+                        logger.warning("Fingerprint failed", extra={"error": str(e)})
+                if FILL_MODE == "loop":
+                    state = run_fill_loop(agent, timings)
+                else:
+                    state = run_fill_graph(agent, timings, thread_id=thread_id)
                 break
+            except Exception as e:
+                if FILL_MODE == "loop" or attempt == GRAPH_RESUME_ATTEMPTS:
+                    raise
+                logger.warning("Form run failed, resuming from checkpoint", extra={"attempt": attempt + 1, "error": str(e)})
+                if agent is not None:
+                    agent.close()
+                    agent = None
+        timings.finish("success", sum(field.filled for field in state.fields))
+        result_store.record_form(url, fingerprint, state.fields, timings.fields)
         
-        print("Form processing completed!")
-        print("Final state:")
         for field in state.fields:
-            print(f"  {field.label}: {field.value} (filled: {field.filled})")
-        print(f"Submission attempted: {state.submission_attempted}")
-        print(f"Iterations: {state.iteration_count}")
+            logger.info("Final field", extra={"field": field.id, "label": field.label, "value": field.value, "filled": field.filled})
+        logger.info("Form processing completed", extra={
+            "mode": FILL_MODE,
+            "submission_attempted": state.submission_attempted,
+            "iterations": state.iteration_count,
+            "wait_timings": agent.waiter.timings,
+            "driver_stats": agent.backend.stats(),
+            "change_feed": agent.change_feed.stats() if agent.change_feed is not None else None,
+            "timings": timings.as_dict(),
+        })
         
     except Exception as e:
-        print(f"Main execution error: {e}")
+        logger.exception("Main execution failed", extra={"error": str(e)})
     finally:
-        agent.close()
+        if agent is not None:
+            agent.close()
+        result_store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
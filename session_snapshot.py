@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import time
+from typing import Optional, Sequence
+from urllib.parse import urlsplit
+from value_cache import ValueCache
+from waits import POLL_FREQUENCY
+
+logger = logging.getLogger(__name__)
+
+# Snapshot store configuration (overridable through the environment). Snapshots stay in memory
+# unless SESSION_SNAPSHOT_PATH names a file; they hold session cookies, so such a file is as
+# sensitive as a logged-in browser profile.
+SESSION_SNAPSHOT_SIZE = int(os.getenv("SESSION_SNAPSHOT_SIZE", "256"))
+SESSION_SNAPSHOT_TTL = float(os.getenv("SESSION_SNAPSHOT_TTL", "3600"))
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH")  # Optional SQLite file shared by worker processes
+# Seconds each warm-up click waits for its element
+WARMUP_STEP_TIMEOUT = float(os.getenv("SESSION_WARMUP_STEP_TIMEOUT", "10"))
+
+# Cookie attributes Network.setCookies accepts back from Network.getCookies
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+CAPTURE_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    try {
+        for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    } catch (e) {}
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Runs before the page's own scripts in every new document; writes only on the snapshot's origin
+RESTORE_STORAGE_SCRIPT = """
+(function (origin, local, session) {
+    if (location.origin !== origin) { return; }
+    function load(storage, items) {
+        try { Object.keys(items).forEach(function (key) { storage.setItem(key, items[key]); }); } catch (e) {}
+    }
+    load(window.localStorage, local);
+    load(window.sessionStorage, session);
+})(%s, %s, %s);
+"""
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _live_cookies(cookies: list, now: float) -> list:
+    return [c for c in cookies if c.get("expires", -1) <= 0 or c["expires"] > now]
+
+
+# Origin -> {"requested_url", "url", "warmup", "cookies", "local", "session", "bootstrap_seconds", "captured_at"}
+class SessionSnapshotStore(ValueCache):
+    def __init__(
+        self,
+        max_entries: int = SESSION_SNAPSHOT_SIZE,
+        ttl: float = SESSION_SNAPSHOT_TTL,
+        path: Optional[str] = SESSION_SNAPSHOT_PATH,
+        table: str = "session_snapshots",
+    ):
+        super().__init__(max_entries=max_entries, ttl=ttl, path=path or None, table=table)
+
+    # A snapshot only stands in for the same warm-up, and not once one of its cookies has expired
+    def get_snapshot(self, origin: str, warmup: Sequence[str] = ()) -> Optional[dict]:
+        snapshot = self.get(origin)
+        if snapshot is None or snapshot["warmup"] != list(warmup):
+            return None
+        if len(_live_cookies(snapshot["cookies"], time.time())) < len(snapshot["cookies"]):
+            return None
+        return snapshot
+
+    def set_snapshot(self, origin: str, snapshot: dict):
+        self.set(origin, snapshot)
+
+
+# Click each warm-up selector in turn (consent banners, login or "next step" buttons), retrying
+# each until its element is there and takes the click
+def run_warmup(backend, warmup: Sequence[str], timeout: float = WARMUP_STEP_TIMEOUT):
+    for selector in warmup:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                backend.click(selector)
+                break
+            except Exception as e:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Warm-up step {selector} not clickable within {timeout:.0f}s") from e
+                time.sleep(POLL_FREQUENCY)
+
+
+# `requested_url` is the URL the run was asked to open, `url` the one the warm-up ended on
+def capture_snapshot(backend, requested_url: str, warmup: Sequence[str], bootstrap_seconds: float) -> dict:
+    url = backend.current_url()
+    cookies = backend.cdp("Network.getCookies", {"urls": [url]})["cookies"]
+    storage = backend.evaluate(CAPTURE_STORAGE_SCRIPT)
+    return {
+        "requested_url": requested_url,
+        "url": url,
+        "warmup": list(warmup),
+        "cookies": [{key: cookie[key] for key in COOKIE_FIELDS if key in cookie} for cookie in cookies],
+        "local": storage["local"],
+        "session": storage["session"],
+        "bootstrap_seconds": bootstrap_seconds,
+        "captured_at": time.time(),
+    }
+
+
+# Cookies go in through CDP and storage through a new-document script, both before navigating,
+# so the page's first load already sees the session. The post-warm-up URL is only opened for the
+# URL the snapshot was captured from; another form on the origin opens its own URL in the
+# restored session.
+def restore_snapshot(backend, snapshot: dict, url: str):
+    cookies = [
+        {key: value for key, value in cookie.items() if not (key == "expires" and value <= 0)}
+        for cookie in _live_cookies(snapshot["cookies"], time.time())
+    ]
+    if cookies:
+        backend.cdp("Network.setCookies", {"cookies": cookies})
+    script_id = None
+    if snapshot["local"] or snapshot["session"]:
+        source = RESTORE_STORAGE_SCRIPT % (
+            json.dumps(origin_of(snapshot["url"])), json.dumps(snapshot["local"]), json.dumps(snapshot["session"])
+        )
+        script_id = backend.cdp("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+    target = snapshot["url"] if snapshot.get("requested_url") == url else url
+    try:
+        backend.navigate(target)
+    finally:
+        # Pooled sessions are reused for other forms; the script must not outlive this one
+        if script_id is not None:
+            backend.cdp("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+
+
+# Bring the session to the form-ready state. With a stored snapshot for the origin the page
+# opens in the restored session (at the post-warm-up URL when it was captured for this URL);
+# otherwise it loads the URL, runs the warm-up steps and stores a snapshot. Returns what
+# happened and the bootstrap time saved.
+def open_form(backend, waiter, url: str, store: Optional[SessionSnapshotStore], warmup: Sequence[str] = ()) -> dict:
+    origin = origin_of(url)
+    snapshot = store.get_snapshot(origin, warmup) if store is not None else None
+    if snapshot is not None:
+        started = time.perf_counter()
+        try:
+            restore_snapshot(backend, snapshot, url)
+            if waiter.page_ready():
+                seconds = time.perf_counter() - started
+                return {
+                    "restored": True,
+                    "captured": False,
+                    "bootstrap_seconds": round(seconds, 4),
+                    "saved_seconds": round(max(0.0, snapshot["bootstrap_seconds"] - seconds), 4),
+                }
+            logger.warning("Restored session did not reach the form, bootstrapping", extra={"origin": origin})
+        except Exception as e:
+            logger.warning("Snapshot restore failed, bootstrapping", extra={"origin": origin, "error": str(e)})
+
+    started = time.perf_counter()
+    backend.navigate(url)
+    run_warmup(backend, warmup)
+    waiter.page_ready()
+    seconds = time.perf_counter() - started
+    captured = False
+    if store is not None:
+        try:
+            store.set_snapshot(origin, capture_snapshot(backend, url, warmup, seconds))
+            captured = True
+        except Exception as e:
+            logger.warning("Snapshot capture failed", extra={"origin": origin, "error": str(e)})
+    return {"restored": False, "captured": captured, "bootstrap_seconds": round(seconds, 4), "saved_seconds": 0.0}
@@ -0,0 +1,142 @@
+# BrowserPool checkout, reset, recycling, health checks and the size limit, on stand-in
+# WebDriver sessions (no browser needed).
+# Run from the repository root: python -m pytest tests
+import threading
+import pytest
+from selenium.common.exceptions import NoAlertPresentException
+from browser_pool import CLEAR_STORAGE_SCRIPT, BrowserPool, PoolExhaustedError
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @property
+    def alert(self):
+        raise NoAlertPresentException()
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+# The WebDriver calls BrowserPool makes: a health-check script, the reset steps and quit.
+# No execute_cdp_cmd, so reset takes the non-Chromium path.
+class FakeDriver:
+    def __init__(self, name: str):
+        self.name = name
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.url = "about:blank"
+        self.cookies = {}
+        self.scripts = []
+        self.alive = True
+        self.quit_calls = 0
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise ConnectionRefusedError("chromedriver is gone")  # What a dead driver raises: not a WebDriverException
+        self.scripts.append(script)
+        return 1
+
+    def get(self, url):
+        self.url = url
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class DriverFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        driver = FakeDriver(f"driver-{len(self.drivers)}")
+        self.drivers.append(driver)
+        return driver
+
+
+def make_pool(size: int = 2, **kwargs):
+    factory = DriverFactory()
+    return BrowserPool(size=size, driver_factory=factory, **kwargs), factory
+
+
+def test_sessions_are_reused_and_reset():
+    pool, factory = make_pool(size=1)
+    pool.start()
+
+    with pool.session() as driver:
+        driver.get("https://example.test/form")
+        driver.cookies["session"] = "1"
+        driver.window_handles.append("popup")
+    assert driver.url == "about:blank"
+    assert driver.cookies == {}
+    assert driver.window_handles == ["main"]
+    assert CLEAR_STORAGE_SCRIPT in driver.scripts
+
+    with pool.session() as again:
+        assert again is driver
+    assert len(factory.drivers) == 1
+    stats = pool.stats()
+    assert stats["created"] == 1 and stats["checkouts"] == 2 and stats["idle"] == 1
+    pool.close()
+    assert driver.quit_calls == 1 and pool.stats()["live"] == 0
+
+
+def test_acquire_waits_then_fails_at_the_limit():
+    pool, factory = make_pool(size=2, acquire_timeout=0.1)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+    assert pool.stats()["acquire_timeouts"] == 1
+
+    # A release wakes a waiting acquire
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    assert pool.acquire(timeout=2).driver is first.driver
+    assert len(factory.drivers) == 2
+    pool.release(second)
+    pool.close()
+
+
+def test_sessions_are_recycled_after_max_uses():
+    pool, factory = make_pool(size=1, max_uses=2)
+    for _ in range(2):
+        pool.release(pool.acquire())
+    recycled = factory.drivers[0]
+    assert recycled.quit_calls == 1
+    assert pool.stats()["recycled"] == 1
+
+    session = pool.acquire(timeout=2)
+    assert session.driver is not recycled
+    pool.release(session)
+    pool.close()
+
+
+def test_a_dead_session_is_discarded_and_replaced():
+    pool, factory = make_pool(size=1)
+    pool.start()
+    factory.drivers[0].alive = False
+
+    session = pool.acquire(timeout=1)
+    assert session.driver is factory.drivers[1]
+    stats = pool.stats()
+    assert stats["unhealthy"] == 1
+    assert stats["live"] == 1  # The dead session's slot went to its replacement, not leaked
+    pool.release(session)
+    pool.close()
+
+
+def test_a_failed_start_frees_its_slot():
+    def no_browser():
+        raise RuntimeError("Chrome failed to start")
+
+    pool = BrowserPool(size=1, driver_factory=no_browser)
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire(timeout=0.1)
+    assert pool.stats()["live"] == 0
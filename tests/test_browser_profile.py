@@ -0,0 +1,26 @@
+# RequestFilter: blocked resource types always fail, other sites' requests only when third-party
+# blocking is turned on, and subdomains under a country second level count as one site.
+# Run from the repository root: python -m pytest tests
+from browser_profile import BrowserProfile, RequestFilter
+
+
+def paused(url: str, resource_type: str = "Script", frame: str = "frame-1") -> dict:
+    return {"requestId": "1", "request": {"url": url}, "resourceType": resource_type, "frameId": frame}
+
+
+def test_third_party_blocking_is_opt_in():
+    assert BrowserProfile().block_third_party is False
+    request_filter = RequestFilter(["Image"], block_third_party=False, main_frame="frame-1")
+    assert not request_filter.blocked(paused("https://www.example.com/form", "Document"))
+    assert not request_filter.blocked(paused("https://cdn.other.net/app.js"))
+    assert request_filter.blocked(paused("https://www.example.com/logo.png", "Image"))
+    assert request_filter.patterns() == [{"urlPattern": "*", "resourceType": "Image"}]
+
+
+def test_sites_under_country_second_levels():
+    request_filter = RequestFilter([], block_third_party=True, main_frame="frame-1")
+    assert not request_filter.blocked(paused("https://www.example.co.uk/form", "Document"))
+    assert not request_filter.blocked(paused("https://static.example.co.uk/app.js"))
+    assert request_filter.blocked(paused("https://www.other.co.uk/tracker.js"))
+    assert request_filter.blocked(paused("https://tracker.net/t.js"))
+    assert request_filter.counters == {"blocked": 2, "allowed": 2}
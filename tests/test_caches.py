@@ -0,0 +1,61 @@
+# ValueCache (generated values) and SchemaCache (discovered forms): hits, misses, TTL expiry,
+# LRU eviction and the optional SQLite store shared by worker processes.
+# Run from the repository root: python -m pytest tests
+import time
+from schema_cache import SchemaCache
+from value_cache import ValueCache, field_signature
+
+
+def test_signature_ignores_case_punctuation_and_option_order():
+    assert field_signature("E-mail :", "email") == field_signature("e-mail", "EMAIL")
+    assert field_signature("Plan", "select", ["Basic", "Pro"]) == field_signature("plan", "select", ["pro", "basic"])
+    assert field_signature("Plan", "select", ["Basic"]) != field_signature("Plan", "radio", ["Basic"])
+
+
+def test_hit_miss_and_expiry():
+    cache = ValueCache(ttl=0.05, path=None)
+    signature = field_signature("Name", "text")
+    assert cache.get(signature) is None
+    cache.set(signature, "Jane Doe")
+    assert cache.get(signature) == "Jane Doe"
+    time.sleep(0.06)
+    assert cache.get(signature) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ValueCache(max_entries=2, path=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_on_disk_are_shared_and_expire(tmp_path):
+    path = str(tmp_path / "values.db")
+    ValueCache(path=path).set("a", ["Feature 1", "Feature 2"])
+    ValueCache(ttl=-1, path=path).set("stale", "old")
+
+    other = ValueCache(path=path)  # Another worker process: nothing in memory yet
+    assert other.get("a") == ["Feature 1", "Feature 2"]
+    assert other.get("stale") is None
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_schema_cache_round_trip_and_ttl(tmp_path):
+    fields = [{"id": "name", "type": "text", "label": "Name"}]
+    cache = SchemaCache(ttl=0.05, path=str(tmp_path / "schemas.db"))
+    assert cache.get_schema("6:abc") is None
+    cache.set_schema("6:abc", fields, {"name": "Jane Doe"})
+    assert cache.get_schema("6:abc") == {"fields": fields, "values": {"name": "Jane Doe"}}
+    time.sleep(0.06)
+    assert cache.get_schema("6:abc") is None
+    assert SchemaCache(path=str(tmp_path / "schemas.db")).get_schema("6:abc") is None
+
+
+def test_schema_cache_defaults_to_memory():
+    assert SchemaCache(path="").stats()["persistent"] is False
@@ -0,0 +1,54 @@
+# SeleniumBackend on a tab of a shared browser: commands run while the tab is the backend's own,
+# and are refused once the form released the tab or the browser closed it.
+# Run from the repository root: python -m pytest tests
+import pytest
+from driver_backend import SeleniumBackend, TabMismatchError
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.tabs = {}
+
+
+class FakeTab:
+    def __init__(self, browser: FakeBrowser, handle: str):
+        self.browser = browser
+        self.window_handle = handle
+        self.current_url = "about:blank"
+        browser.tabs[handle] = self
+
+    def get(self, url: str):
+        self.current_url = url
+
+
+def test_backend_records_and_checks_its_tab():
+    browser = FakeBrowser()
+    tab = FakeTab(browser, "tab-1")
+    backend = SeleniumBackend(tab)
+    assert backend.window_handle == "tab-1"
+    backend.navigate("http://form/")
+    assert backend.current_url() == "http://form/"
+
+    tab.window_handle = "tab-2"  # Rebound to another form's tab
+    with pytest.raises(TabMismatchError):
+        backend.navigate("http://form/")
+
+
+def test_released_or_closed_tab_refuses_commands():
+    browser = FakeBrowser()
+    released = SeleniumBackend(FakeTab(browser, "tab-1"))
+    released.close()
+    with pytest.raises(TabMismatchError):
+        released.current_url()
+
+    tab = FakeTab(browser, "tab-2")
+    backend = SeleniumBackend(tab)
+    del browser.tabs["tab-2"]
+    with pytest.raises(TabMismatchError):
+        backend.navigate("http://form/")
+
+
+def test_dedicated_sessions_are_not_checked():
+    driver = type("Driver", (), {"current_url": "http://form/"})()
+    backend = SeleniumBackend(driver)
+    assert backend.window_handle is None and backend.current_url() == "http://form/"
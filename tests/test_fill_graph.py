@@ -0,0 +1,103 @@
+# script.py's compiled fill graph on a stand-in page: independent fields are filled in one batch,
+# rediscovery follows only batches that can reveal fields, and a run that fails mid-form resumes
+# from its checkpoint with the fields it had already filled.
+# Run from the repository root: python -m pytest tests
+import pytest
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+import script
+import value_generator
+from dom_extract import EXTRACT_FIELDS_SCRIPT
+from dom_fill import BULK_FILL_SCRIPT
+from driver_backend import SeleniumBackend
+from element_cache import SUBMIT_CANDIDATES_SCRIPT
+from waits import ARM_SUBMIT_SCRIPT, SUBMIT_STATE_SCRIPT, FormWaiter
+
+
+def control(field_id: str, field_type: str, **extra) -> dict:
+    return {"id": field_id, "label": field_id.title(), "type": field_type, "visible": True, **extra}
+
+
+# Checking "newsletter" reveals "topics"
+class FakeFormPage:
+    def __init__(self):
+        self.values = {}
+        self.fill_calls = []
+        self.extract_calls = 0
+        self.fail_extract_at = None
+        self.submitted = False
+        self.current_url = "http://form/"
+        self.switch_to = self
+
+    @property
+    def alert(self):
+        raise NoAlertPresentException()
+
+    def fields(self):
+        fields = [control("name", "text"), control("email", "email"), control("newsletter", "checkbox")]
+        if self.values.get("newsletter") is True:
+            fields.append(control("topics", "text"))
+        return fields
+
+    def execute_script(self, script_source, *args):
+        if script_source == EXTRACT_FIELDS_SCRIPT:
+            self.extract_calls += 1
+            if self.extract_calls == self.fail_extract_at:
+                raise WebDriverException("tab crashed")
+            return self.fields()
+        if script_source == BULK_FILL_SCRIPT:
+            self.fill_calls.append([item["id"] for item in args[0]])
+            self.values.update({item["id"]: item["value"] for item in args[0]})
+            return []
+        if script_source == SUBMIT_CANDIDATES_SCRIPT:
+            return [self]
+        if script_source == ARM_SUBMIT_SCRIPT:
+            return None
+        if script_source == SUBMIT_STATE_SCRIPT:
+            return "dom_change" if self.submitted else None
+        raise AssertionError(f"Unexpected script: {script_source[:60]}")
+
+    def click(self):  # The submit button
+        self.submitted = True
+
+
+def offline_agent(page: FakeFormPage) -> script.FormAgent:
+    agent = object.__new__(script.FormAgent)
+    agent.url = "http://form/"
+    agent.driver = page
+    agent.backend = SeleniumBackend(page)
+    agent.waiter = FormWaiter(agent.backend)
+    agent.change_feed = None
+    return agent
+
+
+@pytest.fixture(autouse=True)
+def newsletter_checked(monkeypatch):
+    # The checkbox is always checked, so "topics" appears
+    monkeypatch.setitem(value_generator.GENERATORS, "checkbox", lambda generator, field: True)
+
+
+def test_graph_fills_in_batches_and_submits():
+    page = FakeFormPage()
+    state = script.run_fill_graph(offline_agent(page))
+    assert page.fill_calls == [["name", "email"], ["newsletter"], ["topics"]]
+    assert page.extract_calls == 2  # Only the checkbox batch triggers rediscovery
+    assert all(field.filled for field in state.fields)
+    assert state.submission_attempted and page.submitted
+
+
+def test_failed_run_resumes_from_its_checkpoint():
+    page = FakeFormPage()
+    page.fail_extract_at = 2  # The rediscovery after the checkbox batch fails
+    with pytest.raises(WebDriverException):
+        script.run_fill_graph(offline_agent(page), thread_id="form-1")
+    assert page.fill_calls == [["name", "email"], ["newsletter"]]
+
+    # A fresh page: the filled fields are put back in one call, then the graph carries on
+    fresh = FakeFormPage()
+    state = script.run_fill_graph(offline_agent(fresh), thread_id="form-1")
+    assert fresh.fill_calls == [["name", "email", "newsletter"], ["topics"]]
+    assert fresh.values["name"] == page.values["name"]
+    assert fresh.extract_calls == 1
+    assert {field.id for field in state.fields if field.filled} == {"name", "email", "newsletter", "topics"}
+    assert fresh.submitted
+    assert not script.fill_graph.get_state({"configurable": {"thread_id": "form-1"}}).next
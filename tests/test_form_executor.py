@@ -0,0 +1,64 @@
+# FormJobExecutor's backlog bound and the 429 /process-form answers once it is full.
+# Run from the repository root: python -m pytest tests
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+import form_api
+from form_executor import FormJobExecutor, QueueFullError
+
+
+# A form job that holds its worker until released
+class BlockingJob:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, url, **options):
+        self.started.set()
+        assert self.release.wait(5)
+        return {"url": url, "status": "success"}
+
+
+def test_jobs_beyond_workers_and_queue_are_rejected():
+    executor = FormJobExecutor(workers=1, max_queue=1)
+    job = BlockingJob()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(job, "http://form/1"))
+        queued = asyncio.ensure_future(executor.run(job, "http://form/2"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await executor.run(job, "http://form/3")
+        assert executor.stats()["running"] == 1 and executor.stats()["queued"] == 1
+        job.release.set()
+        return await asyncio.gather(running, queued)
+
+    results = asyncio.run(scenario())
+    assert [result["url"] for result in results] == ["http://form/1", "http://form/2"]
+    stats = executor.stats()
+    assert stats["completed"] == 2 and stats["rejected"] == 1
+    executor.shutdown()
+
+
+def test_process_form_answers_429_when_the_queue_is_full(monkeypatch):
+    executor = FormJobExecutor(workers=1, max_queue=0)
+    job = BlockingJob()
+    monkeypatch.setattr(form_api, "form_executor", executor)
+    monkeypatch.setattr(form_api, "run_form_job", job)
+    client = TestClient(form_api.app)  # Not entered: startup would check for chromedriver
+
+    first = {}
+    request = threading.Thread(target=lambda: first.update(response=client.post("/process-form", params={"url": "http://form/1"})))
+    request.start()
+    try:
+        assert job.started.wait(5)
+        response = client.post("/process-form", params={"url": "http://form/2"})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        job.release.set()
+        request.join(5)
+    assert first["response"].status_code == 200
+    assert first["response"].json() == {"url": "http://form/1", "status": "success"}
+    executor.shutdown()
@@ -0,0 +1,66 @@
+# /process-form/stream and /process-form/ws on a stand-in form function: phase and field events
+# in emission order, then a result event; a failing form ends with an error event.
+# Run from the repository root: python -m pytest tests
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from form_executor import FormJobExecutor
+from form_stream import create_stream_router
+
+
+class Options(BaseModel):
+    fields: int = 3
+
+
+# Emits what the apps' fill_form emits, from its worker thread
+def fake_form(url: str, fields: int = 3, on_event=None):
+    if "broken" in url:
+        raise RuntimeError("Form not found")
+    on_event({"event": "phase", "phase": "discovery", "seconds": 0.01})
+    state = []
+    for i in range(fields):
+        field = {"id": f"f{i}", "label": f"Field {i}", "value": "x", "filled": i != 1}
+        state.append(field)
+        on_event({"event": "field", **field, "seconds": 0.001})
+    return {"url": url, "status": "success", "submit_outcome": "navigation", "state": {"fields": state}}
+
+
+def make_client():
+    executor = FormJobExecutor(workers=1, max_queue=1)
+    app = FastAPI()
+    app.include_router(create_stream_router(fake_form, Options, executor))
+    return TestClient(app), executor
+
+
+def test_ndjson_events_then_result():
+    client, executor = make_client()
+    response = client.post("/process-form/stream", params={"format": "ndjson"}, json={"url": "http://form/", "options": {"fields": 3}})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["phase", "field", "field", "field", "result"]
+    assert [event["id"] for event in events if event["event"] == "field"] == ["f0", "f1", "f2"]
+    assert events[-1] == {
+        "event": "result", "url": "http://form/", "status": "success", "submit_outcome": "navigation", "fields": 3, "filled": 2,
+    }
+    executor.shutdown()
+
+
+def test_sse_reports_a_failed_form():
+    client, executor = make_client()
+    response = client.post("/process-form/stream", json={"url": "http://form/broken"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: error\n") and "Form not found" in response.text
+    executor.shutdown()
+
+
+def test_websocket_streams_the_same_events():
+    client, executor = make_client()
+    with client.websocket_connect("/process-form/ws") as websocket:
+        websocket.send_json({"url": "http://form/", "options": {"fields": 2}})
+        events = [json.loads(websocket.receive_text()) for _ in range(4)]
+    assert [event["event"] for event in events] == ["phase", "field", "field", "result"]
+
+    with client.websocket_connect("/process-form/ws") as websocket:
+        websocket.send_json({"options": {}})  # No url
+        assert websocket.receive_json()["event"] == "error"
+    executor.shutdown()
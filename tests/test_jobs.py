@@ -0,0 +1,98 @@
+# /jobs on a stand-in form function: results stream as forms finish, per-form failures are
+# reported in place, cancelling marks the forms that never ran, and a job keeps counters for
+# every form but only a window of recent results.
+# Run from the repository root: python -m pytest tests
+import asyncio
+import json
+import threading
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from form_executor import FormJobExecutor
+from jobs import Job, create_jobs_router, stream_results
+
+
+class Options(BaseModel):
+    fill_mode: str = "per_field"
+
+
+class FakeForms:
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, url: str, fill_mode: str = "per_field"):
+        assert self.release.wait(5)
+        if "broken" in url:
+            raise RuntimeError("Form not found")
+        return {"url": url, "status": "success", "fill_mode": fill_mode}
+
+
+def make_client(forms: FakeForms, workers: int = 2):
+    executor = FormJobExecutor(workers=workers, max_queue=4)
+    app = FastAPI()
+    app.include_router(create_jobs_router(forms, Options, executor))
+    return TestClient(app), executor
+
+
+def test_results_stream_as_forms_finish():
+    forms = FakeForms()
+    client, executor = make_client(forms)
+    with client:  # One event loop for the job task and the requests
+        items = [{"url": "http://form/0"}, {"url": "http://form/broken"}, {"url": "http://form/2", "options": {"fill_mode": "bulk"}}]
+        job = client.post("/jobs", json={"items": items}).json()
+        assert job["total"] == 3
+
+        lines = client.get(f"/jobs/{job['job_id']}/results").text.splitlines()
+        results = sorted((json.loads(line) for line in lines), key=lambda result: result["index"])
+        assert [result["status"] for result in results] == ["success", "error", "success"]
+        assert results[1]["error"] == "Form not found"
+        assert results[2]["fill_mode"] == "bulk"
+
+        summary = client.get(f"/jobs/{job['job_id']}").json()
+        assert summary["status"] == "completed" and summary["done"] == 3
+        assert summary["counts"] == {"success": 2, "error": 1}
+    executor.shutdown()
+
+
+def test_sse_ends_with_the_summary():
+    client, executor = make_client(FakeForms())
+    with client:
+        job = client.post("/jobs", json={"items": [{"url": "http://form/0"}]}).json()
+        events = client.get(f"/jobs/{job['job_id']}/results", params={"format": "sse"}).text.strip().split("\n\n")
+        assert events[0].startswith("event: result")
+        assert events[-1].startswith("event: end") and '"status": "completed"' in events[-1]
+    executor.shutdown()
+
+
+def test_cancel_marks_unfinished_forms():
+    forms = FakeForms()
+    forms.release.clear()
+    client, executor = make_client(forms, workers=1)
+    with client:
+        job = client.post("/jobs", json={"items": [{"url": f"http://form/{i}"} for i in range(5)], "concurrency": 1}).json()
+        summary = client.delete(f"/jobs/{job['job_id']}").json()
+        forms.release.set()  # Let the worker thread finish the form it had started
+        assert summary["status"] == "cancelled"
+        assert summary["counts"] == {"cancelled": 5}
+        assert client.get("/jobs/unknown").status_code == 404
+    executor.shutdown()
+
+
+def test_a_job_needs_urls():
+    client, executor = make_client(FakeForms())
+    assert client.post("/jobs", json={"items": []}).status_code == 422
+    executor.shutdown()
+
+
+def test_job_keeps_counts_and_a_window_of_results():
+    async def run():
+        job = Job([object()] * 5, concurrency=1, window=2)
+        for index in range(5):
+            await job.add_result({"index": index, "status": "error" if index == 1 else "success"})
+        await job.finish("completed")
+        return job, [json.loads(line) async for line in stream_results(job, "ndjson")]
+
+    job, streamed = asyncio.run(run())
+    assert job.summary()["done"] == 5 and job.summary()["counts"] == {"success": 4, "error": 1}
+    assert [result["index"] for result in streamed] == [3, 4]  # Older results left the window
@@ -0,0 +1,68 @@
+# The LLM pipeline against the offline FakeFormLLM: values, cache hits, fallbacks, and the
+# circuit breaker opening on failures and closing after a successful trial call.
+# Run from the repository root: python -m pytest tests
+import asyncio
+import time
+from langchain_core.prompts import PromptTemplate
+from fake_llm import FakeFormLLM
+from form_agent import Field
+from llm_pipeline import AsyncFieldInterpreter, CircuitBreaker, TokenBucket
+from value_cache import ValueCache
+
+PROMPT = PromptTemplate.from_template("Label: {label}\nType: {field_type}\nOptions: {options}")
+
+
+def interpreter(llm: FakeFormLLM, breaker: CircuitBreaker, **kwargs) -> AsyncFieldInterpreter:
+    return AsyncFieldInterpreter(
+        llm,
+        PROMPT,
+        fallback=lambda field: "fallback",
+        limiter=TokenBucket(rate=1000, burst=1000),
+        breaker=breaker,
+        max_retries=0,
+        **kwargs,
+    )
+
+
+def fields(count: int):
+    return [Field(id=f"city-{i}", label="City", type="text") for i in range(count)]
+
+
+def test_values_come_from_the_llm_then_the_cache():
+    llm = FakeFormLLM()
+    cache = ValueCache(path=None)
+    pipeline = interpreter(llm, CircuitBreaker(), cache=cache, concurrency=1)
+    values = asyncio.run(pipeline.interpret_all(fields(3)))
+    assert values == {"city-0": "Springfield", "city-1": "Springfield", "city-2": "Springfield"}
+    assert llm.calls == 1
+    assert pipeline.counters["cache_hits"] == 2 and pipeline.cache_hit_ids == {"city-1", "city-2"}
+
+
+def test_breaker_opens_on_failures_and_closes_after_a_trial_call():
+    llm = FakeFormLLM(error_rate=1.0)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    pipeline = interpreter(llm, breaker, concurrency=1)
+
+    # Two failures open the breaker; the other fields fall back without calling the provider
+    values = asyncio.run(pipeline.interpret_all(fields(5)))
+    assert set(values.values()) == {"fallback"}
+    assert llm.calls == 2
+    assert breaker.stats()["state"] == "open" and breaker.stats()["rejected"] == 3
+
+    # After the reset timeout one trial call goes through; it succeeds and closes the breaker
+    llm.error_rate = 0.0
+    time.sleep(0.12)
+    values = asyncio.run(pipeline.interpret_all(fields(2)))
+    assert values == {"city-0": "Springfield", "city-1": "Springfield"}
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "opened": 1, "rejected": 3}
+
+
+def test_a_failed_trial_call_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call at a time
+    breaker.record_failure()
+    assert breaker.stats()["state"] == "open" and breaker.stats()["opened"] == 2
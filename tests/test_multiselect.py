@@ -0,0 +1,136 @@
+# Multiselect values from the batch and per-field LLM paths, validated and filled end to end
+# against a stand-in <select multiple> (no browser needed).
+# Run from the repository root: python -m pytest tests
+import re
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from driver_backend import SeleniumBackend
+from fake_llm import FakeFormLLM
+from form_agent import AIFormAgent, Field, fill_field, validate_field_value
+from value_cache import ValueCache
+from value_generator import ValueGenerator
+
+OPTIONS = ["Feature 1", "Feature 2", "Feature 3, extended"]
+
+
+class FakeOption:
+    def __init__(self, text: str):
+        self.text = text
+        self.selected = False
+
+    def is_selected(self) -> bool:
+        return self.selected
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def click(self):
+        self.selected = not self.selected
+
+    def value_of_css_property(self, name: str) -> str:
+        return "visible"
+
+
+# Answers the lookups selenium's Select makes: every option, and options by normalised text
+class FakeMultiSelect:
+    tag_name = "select"
+
+    def __init__(self, options):
+        self.options = [FakeOption(text) for text in options]
+
+    def get_dom_attribute(self, name: str):
+        return "true" if name == "multiple" else None
+
+    def find_elements(self, by, value):
+        if by == By.TAG_NAME:
+            return self.options
+        text = re.search(r'normalize-space\(\.\) = "(.*)"\]$', value).group(1)
+        return [option for option in self.options if option.text == text]
+
+    def clear(self):
+        raise AssertionError("A select cannot be cleared")
+
+    def send_keys(self, *values):
+        raise AssertionError("A select does not take keys")
+
+    def chosen(self):
+        return [option.text for option in self.options if option.selected]
+
+
+class FakeDriver:
+    def __init__(self, elements):
+        self.elements = elements
+
+    def find_element(self, by, value):
+        if by != By.ID or value not in self.elements:
+            raise NoSuchElementException(value)
+        return self.elements[value]
+
+
+# An AIFormAgent without a browser: interpretation through the fake LLM, controls through a
+# SeleniumBackend on the fake driver
+def offline_agent(elements) -> AIFormAgent:
+    agent = object.__new__(AIFormAgent)
+    agent.llm = FakeFormLLM()
+    agent.value_cache = ValueCache(path=None)
+    agent.llm_calls = 0
+    agent.fallback_ids = set()
+    agent.cached_ids = set()
+    agent.value_generator = ValueGenerator()
+    agent.backend = SeleniumBackend(FakeDriver(elements))
+    return agent
+
+
+def multiselect_field(field_id: str = "features") -> Field:
+    return Field(id=field_id, label="Features:", type="multiselect", options=OPTIONS)
+
+
+def test_validate_matches_options_ignoring_case():
+    field = multiselect_field()
+    assert validate_field_value(field, ["feature 2", "FEATURE 1"]) == ["Feature 2", "Feature 1"]
+    assert validate_field_value(field, "Feature 1, feature 2") == ["Feature 1", "Feature 2"]
+    assert validate_field_value(field, ["Feature 1", "Feature 9"]) is None
+    assert validate_field_value(field, []) is None
+
+
+def test_batch_reply_is_validated_and_filled():
+    select = FakeMultiSelect(OPTIONS)
+    select.options[2].selected = True  # Left over from an earlier fill; must be cleared
+    agent = offline_agent({"features": select})
+    field = multiselect_field()
+
+    values = agent.interpret_fields([field])
+    assert values == {"features": ["Feature 1", "Feature 2"]}
+    assert agent.value_source("features") == "llm"
+
+    field.value = values["features"]
+    fill_field(field, agent)
+    assert field.filled
+    assert select.chosen() == ["Feature 1", "Feature 2"]
+
+
+def test_comma_joined_values_are_filled():
+    first, second = FakeMultiSelect(OPTIONS), FakeMultiSelect(OPTIONS)
+    agent = offline_agent({"features": first, "features_again": second})
+
+    # Per-field replies join the options with commas; the second field reuses the cached reply
+    field = multiselect_field()
+    fill_field(field, agent)
+    assert field.value == "Feature 1, Feature 2"
+    assert field.filled and first.chosen() == ["Feature 1", "Feature 2"]
+
+    again = multiselect_field("features_again")
+    again.value = "feature 2,  Feature 3, extended"  # An option whose own text holds a comma
+    fill_field(again, agent)
+    assert again.filled and second.chosen() == ["Feature 2", "Feature 3, extended"]
+
+
+@pytest.mark.parametrize("value", [["Feature 9"], "Feature 1, Feature 9"])
+def test_unknown_option_leaves_field_unfilled(value):
+    select = FakeMultiSelect(OPTIONS)
+    agent = offline_agent({"features": select})
+    field = multiselect_field()
+    field.value = value
+    fill_field(field, agent)
+    assert not field.filled
@@ -0,0 +1,58 @@
+# ResultStore: queued forms are written in batches and aggregated by /results/stats; without a
+# path nothing is recorded and no file is created.
+# Run from the repository root: python -m pytest tests
+import os
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from form_api import Field
+from result_store import ResultStore, create_results_router
+
+
+def form_fields(failed: str = ""):
+    return [
+        Field(id="name", label="Name", type="text", filled=failed != "name"),
+        Field(id="email", label="Email", type="email", filled=failed != "email"),
+        Field(id="plan", label="Plan", type="select", options=["Basic"], filled=True),
+    ]
+
+
+def test_forms_are_written_and_aggregated(tmp_path):
+    store = ResultStore(path=str(tmp_path / "results.db"), batch_size=4, flush_interval=0.05)
+    store.record_form("http://form/a", "3:abc", form_fields(), {"name": 0.2, "email": 0.1})
+    store.record_form("http://form/a", "3:abc", form_fields(failed="email"), {"name": 0.4}, {"email": "llm"})
+    store.record_form("http://form/b", "2:def", form_fields(failed="name"))
+    store.flush()
+
+    assert store.stats()["forms"] == 3 and store.stats()["fields"] == 9
+    stats = store.query_stats()
+    assert (stats["forms"], stats["fields"], stats["failed"]) == (3, 9, 2)
+    by_type = {group["type"]: group for group in stats["by_type"]}
+    assert by_type["email"]["failed"] == 1 and by_type["email"]["failure_rate"] == round(1 / 3, 4)
+    assert {group["source"]: group["fields"] for group in stats["by_source"]} == {"rule": 8, "llm": 1}
+    assert stats["slowest_labels"][0] == {
+        "label": "Name", "type": "text", "fields": 2, "failed": 0, "failure_rate": 0.0, "avg_seconds": 0.3, "max_seconds": 0.4,
+    }
+
+    only_b = store.query_stats(fingerprint="2:def")
+    assert only_b["forms"] == 1 and only_b["failed"] == 1
+    store.close()
+
+
+def test_results_router_includes_writer_counters(tmp_path):
+    store = ResultStore(path=str(tmp_path / "results.db"))
+    store.record_form("http://form/a", None, form_fields())
+    store.flush()
+    app = FastAPI()
+    app.include_router(create_results_router(store))
+    stats = TestClient(app).get("/results/stats", params={"limit": 1}).json()
+    assert stats["forms"] == 1 and len(stats["slowest_labels"]) <= 1
+    assert stats["writer"]["enabled"] is True and stats["writer"]["batches"] == 1
+
+
+def test_without_a_path_nothing_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ResultStore(path=None)
+    store.record_form("http://form/a", None, form_fields())
+    store.close()
+    assert store.query_stats() == {"enabled": False}
+    assert os.listdir(tmp_path) == []
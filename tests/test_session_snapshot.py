@@ -0,0 +1,132 @@
+# Session snapshots against the fixture server's consent-gated form (/gated -> #accept ->
+# /gated/form), driven by a plain-HTTP stand-in for a browser tab: the first run clicks through
+# the consent page and captures the session, later runs restore it and open the form directly.
+# Run from the repository root: python -m pytest tests
+import json
+import urllib.request
+from urllib.parse import urljoin
+import pytest
+from driver_backend import DriverBackend, ElementNotFoundError
+from session_snapshot import CAPTURE_STORAGE_SCRIPT, SessionSnapshotStore, open_form
+from waits import FIELD_QUIET_SCRIPT, FIELD_SIGNATURE_SCRIPT, FormWaiter
+from benchmarks.fixture_server import serve
+
+
+# Loads pages over HTTP with its own cookies; clicking #accept does what the consent page's
+# script does. Answers the scripts the waiter and the snapshot code evaluate.
+class HttpBackend(DriverBackend):
+    name = "http"
+
+    def __init__(self):
+        self.url = "about:blank"
+        self.html = ""
+        self.cookies = {}
+        self.local = {}
+        self.visited = []
+        self.new_document_scripts = {}
+
+    def navigate(self, url: str):
+        request = urllib.request.Request(url)
+        if self.cookies:
+            request.add_header("Cookie", "; ".join(f"{name}={value}" for name, value in self.cookies.items()))
+        with urllib.request.urlopen(request) as response:  # Follows the gate's redirect, keeping the Cookie header
+            self.url, self.html = response.geturl(), response.read().decode()
+        self.visited.append(url)
+
+    def current_url(self) -> str:
+        return self.url
+
+    def evaluate(self, script: str, *args):
+        if script == CAPTURE_STORAGE_SCRIPT:
+            return {"local": dict(self.local), "session": {}}
+        if script == FIELD_QUIET_SCRIPT:
+            return None
+        if script == FIELD_SIGNATURE_SCRIPT:
+            return str(self.html.count("<input"))
+        if "document.readyState" in script:
+            return "complete"
+        if "querySelector(arguments[0])" in script:
+            return f"<{args[0]}" in self.html
+        raise AssertionError(f"Unexpected script: {script[:60]}")
+
+    def cdp(self, method: str, params=None) -> dict:
+        params = params or {}
+        if method == "Network.getCookies":
+            return {"cookies": [{"name": n, "value": v, "domain": "127.0.0.1", "path": "/"} for n, v in self.cookies.items()]}
+        if method == "Network.setCookies":
+            self.cookies.update({cookie["name"]: cookie["value"] for cookie in params["cookies"]})
+            return {}
+        if method == "Page.addScriptToEvaluateOnNewDocument":
+            identifier = str(len(self.new_document_scripts) + 1)
+            self.new_document_scripts[identifier] = params["source"]
+            return {"identifier": identifier}
+        if method == "Page.removeScriptToEvaluateOnNewDocument":
+            del self.new_document_scripts[params["identifier"]]
+            return {}
+        raise AssertionError(f"Unexpected CDP command: {method}")
+
+    def click(self, selector: str):
+        if selector != "#accept" or 'id="accept"' not in self.html:
+            raise ElementNotFoundError(selector)
+        self.cookies["consent"] = "1"
+        self.local["consent"] = json.dumps({"analytics": False})
+        self.navigate(urljoin(self.url, "/gated/form"))
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server, url = serve()
+    yield url
+    server.shutdown()
+
+
+def open_gated(store, url: str):
+    backend = HttpBackend()
+    waiter = FormWaiter(backend, ready_timeout=1, quiet_period=0.05)
+    return backend, open_form(backend, waiter, url, store, warmup=["#accept"])
+
+
+def test_first_run_bootstraps_and_later_runs_restore(base_url):
+    store = SessionSnapshotStore(path="")
+
+    first, report = open_gated(store, base_url + "gated")
+    assert report["restored"] is False and report["captured"] is True
+    assert first.visited == [base_url + "gated", base_url + "gated/form"]
+    snapshot = store.get_snapshot(base_url.rstrip("/"), ["#accept"])
+    assert snapshot["url"] == base_url + "gated/form" and snapshot["cookies"][0]["name"] == "consent"
+
+    # A fresh tab: the session goes in first, then the post-warm-up URL opens without the consent page
+    second, report = open_gated(store, base_url + "gated")
+    assert report["restored"] is True and report["captured"] is False
+    assert second.visited == [base_url + "gated/form"]
+    assert second.cookies == {"consent": "1"}
+    assert second.new_document_scripts == {}  # The storage script was removed after the load
+    assert report["bootstrap_seconds"] < snapshot["bootstrap_seconds"]
+
+
+def test_another_form_on_the_origin_opens_its_own_url(base_url):
+    store = SessionSnapshotStore(path="")
+    open_gated(store, base_url + "gated")
+
+    other, report = open_gated(store, base_url + "gated/form?step=2")
+    assert report["restored"] is True
+    assert other.visited == [base_url + "gated/form?step=2"]
+    assert other.url == base_url + "gated/form?step=2"  # Restored consent: no redirect to the gate
+
+
+def test_a_snapshot_that_no_longer_reaches_the_form_is_replaced(base_url):
+    store = SessionSnapshotStore(path="")
+    open_gated(store, base_url + "gated")
+    origin = base_url.rstrip("/")
+    store.set_snapshot(origin, {**store.get_snapshot(origin, ["#accept"]), "cookies": []})  # Consent revoked
+
+    backend, report = open_gated(store, base_url + "gated")
+    assert report["restored"] is False and report["captured"] is True
+    assert backend.visited[-1] == base_url + "gated/form"
+    assert store.get_snapshot(origin, ["#accept"])["cookies"][0]["name"] == "consent"
+
+
+def test_a_different_warmup_does_not_use_the_snapshot(base_url):
+    store = SessionSnapshotStore(path="")
+    open_gated(store, base_url + "gated")
+    assert store.get_snapshot(base_url.rstrip("/"), ["#other"]) is None
@@ -0,0 +1,85 @@
+# Rule-based values honour the discovered schema: options, pattern, min/max and maxlength, and
+# a seed reproduces a form's values.
+# Run from the repository root: python -m pytest tests
+import datetime
+import re
+import pytest
+from value_generator import ValueGenerator, generate_values
+
+SEEDS = range(25)
+
+
+@pytest.mark.parametrize("pattern", [r"[A-Z]{3}-[0-9]{4}", r"\d{5}(-\d{4})?", r"(red|green|blue)", r"[^0-9]{2,4}x"])
+def test_values_match_the_pattern(pattern):
+    for seed in SEEDS:
+        value = ValueGenerator(seed).value_for({"id": "f", "type": "text", "pattern": pattern})
+        assert re.fullmatch(pattern, value), (pattern, value)
+
+
+def test_unsupported_pattern_falls_back_to_the_type_default():
+    value = ValueGenerator(0).value_for({"id": "f", "type": "text", "pattern": r"(?<=a)b"})
+    assert re.fullmatch(r"[A-Za-z]{8}", value)
+
+
+def test_numbers_and_dates_stay_within_min_and_max():
+    for seed in SEEDS:
+        generator = ValueGenerator(seed)
+        assert 5 <= int(generator.value_for({"id": "n", "type": "number", "min": "5", "max": "7"})) <= 7
+        assert int(generator.value_for({"id": "r", "type": "range", "min": "90"})) >= 90
+        day = datetime.date.fromisoformat(
+            generator.value_for({"id": "d", "type": "date", "min": "2024-02-01", "max": "2024-02-03"})
+        )
+        assert datetime.date(2024, 2, 1) <= day <= datetime.date(2024, 2, 3)
+        assert "09:00" <= generator.value_for({"id": "t", "type": "time", "min": "09:00", "max": "09:30"}) <= "09:30"
+
+
+def test_choices_come_from_the_options_without_placeholders():
+    options = ["Select a plan", "Basic", "Pro"]
+    for seed in SEEDS:
+        generator = ValueGenerator(seed)
+        assert generator.value_for({"id": "p", "type": "select", "options": options}) in ("Basic", "Pro")
+        chosen = generator.value_for({"id": "f", "type": "multiselect", "options": ["-- choose --", "A", "B", "C"]})
+        assert len(chosen) == 2 and set(chosen) <= {"A", "B", "C"}
+
+
+def test_radios_of_a_group_share_one_value():
+    fields = [
+        {"id": f"color-{i}", "type": "radio", "name": "color", "options": [option]}
+        for i, option in enumerate(["red", "green", "blue"])
+    ]
+    values = ValueGenerator(3).generate(fields)
+    assert len(set(values.values())) == 1 and values["color-0"] in ("red", "green", "blue")
+
+
+def test_email_shape_and_maxlength():
+    for seed in SEEDS:
+        generator = ValueGenerator(seed)
+        assert re.fullmatch(r"[a-z]{5}@example\.com", generator.value_for({"id": "e", "type": "email"}))
+        assert len(generator.value_for({"id": "t", "type": "text", "maxlength": 4})) <= 4
+        short = generator.value_for({"id": "e", "type": "email", "maxlength": 10})
+        assert len(short) <= 10 and re.fullmatch(r"[a-z]+@x\.io", short)
+        # No address fits in 5 characters; a@x.io beats a cut that is no email at all
+        assert re.fullmatch(r"[a-z]@x\.io", generator.value_for({"id": "e", "type": "email", "maxlength": 5}))
+        assert re.fullmatch(r"https://[a-z]+\.io", generator.value_for({"id": "u", "type": "url", "maxlength": 12}))
+
+
+@pytest.mark.parametrize("pattern, maxlength", [(r"[A-Z]{2,6}", 3), (r"\d{5}(-\d{4})?", 5), (r"[a-z]+-[0-9]*", 4)])
+def test_pattern_values_fit_maxlength(pattern, maxlength):
+    for seed in SEEDS:
+        value = ValueGenerator(seed).value_for({"id": "f", "type": "text", "pattern": pattern, "maxlength": maxlength})
+        assert re.fullmatch(pattern, value) and len(value) <= maxlength, value
+
+
+def test_the_pattern_wins_when_no_value_fits_maxlength():
+    value = ValueGenerator(1).value_for({"id": "f", "type": "text", "pattern": r"[A-Z]{3}-[0-9]{4}", "maxlength": 5})
+    assert re.fullmatch(r"[A-Z]{3}-[0-9]{4}", value)
+
+
+def test_a_seed_reproduces_the_form():
+    fields = [
+        {"id": "name", "type": "text"},
+        {"id": "email", "type": "email"},
+        {"id": "age", "type": "number", "min": "18", "max": "99"},
+        {"id": "plan", "type": "select", "options": ["Basic", "Pro"]},
+    ]
+    assert generate_values(fields, seed="form-1") == generate_values(fields, seed="form-1")
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (overridable through the environment)
+VALUE_CACHE_SIZE = int(os.getenv("VALUE_CACHE_SIZE", "2048"))
+VALUE_CACHE_TTL = float(os.getenv("VALUE_CACHE_TTL", str(7 * 24 * 3600)))
+VALUE_CACHE_PATH = os.getenv("VALUE_CACHE_PATH")  # Optional SQLite file shared across workers
+
+
+def _normalise(text: str) -> str:
+    text = re.sub(r"\s+", " ", (text or "").lower())
+    return text.strip(" :*?.-")
+
+
+# Normalised (label, type, options) key: "E-mail :" and "e-mail" share a signature, option order doesn't matter
+def field_signature(label: str, field_type: str, options: Optional[List[str]] = None) -> str:
+    normalised_options = sorted({_normalise(o) for o in options or [] if _normalise(o)})
+    return json.dumps([_normalise(field_type), _normalise(label), normalised_options])
+
+
+# LRU cache of JSON values (generated field values by default) with TTLs and an optional SQLite backing store
+class ValueCache:
+    def __init__(
+        self,
+        max_entries: int = VALUE_CACHE_SIZE,
+        ttl: float = VALUE_CACHE_TTL,
+        path: Optional[str] = VALUE_CACHE_PATH,
+        table: str = "value_cache",
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.table = table
+        self._entries = OrderedDict()  # signature -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expired": 0}
+        if path:
+            with self._connection() as conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "signature TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+
+    # One connection per thread; WAL lets several worker processes read while one writes
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, signature: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(signature)
+                    self._counters["hits"] += 1
+                    return entry[1]
+                del self._entries[signature]
+                self._counters["expired"] += 1
+
+        value = self._load(signature, now) if self.path else None
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+        self._remember(signature, value[1], value[0])
+        return value[1]
+
+    def set(self, signature: str, value: Any):
+        expires_at = time.time() + self.ttl
+        self._remember(signature, value, expires_at)
+        if self.path:
+            try:
+                with self._connection() as conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (signature, value, expires_at) VALUES (?, ?, ?)",
+                        (signature, json.dumps(value), expires_at),
+                    )
+            except sqlite3.Error as e:
+                logger.warning("Cache write failed", extra={"table": self.table, "error": str(e)})
+
+    def _load(self, signature: str, now: float):
+        try:
+            row = self._connection().execute(
+                f"SELECT expires_at, value FROM {self.table} WHERE signature = ? AND expires_at > ?",
+                (signature, now),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed", extra={"table": self.table, "error": str(e)})
+            return None
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _remember(self, signature: str, value: Any, expires_at: float):
+        with self._lock:
+            self._entries[signature] = (expires_at, value)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persistent": bool(self.path),
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connection() as conn:
+                conn.execute(f"DELETE FROM {self.table}")
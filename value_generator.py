@@ -0,0 +1,361 @@
+import datetime
+import functools
+import logging
+import os
+import random
+import re
+import string
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Seed for generated values; unset gives different values on every run
+VALUE_SEED = os.getenv("FORM_VALUE_SEED")
+# Path given to file inputs
+UPLOAD_FILE = os.getenv("FORM_UPLOAD_FILE", "path/to/file.txt")
+
+# Open-ended repeats (*, +, {n,}) in a pattern produce at most this many extra characters
+PATTERN_EXTRA_REPEATS = 3
+# Draws of a pattern value longer than maxlength before falling back to the shortest repeats
+PATTERN_ATTEMPTS = 5
+# Select options that only prompt for a choice
+PLACEHOLDER_OPTION = re.compile(r"^\s*(-+\s*)?(select|choose|please select|pick)\b", re.IGNORECASE)
+
+WORD_CHARS = string.ascii_letters + string.digits + "_"
+LITERAL_CHARS = string.ascii_letters + string.digits
+
+
+class PatternNotSupported(Exception):
+    pass
+
+
+FIELD_KEYS = ("id", "type", "name", "options", "pattern", "min", "max", "maxlength")
+DEFAULT_FIRST_DAY = datetime.date(2020, 1, 1)
+DEFAULT_LAST_DAY = datetime.date(2025, 12, 31)
+
+
+# Discovered fields come as pydantic models (the three apps) or plain dicts (script.py's graph);
+# generators read plain dicts
+def _spec(field) -> dict:
+    if isinstance(field, dict):
+        return field
+    return {key: getattr(field, key, None) for key in FIELD_KEYS}
+
+
+# Parsed once per distinct pattern; None when Python's re can't read it
+@functools.lru_cache(maxsize=256)
+def _parse_pattern(pattern: str):
+    try:
+        return sre_parse.parse(pattern), re.compile(pattern)
+    except re.error:
+        return None
+
+
+def _number(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _iso(value, parse: Callable[[str], Any]):
+    if value is None:
+        return None
+    try:
+        return parse(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def usable_options(options: Optional[Iterable[str]]) -> List[str]:
+    return [o for o in options or [] if o and o.strip() and not PLACEHOLDER_OPTION.match(o)]
+
+
+# Rule-based values for discovered fields. Generators are looked up in a table built once at
+# import; all randomness comes from one seeded Random, so a seed reproduces a whole form's values.
+# Values honour the schema: select/radio options, pattern, min/max and maxlength.
+class ValueGenerator:
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    # Values for a batch of fields in one pass, keyed by field id. Radios of one group share
+    # the value chosen for the group.
+    def generate(self, fields: Iterable) -> Dict[str, Any]:
+        values = {}
+        specs = [_spec(field) for field in fields]
+        group_options: Dict[str, List[str]] = {}
+        for spec in specs:
+            if spec["type"] == "radio" and spec.get("name"):
+                group_options.setdefault(spec["name"], []).extend(usable_options(spec.get("options")))
+        groups: Dict[str, Any] = {}
+        for spec in specs:
+            name = spec.get("name")
+            if spec["type"] == "radio" and name:
+                if name not in groups:
+                    options = group_options[name]
+                    groups[name] = self.random.choice(options) if options else self._radio(spec)
+                values[spec["id"]] = groups[name]
+            else:
+                values[spec["id"]] = GENERATORS.get(spec["type"], ValueGenerator._default)(self, spec)
+        return values
+
+    def value_for(self, field) -> Any:
+        spec = _spec(field)
+        return GENERATORS.get(spec["type"], ValueGenerator._default)(self, spec)
+
+    def _letters(self, count: int, alphabet: str = string.ascii_letters) -> str:
+        return "".join(self.random.choices(alphabet, k=count))
+
+    # A value matching the field's pattern when there is one, else the type's default shape.
+    # maxlength never breaks either: make gets it as a budget and builds a shorter value of its
+    # shape, and pattern values are redrawn rather than cut into something the pattern rejects.
+    def _text_like(self, field, make: Callable[[Optional[int]], str]) -> str:
+        maxlength = field.get("maxlength") or None
+        pattern = field.get("pattern")
+        if pattern:
+            value = self._pattern_within(pattern, maxlength)
+            if value is not None:
+                return value
+        return make(maxlength)
+
+    # A pattern value of at most maxlength characters: a draw that fits, one whose cut still
+    # matches, or the shortest repeats. When none fits the pattern wins (the value is what the
+    # form validates); None when the pattern isn't supported.
+    def _pattern_within(self, pattern: str, maxlength: Optional[int]) -> Optional[str]:
+        shortest = None
+        for attempt in range(PATTERN_ATTEMPTS + 1):
+            value = self.from_pattern(pattern, minimal=attempt == PATTERN_ATTEMPTS)
+            if value is None:
+                return shortest
+            if not maxlength or len(value) <= maxlength:
+                return value
+            if _parse_pattern(pattern)[1].fullmatch(value[:maxlength]):
+                return value[:maxlength]
+            if shortest is None or len(value) < len(shortest):
+                shortest = value
+        logger.debug("No value of the pattern fits maxlength", extra={"pattern": pattern, "maxlength": maxlength})
+        return shortest
+
+    def _text(self, field) -> str:
+        return self._text_like(field, lambda budget: self._letters(min(8, budget or 8)))
+
+    # Never shorter than a@x.io: a cut address is no email at all
+    def _email(self, field) -> str:
+        def make(budget: Optional[int]) -> str:
+            domain = "example.com" if not budget or budget >= 17 else "x.io"
+            local = 5 if not budget else max(1, min(5, budget - len(domain) - 1))
+            return f"{self._letters(local, string.ascii_lowercase)}@{domain}"
+
+        return self._text_like(field, make)
+
+    def _password(self, field) -> str:
+        return self._text_like(field, lambda budget: self._letters(min(10, budget or 10), string.ascii_letters + string.digits))
+
+    def _tel(self, field) -> str:
+        r = self.random
+        return self._text_like(field, lambda budget: f"{r.randint(100, 999)}-{r.randint(100, 999)}-{r.randint(1000, 9999)}"[:budget])
+
+    # Never shorter than https://a.io, for the same reason as emails
+    def _url(self, field) -> str:
+        def make(budget: Optional[int]) -> str:
+            tld = ".com" if not budget or budget >= 13 else ".io"
+            host = 5 if not budget else max(1, min(5, budget - len("https://") - len(tld)))
+            return f"https://{self._letters(host, string.ascii_lowercase)}{tld}"
+
+        return self._text_like(field, make)
+
+    def _textarea(self, field) -> str:
+        return self._text_like(field, lambda budget: " ".join(self._letters(5) for _ in range(3))[:budget])
+
+    def _bounded_int(self, field, low: int, high: int) -> str:
+        minimum, maximum = _number(field.get("min")), _number(field.get("max"))
+        if minimum is not None:
+            low = -int(-minimum // 1)  # ceil
+            high = max(high, low)
+        if maximum is not None:
+            high = int(maximum // 1)
+            low = min(low, high)
+        return str(self.random.randint(low, high))
+
+    def _number(self, field) -> str:
+        return self._bounded_int(field, 1, 100)
+
+    def _range(self, field) -> str:
+        return self._bounded_int(field, 0, 100)
+
+    # A day between min and max (ISO dates), defaulting to the last few years
+    def _day(self, field, parse: Callable[[str], Any]) -> datetime.date:
+        low = _iso(field.get("min"), parse) or DEFAULT_FIRST_DAY
+        high = _iso(field.get("max"), parse) or DEFAULT_LAST_DAY
+        if isinstance(low, datetime.datetime):
+            low = low.date()
+        if isinstance(high, datetime.datetime):
+            high = high.date()
+        if high < low:
+            high = low
+        return low + datetime.timedelta(days=self.random.randint(0, (high - low).days))
+
+    def _date(self, field) -> str:
+        return self._day(field, datetime.date.fromisoformat).isoformat()
+
+    def _time(self, field) -> str:
+        low = _iso(field.get("min"), datetime.time.fromisoformat) or datetime.time(0, 0)
+        high = _iso(field.get("max"), datetime.time.fromisoformat) or datetime.time(23, 59)
+        low_minutes, high_minutes = low.hour * 60 + low.minute, high.hour * 60 + high.minute
+        minutes = self.random.randint(low_minutes, max(low_minutes, high_minutes))
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def _datetime_local(self, field) -> str:
+        day = self._day(field, datetime.datetime.fromisoformat)
+        return f"{day.isoformat()}T{self.random.randint(0, 23):02d}:{self.random.randint(0, 59):02d}"
+
+    def _month(self, field) -> str:
+        return self._day(field, lambda value: datetime.date.fromisoformat(value + "-01")).strftime("%Y-%m")
+
+    def _week(self, field) -> str:
+        def parse(value: str) -> datetime.date:
+            year, week = value.split("-W")
+            return datetime.date.fromisocalendar(int(year), int(week), 1)
+
+        year, week, _ = self._day(field, parse).isocalendar()
+        return f"{year}-W{week:02d}"
+
+    def _color(self, field) -> str:
+        return "#{:06x}".format(self.random.randint(0, 0xFFFFFF))
+
+    def _file(self, field) -> str:
+        return UPLOAD_FILE
+
+    def _checkbox(self, field) -> bool:
+        return self.random.choice([True, False])
+
+    def _radio(self, field) -> str:
+        options = usable_options(field.get("options"))
+        return self.random.choice(options or ["option1", "option2", "option3"])
+
+    def _select(self, field) -> str:
+        options = usable_options(field.get("options"))
+        return self.random.choice(options) if options else "Option 1"
+
+    def _multiselect(self, field) -> List[str]:
+        options = usable_options(field.get("options"))
+        return self.random.sample(options, min(2, len(options)))
+
+    def _default(self, field) -> str:
+        return "default"
+
+    # A string matching the pattern (HTML pattern semantics: the whole value must match), or
+    # None when the pattern uses something this generator doesn't handle. minimal takes every
+    # repeat its fewest times.
+    def from_pattern(self, pattern: str, minimal: bool = False) -> Optional[str]:
+        parsed = _parse_pattern(pattern)
+        if parsed is not None:
+            tokens, compiled = parsed
+            try:
+                value = self._emit(tokens, minimal)
+                if compiled.fullmatch(value):
+                    return value
+            except (PatternNotSupported, ValueError, IndexError):
+                pass
+        logger.debug("Pattern not supported, using the default value", extra={"pattern": pattern})
+        return None
+
+    def _emit(self, tokens, minimal: bool = False) -> str:
+        out = []
+        for op, arg in tokens:
+            name = str(op)
+            if name == "LITERAL":
+                out.append(chr(arg))
+            elif name == "NOT_LITERAL":
+                out.append(self.random.choice([c for c in LITERAL_CHARS if ord(c) != arg]))
+            elif name == "ANY":
+                out.append(self.random.choice(LITERAL_CHARS))
+            elif name == "IN":
+                out.append(self._emit_class(arg))
+            elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+                low, high, item = arg
+                high = low if minimal else min(high, low + PATTERN_EXTRA_REPEATS)
+                out.extend(self._emit(item, minimal) for _ in range(self.random.randint(low, high)))
+            elif name in ("SUBPATTERN", "ATOMIC_GROUP"):
+                out.append(self._emit(arg[-1] if isinstance(arg, tuple) else arg, minimal))
+            elif name == "BRANCH":
+                out.append(self._emit(self.random.choice(arg[1]), minimal))
+            elif name == "CATEGORY":
+                out.append(self._emit_class([(op, arg)]))
+            elif name == "AT":
+                continue
+            else:
+                raise PatternNotSupported(name)
+        return "".join(out)
+
+    # One character from a [...] class (ranges, literals, \d \w \s, negation)
+    def _emit_class(self, items) -> str:
+        allowed, negate = set(), False
+        for op, arg in items:
+            name = str(op)
+            if name == "NEGATE":
+                negate = True
+            elif name == "LITERAL":
+                allowed.add(chr(arg))
+            elif name == "RANGE":
+                allowed.update(chr(c) for c in range(arg[0], min(arg[1], arg[0] + 256) + 1))
+            elif name == "CATEGORY":
+                category = str(arg)
+                if category == "CATEGORY_DIGIT":
+                    allowed.update(string.digits)
+                elif category == "CATEGORY_WORD":
+                    allowed.update(WORD_CHARS)
+                elif category == "CATEGORY_SPACE":
+                    allowed.add(" ")
+                elif category == "CATEGORY_NOT_DIGIT":
+                    allowed.update(string.ascii_letters)
+                elif category == "CATEGORY_NOT_WORD":
+                    allowed.add("-")
+                elif category == "CATEGORY_NOT_SPACE":
+                    allowed.update(LITERAL_CHARS)
+                else:
+                    raise PatternNotSupported(category)
+            else:
+                raise PatternNotSupported(name)
+        if negate:
+            allowed = set(LITERAL_CHARS + " -.") - allowed
+        return self.random.choice(sorted(allowed))
+
+
+# Field type -> generator, built once
+GENERATORS: Dict[str, Callable[[ValueGenerator, Any], Any]] = {
+    "text": ValueGenerator._text,
+    "search": ValueGenerator._text,
+    "email": ValueGenerator._email,
+    "password": ValueGenerator._password,
+    "tel": ValueGenerator._tel,
+    "url": ValueGenerator._url,
+    "textarea": ValueGenerator._textarea,
+    "number": ValueGenerator._number,
+    "range": ValueGenerator._range,
+    "date": ValueGenerator._date,
+    "time": ValueGenerator._time,
+    "datetime-local": ValueGenerator._datetime_local,
+    "month": ValueGenerator._month,
+    "week": ValueGenerator._week,
+    "color": ValueGenerator._color,
+    "file": ValueGenerator._file,
+    "checkbox": ValueGenerator._checkbox,
+    "radio": ValueGenerator._radio,
+    "select": ValueGenerator._select,
+    "multiselect": ValueGenerator._multiselect,
+}
+
+
+# Values for one form: a fresh generator per form, so a seed gives the same values for the
+# same schema regardless of what else is running
+def generate_values(fields: Iterable, seed=VALUE_SEED) -> Dict[str, Any]:
+    return ValueGenerator(seed).generate(fields)
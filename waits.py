@@ -0,0 +1,213 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# Wait configuration (overridable through the environment)
+READY_TIMEOUT = float(os.getenv("FORM_READY_TIMEOUT", "10"))
+SUBMIT_TIMEOUT = float(os.getenv("FORM_SUBMIT_TIMEOUT", "5"))
+STABLE_QUIET_PERIOD = float(os.getenv("FORM_STABLE_QUIET_PERIOD", "0.3"))
+POLL_FREQUENCY = 0.05
+
+# Cheap signature of the current field set: ids and types of every form control
+FIELD_SIGNATURE_SCRIPT = """
+return Array.from(document.querySelectorAll('form input, form select, form textarea'))
+    .map(function (el) { return el.id + ':' + el.type; }).join('|');
+"""
+
+# Registered before navigation (Page.addScriptToEvaluateOnNewDocument): records when a form
+# control was last added, removed or changed id/type once parsing is over
+FIELD_WATCH_SCRIPT = """
+(function () {
+    var watch = window.__formAgentFieldWatch = {changedAt: 0};
+    var controls = 'input, select, textarea';
+    function touches(node) {
+        return node.nodeType === 1 && (node.matches(controls) || !!node.querySelector(controls));
+    }
+    new MutationObserver(function (records) {
+        if (document.readyState === 'loading') { return; }
+        var changed = records.some(function (record) {
+            if (record.type === 'attributes') { return record.target.matches(controls); }
+            return Array.prototype.some.call(record.addedNodes, touches) ||
+                Array.prototype.some.call(record.removedNodes, touches);
+        });
+        if (changed) { watch.changedAt = performance.now(); }
+    }).observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['id', 'type']});
+})();
+"""
+
+# Milliseconds, on the page's clock, since parsing ended or the last control change, whichever is
+# later; null without the field watch
+FIELD_QUIET_SCRIPT = """
+var watch = window.__formAgentFieldWatch;
+var timing = performance.getEntriesByType('navigation')[0];
+if (!watch || !timing) { return null; }
+if (!timing.domContentLoadedEventEnd) { return 0; }
+return performance.now() - Math.max(timing.domContentLoadedEventEnd, watch.changedAt);
+"""
+
+# Marks the current document and records DOM mutations so a submit outcome can be detected
+ARM_SUBMIT_SCRIPT = """
+window.__formAgentSubmitArmed = true;
+window.__formAgentDomChanged = false;
+if (window.__formAgentObserver) { window.__formAgentObserver.disconnect(); }
+window.__formAgentObserver = new MutationObserver(function () { window.__formAgentDomChanged = true; });
+window.__formAgentObserver.observe(document.documentElement,
+    {childList: true, subtree: true, attributes: true, characterData: true});
+"""
+
+SUBMIT_STATE_SCRIPT = """
+if (!window.__formAgentSubmitArmed) { return 'navigation'; }
+return window.__formAgentDomChanged ? 'dom_change' : null;
+"""
+
+
+# Expected conditions on a DriverBackend, for WebDriverWait(backend, ...).until
+def document_in_state(states):
+    return lambda backend: backend.evaluate("return document.readyState") in states
+
+
+def element_located(selector: str):
+    return lambda backend: backend.evaluate("return !!document.querySelector(arguments[0])", selector)
+
+
+# Fields quiet for quiet_period according to the field watch; without it, the form's control
+# signature unchanged for quiet_period across polls
+def field_set_stable(quiet_period: float):
+    last = {"signature": None, "since": 0.0}
+
+    def condition(backend):
+        quiet = backend.evaluate(FIELD_QUIET_SCRIPT)
+        if quiet is not None:
+            return quiet >= quiet_period * 1000
+        signature = backend.evaluate(FIELD_SIGNATURE_SCRIPT)
+        if signature != last["signature"]:
+            last["signature"], last["since"] = signature, time.perf_counter()
+            return False
+        return time.perf_counter() - last["since"] >= quiet_period
+
+    return condition
+
+
+# Condition-based readiness waits (WebDriverWait over the backend) with per-phase durations
+class FormWaiter:
+    def __init__(
+        self,
+        backend,
+        ready_timeout: float = READY_TIMEOUT,
+        submit_timeout: float = SUBMIT_TIMEOUT,
+        quiet_period: float = STABLE_QUIET_PERIOD,
+    ):
+        self.backend = backend
+        self.ready_timeout = ready_timeout
+        self.submit_timeout = submit_timeout
+        self.quiet_period = quiet_period
+        self.timings: Dict[str, float] = {}
+        self.submit_result: Optional[str] = None
+        self._submit_url: Optional[str] = None
+        # With the eager page-load strategy the form is usable once the DOM is parsed
+        strategy = backend.page_load_strategy
+        self.ready_states = ("interactive", "complete") if strategy in ("eager", "none") else ("complete",)
+
+    def _record(self, phase: str, started: float):
+        self.timings[phase] = round(time.perf_counter() - started, 4)
+
+    # The condition's first truthy result, or None once the timeout passes
+    def _wait(self, condition: Callable[[Any], Any], timeout: float) -> Any:
+        try:
+            return WebDriverWait(self.backend, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        except TimeoutException:
+            return None
+
+    # Install the field watch for the documents loaded inside the block, so fields_stable can
+    # tell from the page how long its controls have been quiet. Backends without CDP keep the
+    # signature polling.
+    @contextmanager
+    def watching_fields(self):
+        try:
+            script_id = self.backend.cdp("Page.addScriptToEvaluateOnNewDocument", {"source": FIELD_WATCH_SCRIPT})["identifier"]
+        except Exception as e:
+            logger.debug("Field watch unavailable", extra={"error": str(e)})
+            script_id = None
+        try:
+            yield
+        finally:
+            # Pooled sessions are reused for other forms; the script must not pile up
+            if script_id is not None:
+                try:
+                    self.backend.cdp("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+                except Exception as e:
+                    logger.debug("Removing the field watch failed", extra={"error": str(e)})
+
+    def document_ready(self, timeout: Optional[float] = None) -> bool:
+        started = time.perf_counter()
+        try:
+            if self._wait(document_in_state(self.ready_states), timeout or self.ready_timeout):
+                return True
+            logger.warning("Timed out waiting for document ready")
+            return False
+        finally:
+            self._record("document_ready", started)
+
+    def form_present(self, selector: str = "form", timeout: Optional[float] = None) -> bool:
+        started = time.perf_counter()
+        try:
+            if self._wait(element_located(selector), timeout or self.ready_timeout):
+                return True
+            logger.warning("Timed out waiting for form", extra={"selector": selector})
+            return False
+        finally:
+            self._record("form_present", started)
+
+    # Wait until the set of form controls stops changing for one quiet period. With the field
+    # watch the period counts from the page's last control change (or the end of parsing), so
+    # a page that has been quiet that long passes on the first check.
+    def fields_stable(self, timeout: Optional[float] = None) -> bool:
+        started = time.perf_counter()
+        try:
+            if self._wait(field_set_stable(self.quiet_period), timeout or self.ready_timeout):
+                return True
+            logger.warning("Timed out waiting for the field set to stabilise")
+            return False
+        finally:
+            self._record("fields_stable", started)
+
+    # Document ready, form present and a stable field set
+    def page_ready(self, form_selector: str = "form") -> bool:
+        return self.document_ready() and self.form_present(form_selector) and self.fields_stable()
+
+    # Call right before clicking submit so the outcome can be told apart from the current page
+    def arm_submit(self):
+        self._submit_url = self.backend.current_url()
+        self.backend.evaluate(ARM_SUBMIT_SCRIPT)
+
+    # Wait for navigation, a DOM change or an alert; returns which one happened (or "timeout")
+    def submit_outcome(self, timeout: Optional[float] = None) -> str:
+        started = time.perf_counter()
+        outcome = {}
+
+        def settled(backend):
+            alert_text = backend.take_dialog()
+            if alert_text is not None:
+                outcome["alert_text"] = alert_text
+                return "alert"
+            try:
+                if backend.current_url() != self._submit_url:
+                    return "navigation"
+                return backend.evaluate(SUBMIT_STATE_SCRIPT)
+            except Exception:
+                return None  # Document is being replaced or an alert just opened
+
+        try:
+            result = self._wait(settled, timeout or self.submit_timeout) or "timeout"
+        finally:
+            self._record("submit_outcome", started)
+        if "alert_text" in outcome:
+            logger.info("Submit raised alert", extra={"alert_text": outcome["alert_text"]})
+        self.submit_result = result
+        return result
@@ -0,0 +1,349 @@
+import asyncio
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from pydantic import BaseModel
+from browser_pool import create_browser_pool
+from form_executor import FORM_MAX_QUEUE, FormJobExecutor, QueueFullError
+from observability import registry
+
+logger = logging.getLogger(__name__)
+
+# Supervisor configuration (overridable through the environment)
+FORM_WORKER_PROCESSES = int(os.getenv("FORM_WORKER_PROCESSES", "0"))
+WORKER_SESSIONS = int(os.getenv("FORM_WORKER_SESSIONS", "1"))
+WORKER_MONITOR_INTERVAL = 0.5
+# Seconds between a worker's browser pool reports (each result carries one too)
+WORKER_POOL_REPORT_INTERVAL = 1.0
+
+
+class WorkerCrashedError(Exception):
+    pass
+
+
+# Entry point of a worker process: imports the form module with its own browser pool (in the
+# configured BROWSER_POOL_MODE) and runs jobs from its inbox on `sessions` threads. Outbox
+# messages are (worker index, job id, ok, payload, metrics, pool stats): ok is None for a
+# streaming job's progress events, and job id is None for a periodic pool report.
+def _worker_main(index: int, module_name: str, sessions: int, inbox, outbox):
+    os.environ["FORM_WORKER_PROCESS"] = "1"  # Workers never supervise workers of their own
+    os.environ["FORM_WORKER_INDEX"] = str(index)  # Keeps per-worker browser cache directories apart
+    module = importlib.import_module(module_name)
+    module.browser_pool = create_browser_pool(size=sessions)
+    module.browser_pool.start()
+    stopped = threading.Event()
+
+    def report_pool():
+        while True:
+            outbox.put((index, None, None, None, None, module.browser_pool.stats()))
+            if stopped.wait(WORKER_POOL_REPORT_INTERVAL):
+                return
+
+    def run(job_id, fn_name, args, kwargs, stream=False):
+        if stream:
+            # Progress events go back on the result queue, ahead of the job's result
+            kwargs["on_event"] = lambda event: outbox.put((index, job_id, None, event, None, None))
+        try:
+            result = getattr(module, fn_name)(*args, **kwargs)
+            if isinstance(result, BaseModel):
+                result = result.dict()
+            outbox.put((index, job_id, True, result, registry.drain(), module.browser_pool.stats()))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            outbox.put((index, job_id, False, e, registry.drain(), module.browser_pool.stats()))
+
+    threading.Thread(target=report_pool, name="form-worker-pool-report", daemon=True).start()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="form-worker") as pool:
+        while True:
+            message = inbox.get()
+            if message is None:
+                break
+            pool.submit(run, *message)
+    stopped.set()
+    module.browser_pool.close()
+
+
+# One pool view over the workers' last reports: counts add up, the longest wait is the
+# longest anywhere, lists (tabs per browser) are concatenated and settings come from the first
+def merge_pool_stats(reports: List[dict]) -> dict:
+    merged = {}
+    for report in reports:
+        for key, value in report.items():
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif key in ("wait_seconds_max", "max_tabs"):
+                merged[key] = max(merged[key], value)
+            elif isinstance(value, list):
+                merged[key].extend(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] += value
+    if "wait_seconds_total" in merged:
+        checkouts = merged.get("checkouts", 0)
+        merged["wait_seconds_total"] = round(merged["wait_seconds_total"], 4)
+        merged["wait_seconds_avg"] = round(merged["wait_seconds_total"] / checkouts, 4) if checkouts else 0.0
+    return merged
+
+
+# Settle a job's future unless its caller cancelled it (an awaiting request that went away);
+# setting a cancelled future raises, which would take the collector thread down
+def _resolve(future: Future, ok: bool, payload):
+    if not future.set_running_or_notify_cancel():
+        return
+    if ok:
+        future.set_result(payload)
+    else:
+        future.set_exception(payload)
+
+
+# Bookkeeping for one worker process
+class WorkerHandle:
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.inbox = None
+        self.pending = {}  # job id -> Future
+        self.relays = {}  # job id -> event queue of a streaming job
+        self.completed = 0
+        self.failed = 0
+        self.restarts = -1  # The first start isn't a restart
+        self.started_at = 0.0
+        self.pool_stats: Optional[dict] = None  # The worker's last browser pool report
+
+
+# Runs form jobs on a pool of worker processes, each owning its own browser sessions.
+# Exposes the same run()/stats()/shutdown() interface as FormJobExecutor.
+class WorkerSupervisor:
+    def __init__(
+        self,
+        module_name: str,
+        processes: int,
+        sessions_per_worker: int = WORKER_SESSIONS,
+        max_queue: int = FORM_MAX_QUEUE,
+    ):
+        if module_name == "__main__":
+            # Started as a script: workers import the module by its file name
+            module_name = os.path.splitext(os.path.basename(sys.modules["__main__"].__file__))[0]
+        self.module_name = module_name
+        self.processes = processes
+        self.sessions_per_worker = sessions_per_worker
+        self.workers = processes * sessions_per_worker  # Concurrent job slots
+        self.max_queue = max_queue
+        self._context = multiprocessing.get_context("spawn")
+        self._outbox = self._context.Queue()
+        self._handles = [WorkerHandle(i) for i in range(processes)]
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._rejected = 0
+        self._closing = False
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for handle in self._handles:
+                self._spawn(handle)
+        threading.Thread(target=self._collect_results, daemon=True).start()
+        threading.Thread(target=self._monitor, daemon=True).start()
+        logger.info("Started form worker processes", extra={"processes": self.processes, "sessions_per_worker": self.sessions_per_worker})
+
+    def _spawn(self, handle: WorkerHandle):
+        handle.inbox = self._context.Queue()
+        handle.process = self._context.Process(
+            target=_worker_main,
+            args=(handle.index, self.module_name, self.sessions_per_worker, handle.inbox, self._outbox),
+            name=f"form-worker-{handle.index}",
+            daemon=True,
+        )
+        handle.process.start()
+        handle.pool_stats = None
+        handle.restarts += 1
+        handle.started_at = time.time()
+
+    # Route to the least-loaded live worker; raises QueueFullError when every slot and the queue are taken.
+    # An on_event callback can't cross processes: the worker sends events back and a relay thread
+    # calls on_event with them in order, so a slow client never holds up the result collector.
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if not self._started:
+            self.start()
+        on_event = kwargs.pop("on_event", None)
+        future = Future()
+        with self._lock:
+            in_flight = sum(len(h.pending) for h in self._handles)
+            if in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(f"Form queue is full ({self.max_queue} jobs waiting)")
+            handle = min(self._handles, key=lambda h: (not h.process.is_alive(), len(h.pending)))
+            job_id = next(self._job_ids)
+            handle.pending[job_id] = future
+            if on_event is not None:
+                handle.relays[job_id] = self._start_relay(on_event)
+            handle.inbox.put((job_id, fn.__name__, args, kwargs, on_event is not None))
+        return future
+
+    @staticmethod
+    def _start_relay(on_event: Callable) -> queue.SimpleQueue:
+        events = queue.SimpleQueue()
+
+        def relay():
+            listening = True
+            while True:
+                item = events.get()
+                if isinstance(item, tuple):  # (future, ok, payload): the job is done
+                    _resolve(*item)
+                    return
+                if listening:
+                    try:
+                        on_event(item)
+                    except Exception:
+                        listening = False  # Client gone; the worker still finishes the form
+
+        threading.Thread(target=relay, daemon=True).start()
+        return events
+
+    # Resolve a job's future; behind its relayed events when it streams
+    @staticmethod
+    def _complete(future: Future, relay: Optional[queue.SimpleQueue], ok: bool, payload):
+        if relay is not None:
+            relay.put((future, ok, payload))
+        else:
+            _resolve(future, ok, payload)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _collect_results(self):
+        while not self._closing:
+            try:
+                index, job_id, ok, payload, metrics, pool_stats = self._outbox.get(timeout=WORKER_MONITOR_INTERVAL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if pool_stats is not None:
+                with self._lock:
+                    self._handles[index].pool_stats = pool_stats
+            if job_id is None:
+                continue
+            if ok is None:
+                # A progress event of a streaming job
+                with self._lock:
+                    relay = self._handles[index].relays.get(job_id)
+                if relay is not None:
+                    relay.put(payload)
+                continue
+            # Counters and histograms observed in the worker since its last result
+            registry.merge(metrics)
+            with self._lock:
+                handle = self._handles[index]
+                future = handle.pending.pop(job_id, None)
+                relay = handle.relays.pop(job_id, None)
+                if future is None:
+                    continue  # Already failed when the worker crashed
+                if ok:
+                    handle.completed += 1
+                else:
+                    handle.failed += 1
+            self._complete(future, relay, ok, payload)
+
+    # Restart crashed workers and fail the jobs they were holding
+    def _monitor(self):
+        while not self._closing:
+            time.sleep(WORKER_MONITOR_INTERVAL)
+            for handle in self._handles:
+                if self._closing or handle.process.is_alive():
+                    continue
+                with self._lock:
+                    lost = [(future, handle.relays.pop(job_id, None)) for job_id, future in handle.pending.items()]
+                    handle.pending.clear()
+                    handle.failed += len(lost)
+                    exitcode = handle.process.exitcode
+                    self._spawn(handle)
+                logger.error("Form worker exited and was restarted", extra={"worker": handle.index, "exitcode": exitcode, "failed_jobs": len(lost)})
+                for future, relay in lost:
+                    self._complete(future, relay, False, WorkerCrashedError(f"Worker {handle.index} exited with code {exitcode}"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_worker = [
+                {
+                    "index": h.index,
+                    "pid": h.process.pid if h.process else None,
+                    "alive": bool(h.process and h.process.is_alive()),
+                    "in_flight": len(h.pending),
+                    "completed": h.completed,
+                    "failed": h.failed,
+                    "restarts": max(h.restarts, 0),
+                    "uptime_seconds": round(time.time() - h.started_at, 1) if h.process else 0.0,
+                }
+                for h in self._handles
+            ]
+            in_flight = sum(w["in_flight"] for w in per_worker)
+            return {
+                "processes": self.processes,
+                "sessions_per_worker": self.sessions_per_worker,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(in_flight, self.workers),
+                "queued": max(0, in_flight - self.workers),
+                "completed": sum(w["completed"] for w in per_worker),
+                "failed": sum(w["failed"] for w in per_worker),
+                "rejected": self._rejected,
+                "per_worker": per_worker,
+            }
+
+    # The workers' browser pools as one pool, plus each live worker's last report
+    def pool_stats(self) -> dict:
+        with self._lock:
+            reports = [(h.index, h.pool_stats) for h in self._handles if h.pool_stats is not None]
+        return {
+            **merge_pool_stats([report for _, report in reports]),
+            "workers_reporting": len(reports),
+            "per_worker": [{"index": index, **report} for index, report in reports],
+        }
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = 10):
+        self._closing = True
+        for handle in self._handles:
+            if handle.process and handle.process.is_alive():
+                handle.inbox.put(None)
+        for handle in self._handles:
+            if handle.process is None:
+                continue
+            if wait:
+                handle.process.join(timeout)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+
+# What /pool/stats and the pool gauges read: the worker processes' pools when they own the browsers
+class WorkerPools:
+    def __init__(self, supervisor: WorkerSupervisor):
+        self.supervisor = supervisor
+
+    def stats(self) -> dict:
+        return self.supervisor.pool_stats()
+
+
+def pool_stats_source(executor, browser_pool):
+    return WorkerPools(executor) if isinstance(executor, WorkerSupervisor) else browser_pool
+
+
+# Thread executor in-process, or a process supervisor when FORM_WORKER_PROCESSES is set
+def create_form_executor(module_name: str):
+    if FORM_WORKER_PROCESSES > 0 and not os.getenv("FORM_WORKER_PROCESS"):
+        return WorkerSupervisor(module_name, FORM_WORKER_PROCESSES)
+    return FormJobExecutor()